@@ -0,0 +1,17 @@
+import pytest
+
+from observ import reactive
+
+
+@pytest.fixture
+def tree():
+    """
+    A reactive tree of 10,000 records, each with a nested dict and a
+    nested list, shared by the benchmarks that walk a whole tree.
+    """
+    return reactive(
+        {
+            f"key_{i}": {"a": i, "b": [i, i + 1, "x"], "c": {"d": 1.0, "e": None}}
+            for i in range(10_000)
+        }
+    )
@@ -0,0 +1,58 @@
+"""
+Benchmarks for time series held in reactive buffers (array.array),
+compared against the same series held in reactive lists: appending
+samples, and deep watching the series. The memory that the series
+takes up is reported in the extra info.
+"""
+
+import tracemalloc
+from array import array
+
+import pytest
+
+from observ import reactive, watch
+
+SIZE = 100_000
+
+
+def series(kind):
+    if kind == "list":
+        return [float(i) for i in range(SIZE)]
+    return array("d", range(SIZE))
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="buffer_append")
+@pytest.mark.parametrize("kind", ["list", "array"])
+def test_buffer_append(benchmark, kind):
+    state = reactive({"series": series(kind)})
+    samples = state["series"]
+    watcher = watch(lambda: state, lambda: None, sync=True, deep=True)  # noqa: F841
+    benchmark.extra_info["size"] = SIZE
+
+    def append():
+        for i in range(1_000):
+            samples.append(float(i))
+        del samples[-1_000:]
+
+    benchmark(append)
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="buffer_deep_watch")
+@pytest.mark.parametrize("kind", ["list", "array"])
+def test_buffer_deep_watch(benchmark, kind):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        state = reactive({"series": series(kind)})
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    benchmark.extra_info["size"] = SIZE
+    benchmark.extra_info["bytes_per_sample"] = (after - before) / SIZE
+
+    def deep_watch():
+        return watch(lambda: state, lambda: None, sync=True, deep=True)
+
+    benchmark(deep_watch)
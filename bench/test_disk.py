@@ -0,0 +1,42 @@
+"""
+Benchmarks for reading from and writing to a disk store.
+"""
+
+import pytest
+
+from observ import DiskStore
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="disk")
+def test_disk_reads(benchmark, tmp_path):
+    size = 10_000
+    initial = {str(i): {"value": i, "items": [i]} for i in range(size)}
+    store = DiskStore(tmp_path / "state.db", initial, max_resident=1_000)
+    state = store.state
+    benchmark.extra_info["size"] = size
+
+    def read():
+        # Loads (and evicts) every container once
+        for i in range(0, size, 7):
+            state[str(i)]["items"][0]
+
+    benchmark(read)
+    store.close()
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="disk")
+def test_disk_writes(benchmark, tmp_path):
+    store = DiskStore(
+        tmp_path / "state.db", {"items": [{"value": i} for i in range(1_000)]}
+    )
+    items = store.state["items"]
+
+    def mutate():
+        for i in range(1_000):
+            items[i]["value"] += 1
+        store.flush()
+
+    benchmark(mutate)
+    store.close()
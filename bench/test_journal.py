@@ -0,0 +1,26 @@
+"""
+Benchmarks for the cost of journaling mutations.
+"""
+
+import pytest
+
+from observ import Journal, reactive
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="journal")
+@pytest.mark.parametrize("journaled", [False, True], ids=["plain", "journaled"])
+def test_journal_writes(benchmark, tmp_path, journaled):
+    state = reactive({"items": [{"value": i} for i in range(1_000)]})
+    journal = Journal(state, tmp_path / "state.journal") if journaled else None
+    items = state["items"]
+
+    def mutate():
+        for i in range(1_000):
+            items[i]["value"] += 1
+        items.append({"value": 0})
+        items.pop()
+
+    benchmark(mutate)
+    if journal is not None:
+        journal.close()
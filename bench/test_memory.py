@@ -0,0 +1,111 @@
+"""
+Benchmarks for the memory footprint of watchers.
+
+The memory that is allocated per object is measured with tracemalloc
+and reported in the extra info of each benchmark (see the JSON output
+of pytest-benchmark, e.g. with --benchmark-json), while the benchmark
+itself times the creation of the objects.
+
+Note that the measured memory includes everything that is allocated
+for an object: e.g. for a watcher, also the function that it watches
+and its subscription to its deps.
+"""
+
+import gc
+import tracemalloc
+
+import pytest
+
+from observ import computed, reactive, watch, watch_effect
+
+COUNT = 10_000
+
+
+def measure(create, count=COUNT):
+    """
+    Returns the number of bytes that is allocated per call to create.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        items = [create() for _ in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del items
+    return (after - before) / count
+
+
+def create_effect(state):
+    return watch_effect(lambda: state["count"], sync=True)
+
+
+def create_watch(state):
+    return watch(lambda: state["count"], lambda: None, sync=True)
+
+
+def create_computed(state):
+    fn = computed(lambda: state["count"])
+    fn()
+    return fn
+
+
+KINDS = {
+    "effect": create_effect,
+    "watch": create_watch,
+    "computed": create_computed,
+}
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="watcher_memory")
+@pytest.mark.parametrize("kind", list(KINDS))
+def test_watcher_memory(benchmark, kind):
+    state = reactive({"count": 0})
+    create = KINDS[kind]
+
+    bytes_per_watcher = measure(lambda: create(state))
+    benchmark.extra_info["bytes_per_watcher"] = bytes_per_watcher
+
+    def create_many():
+        return [create(state) for _ in range(1_000)]
+
+    benchmark(create_many)
+
+
+KEYDEPS = 1_000_000
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="keydep_memory")
+@pytest.mark.parametrize("subscribers", [1, 2])
+def test_keydep_memory(benchmark, subscribers):
+    """
+    Every key of a large dict is read by the given number of watchers,
+    which creates a keydep per key with that many subscribers.
+    """
+    state = reactive({i: i for i in range(KEYDEPS)})
+
+    def read_all():
+        for key in range(KEYDEPS):
+            _ = state[key]
+
+    def subscribe():
+        return [watch_effect(read_all, sync=True) for _ in range(subscribers)]
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        watchers = subscribe()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    # Per keydep: the keydep itself, its entry in the (weak) keydeps
+    # mapping, the subscriptions and the entries in the dep sets of
+    # the watchers
+    benchmark.extra_info["bytes_per_keydep"] = (after - before) / KEYDEPS
+    del watchers
+
+    benchmark.pedantic(subscribe, rounds=3)
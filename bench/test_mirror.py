@@ -0,0 +1,53 @@
+"""
+Benchmarks for mirroring state changes, compared to sending a full
+copy of the state.
+"""
+
+import pickle
+
+import pytest
+
+from observ import Primary, reactive, scheduler, to_raw
+
+
+def create_state():
+    return reactive(
+        {"items": [{"value": i, "tags": ["a", "b"]} for i in range(10_000)]}
+    )
+
+
+def mutate(state):
+    items = state["items"]
+    for i in range(0, 10_000, 100):
+        items[i]["value"] += 1
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="mirror")
+def test_mirror_batch(benchmark, monkeypatch):
+    monkeypatch.setattr(scheduler, "request_flush", lambda: None)
+    state = create_state()
+    messages = []
+    primary = Primary(state, messages.append)
+
+    def run():
+        mutate(state)
+        scheduler.flush()
+
+    benchmark(run)
+    benchmark.extra_info["bytes_per_message"] = len(messages[-1])
+    primary.close()
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="mirror")
+def test_mirror_full_copy(benchmark):
+    state = create_state()
+    messages = []
+
+    def run():
+        mutate(state)
+        messages.append(pickle.dumps(to_raw(state)))
+
+    benchmark(run)
+    benchmark.extra_info["bytes_per_message"] = len(messages[-1])
@@ -0,0 +1,36 @@
+"""
+Benchmarks for pickling reactive state (e.g. to send it to another
+process), compared to pickling a raw copy of it.
+"""
+
+import pickle
+
+import pytest
+
+from observ import reactive, to_raw
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="pickle")
+def test_pickle_proxy(benchmark, tree):
+    benchmark(pickle.dumps, tree)
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="pickle")
+def test_pickle_to_raw(benchmark, tree):
+    benchmark(lambda: pickle.dumps(to_raw(tree)))
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="unpickle")
+def test_unpickle_proxy(benchmark, tree):
+    data = pickle.dumps(tree)
+    benchmark(pickle.loads, data)
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="unpickle")
+def test_unpickle_to_raw(benchmark, tree):
+    data = pickle.dumps(to_raw(tree))
+    benchmark(lambda: reactive(pickle.loads(data)))
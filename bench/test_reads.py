@@ -11,11 +11,12 @@ Each benchmarked function performs a batch of 100 reads (or a full
 iteration) so that the measured times are well above timer resolution.
 """
 
+from dataclasses import dataclass
 from functools import partial
 
 import pytest
 
-from observ import reactive
+from observ import reactive, reactive_class
 from observ.watcher import Watcher
 
 SIZE = 1_000
@@ -23,6 +24,13 @@ KEYS = [f"key_{i}" for i in range(0, SIZE, 10)]
 INDICES = list(range(0, SIZE, 10))
 
 
+@reactive_class
+@dataclass(slots=True)
+class Point:
+    x: int
+    y: int
+
+
 def make_dict():
     return {f"key_{i}": i for i in range(SIZE)}
 
@@ -37,6 +45,11 @@ def read_list_items(obj):
         _ = obj[index]
 
 
+def read_attributes(obj):
+    for _ in INDICES:
+        _ = obj.x
+
+
 def iterate_dict_values(obj):
     for _value in obj.values():
         pass
@@ -98,3 +111,13 @@ def test_read_dict_getitem_tracked(benchmark):
     obj = reactive(make_dict())
     watcher = Watcher(partial(read_dict_keys, obj), deep=False)
     benchmark(watcher.get)
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="read_object_attribute")
+@pytest.mark.parametrize("kind", ["plain", "reactive"])
+def test_read_object_attribute(benchmark, kind):
+    obj = Point(1, 2)
+    if kind == "reactive":
+        obj = reactive(obj)
+    benchmark(partial(read_attributes, obj))
@@ -0,0 +1,32 @@
+"""
+Benchmarks for writes to reactive arrays, compared against writes to
+plain arrays.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+regions = pytest.importorskip("observ.regions")
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="array_setitem")
+@pytest.mark.parametrize("kind", ["plain", "reactive", "dirty_regions"])
+def test_array_setitem(benchmark, kind):
+    size = 10_000
+    array = np.zeros((size, 3))
+    dirty = None
+    if kind != "plain":
+        array = regions.reactive_array(array)
+    if kind == "dirty_regions":
+        dirty = regions.DirtyRegions(array)
+    benchmark.extra_info["size"] = size
+
+    def write():
+        for i in range(0, size, 100):
+            array[i] = (1, 2, 3)
+        if dirty is not None:
+            dirty.ranges()
+            dirty.clear()
+
+    benchmark(write)
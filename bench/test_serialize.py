@@ -0,0 +1,28 @@
+"""
+Benchmarks for serializing reactive state to JSON.
+"""
+
+import io
+import json
+
+import pytest
+
+from observ import dump_json, dumps_json, to_raw
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="json")
+def test_json_to_raw(benchmark, tree):
+    benchmark(lambda: json.dumps(to_raw(tree)))
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="json")
+def test_json_dumps(benchmark, tree):
+    benchmark(dumps_json, tree)
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="json")
+def test_json_dump_stream(benchmark, tree):
+    benchmark(lambda: dump_json(tree, io.StringIO()))
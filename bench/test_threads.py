@@ -0,0 +1,59 @@
+"""
+Benchmarks for evaluating independent computeds on multiple threads.
+
+Every thread evaluates its own computeds over its own reactive state,
+so there is no contention on the data itself: only the dependency
+collection machinery is shared. The total amount of work is the same
+for every thread count, so on a free-threaded build (3.13t) the
+measured time should go down as threads are added, while on a build
+with a GIL it should stay (roughly) flat.
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from observ import computed, reactive
+
+THREADS = [1, 2, 4, 8]
+COMPUTEDS = 64
+SIZE = 1_000
+
+
+def make_computeds(count):
+    result = []
+    for _ in range(count):
+        state = reactive({"items": list(range(SIZE))})
+
+        # Bind the state through a default argument, so that every
+        # computed depends on its own state
+        def total(state=state):
+            return sum(state["items"])
+
+        result.append((state, computed(total)))
+    return result
+
+
+def evaluate_all(computeds):
+    for state, fn in computeds:
+        # Invalidate, so that every call re-evaluates
+        state["items"] = state["items"].__target__[:]
+        fn()
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="threaded_computeds")
+@pytest.mark.parametrize("threads", THREADS)
+def test_threaded_computeds(benchmark, threads):
+    benchmark.extra_info["gil_enabled"] = getattr(sys, "_is_gil_enabled", bool)()
+    computeds = make_computeds(COMPUTEDS)
+    chunks = [computeds[i::threads] for i in range(threads)]
+
+    with ThreadPoolExecutor(threads) as executor:
+
+        def run():
+            for future in [executor.submit(evaluate_all, c) for c in chunks]:
+                future.result()
+
+        benchmark(run)
@@ -0,0 +1,32 @@
+"""
+Benchmarks for converting reactive state back to raw data.
+"""
+
+import pytest
+
+from observ import reactive, to_raw
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="to_raw")
+def test_to_raw_tree(benchmark, tree):
+    benchmark(to_raw, tree)
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="to_raw")
+def test_to_raw_flat_list(benchmark):
+    state = reactive(list(range(100_000)))
+    benchmark(to_raw, state)
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="to_raw")
+def test_to_raw_tree_without_copy(benchmark, tree):
+    benchmark(to_raw, tree, copy=False)
+
+
+@pytest.mark.timeout(timeout=0)
+@pytest.mark.benchmark(group="to_raw")
+def test_to_raw_tree_assume_raw(benchmark, tree):
+    benchmark(to_raw, tree, copy=False, assume_raw=True)
@@ -1,12 +1,30 @@
-from importlib.metadata import version
+import importlib.metadata
 
-__version__ = version("observ")
+__version__ = importlib.metadata.version("observ")
 
 
 # Importing the proxy modules registers their types in TYPE_LOOKUP
-from . import dict_proxy, list_proxy, set_proxy
+from . import buffer_proxy, dict_proxy, list_proxy, set_proxy
+from .disk import DiskStore
 from .init import init, loop_factory
+from .journal import Journal, load_journal
+from .mirror import Primary, Replica
+from .object_proxy import reactive_class
+from .operators import (
+    Window,
+    group_by,
+    index_by,
+    reactive_count,
+    reactive_filter,
+    reactive_map,
+    reactive_reduce,
+    reactive_sum,
+    sorted_view,
+    window,
+)
 from .proxy import (
+    listen,
+    mark_raw,
     reactive,
     readonly,
     ref,
@@ -14,6 +32,11 @@ from .proxy import (
     shallow_readonly,
     to_raw,
     trigger_ref,
+    version,
 )
 from .scheduler import scheduler
-from .watcher import Watcher, computed, watch, watch_effect
+from .scope import EffectScope, current_scope
+from .serialize import dump_json, dumps_json, iter_json
+from .snapshot import Snapshot, snapshot
+from .tracker import DirtyTracker
+from .watcher import Watcher, computed, computed_family, watch, watch_effect
@@ -0,0 +1,312 @@
+"""
+Proxies for compact buffers of numbers and bytes: array.array and
+bytearray. A buffer is reactive as a whole, like a set: it has a
+single dep and no nested values, so deep watchers depend on it as a
+leaf. Writes are described as splices of the buffer, like the writes
+to a list, where the removed and inserted items are slices of the
+buffer (of the same type). Readers can get at the contents without
+copying them through a (readonly) memoryview of the proxy.
+"""
+
+from __future__ import annotations
+
+from array import array
+from functools import wraps
+from typing import TYPE_CHECKING, Any, cast
+
+from .dep import get_dep_stack
+from .proxy import LEAF_TYPES, TYPE_LOOKUP, Proxy
+from .proxy_db import global_listeners
+from .traps import construct_methods_traps_dict, readonly_trap, splice_start
+
+if TYPE_CHECKING:
+    from .traps import Trap, TrapFactory
+
+buffer_traps: dict[str, set[str]] = {
+    "READERS": {
+        "count",
+        "index",
+        "__add__",
+        "__getitem__",
+        "__contains__",
+        "__eq__",
+        "__ge__",
+        "__gt__",
+        "__le__",
+        "__lt__",
+        "__mul__",
+        "__ne__",
+        "__rmul__",
+        "__len__",
+        "__repr__",
+        "__str__",
+        "__format__",
+        "__sizeof__",
+    },
+    "ITERATORS": {
+        "__iter__",
+    },
+    "WRITERS": {
+        "append",
+        "clear",
+        "extend",
+        "insert",
+        "pop",
+        "remove",
+        "reverse",
+        "__setitem__",
+        "__delitem__",
+        "__iadd__",
+        "__imul__",
+    },
+}
+
+array_traps: dict[str, set[str]] = {
+    "READERS": buffer_traps["READERS"]
+    | {
+        "buffer_info",
+        "tobytes",
+        "tofile",
+        "tolist",
+        "tounicode",
+    },
+    "ITERATORS": buffer_traps["ITERATORS"],
+    "WRITERS": buffer_traps["WRITERS"]
+    | {
+        "byteswap",
+        "frombytes",
+        "fromfile",
+        "fromlist",
+        "fromunicode",
+    },
+}
+
+bytearray_traps: dict[str, set[str]] = {
+    "READERS": buffer_traps["READERS"]
+    | {
+        "capitalize",
+        "center",
+        "copy",
+        "decode",
+        "endswith",
+        "expandtabs",
+        "find",
+        "hex",
+        "isalnum",
+        "isalpha",
+        "isascii",
+        "isdigit",
+        "islower",
+        "isspace",
+        "istitle",
+        "isupper",
+        "join",
+        "ljust",
+        "lower",
+        "lstrip",
+        "partition",
+        "removeprefix",
+        "removesuffix",
+        "replace",
+        "rfind",
+        "rindex",
+        "rjust",
+        "rpartition",
+        "rsplit",
+        "rstrip",
+        "split",
+        "splitlines",
+        "startswith",
+        "strip",
+        "swapcase",
+        "title",
+        "translate",
+        "upper",
+        "zfill",
+        "__alloc__",
+        "__mod__",
+        "__rmod__",
+    },
+    "ITERATORS": buffer_traps["ITERATORS"],
+    "WRITERS": buffer_traps["WRITERS"],
+}
+
+# Writers that append to the end of the buffer (like extend)
+APPENDERS = frozenset({"frombytes", "fromfile", "fromlist", "fromunicode"})
+# Writers that can change the contents without changing the length
+REWRITERS = frozenset({"byteswap", "reverse", "__imul__", "__setitem__"})
+
+
+def buffer_read_trap(method: str, obj_cls: type) -> Trap:
+    fn = getattr(obj_cls, method)
+    get_stack = get_dep_stack
+
+    # Buffers only hold plain values, and the buffers returned by reads
+    # (slices, concatenations) are new: nothing is proxied
+    @wraps(fn)
+    def trap(self: Proxy[Any], *args: Any) -> Any:
+        stack = get_stack()
+        if stack:
+            stack[-1].add_dep(self.__dep__)
+        if args and isinstance(args[0], Proxy):
+            args = (args[0].__target__, *args[1:])
+        return fn(self.__target__, *args)
+
+    return trap
+
+
+def buffer_iterate_trap(method: str, obj_cls: type) -> Trap:
+    fn = getattr(obj_cls, method)
+    get_stack = get_dep_stack
+
+    @wraps(fn)
+    def trap(self: Proxy[Any]) -> Any:
+        stack = get_stack()
+        if stack:
+            stack[-1].add_dep(self.__dep__)
+        return fn(self.__target__)
+
+    return trap
+
+
+def buffer_write_trap(method: str, obj_cls: type) -> Trap:
+    fn = getattr(obj_cls, method)
+    splice_method = "extend" if method in APPENDERS else method
+    compare = method in REWRITERS
+    # In-place operators return the proxy, so that `samples += ...`
+    # doesn't rebind the name to the target
+    inplace = method in ("__iadd__", "__imul__")
+
+    @wraps(fn)
+    def trap(self: Proxy[Any], *args: Any) -> Any:
+        target = self.__target__
+        dep = self.__dep__
+        if args and isinstance(args[0], Proxy):
+            args = (args[0].__target__, *args[1:])
+        old_len = len(target)
+        if not compare and dep.listeners is None and not global_listeners:
+            # Only the length has to be compared: no need to copy
+            retval = fn(target, *args)
+            if len(target) != old_len:
+                dep.notify()
+            return self if inplace else retval
+        index, removed = splice_start(splice_method, target, args)
+        if type(removed) is list:
+            # Single items: the splice is described by slices
+            removed = target[index : index + len(removed)]
+        retval = fn(target, *args)
+        inserted = target[index : index + len(target) - old_len + len(removed)]
+        if inserted != removed:
+            if dep.listeners is not None or global_listeners:
+                dep.emit(("splice", index, removed, inserted))
+            dep.notify()
+        return self if inplace else retval
+
+    return trap
+
+
+buffer_trap_map: dict[str, TrapFactory] = {
+    "READERS": buffer_read_trap,
+    "ITERATORS": buffer_iterate_trap,
+    "WRITERS": buffer_write_trap,
+}
+
+buffer_trap_map_readonly: dict[str, TrapFactory] = {
+    "READERS": buffer_read_trap,
+    "ITERATORS": buffer_iterate_trap,
+    "WRITERS": readonly_trap,
+}
+
+
+class BufferProxyBase(Proxy[Any]):
+    __slots__ = ()
+
+    def __buffer__(self, flags: int, /) -> memoryview:
+        # memoryview(proxy): a readonly view of the target, without
+        # copying. Writes through the view would not be seen, hence
+        # readonly. Note that a bytearray can't be resized while a
+        # view of it exists
+        stack = get_dep_stack()
+        if stack:
+            stack[-1].add_dep(self.__dep__)
+        return memoryview(self.__target__).toreadonly()
+
+
+class ArrayBufferProxyBase(BufferProxyBase):
+    __slots__ = ()
+
+    @property
+    def typecode(self) -> str:
+        return self.__target__.typecode
+
+    @property
+    def itemsize(self) -> int:
+        return self.__target__.itemsize
+
+
+def readonly_buffer_proxy_init(
+    self: BufferProxyBase, target: Any, readonly: bool = True, shallow: bool = False
+) -> None:
+    # The signature lines up with Proxy.__init__ so that proxy() can
+    # construct any proxy type positionally; the readonly argument is
+    # ignored, a readonly buffer proxy is always readonly
+    Proxy.__init__(self, target, True, shallow)
+
+
+# The proxy classes are assembled dynamically from the trap functions,
+# which the type system cannot see; cast them to their actual shape
+ArrayBufferProxy = cast(
+    "type[ArrayBufferProxyBase]",
+    type(
+        "ArrayBufferProxy",
+        (ArrayBufferProxyBase,),
+        {
+            "__slots__": (),
+            **construct_methods_traps_dict(array, array_traps, buffer_trap_map),
+        },
+    ),
+)
+ReadonlyArrayBufferProxy = cast(
+    "type[ArrayBufferProxyBase]",
+    type(
+        "ReadonlyArrayBufferProxy",
+        (ArrayBufferProxyBase,),
+        {
+            "__slots__": (),
+            "__init__": readonly_buffer_proxy_init,
+            **construct_methods_traps_dict(
+                array, array_traps, buffer_trap_map_readonly
+            ),
+        },
+    ),
+)
+BytearrayProxy = cast(
+    "type[BufferProxyBase]",
+    type(
+        "BytearrayProxy",
+        (BufferProxyBase,),
+        {
+            "__slots__": (),
+            **construct_methods_traps_dict(bytearray, bytearray_traps, buffer_trap_map),
+        },
+    ),
+)
+ReadonlyBytearrayProxy = cast(
+    "type[BufferProxyBase]",
+    type(
+        "ReadonlyBytearrayProxy",
+        (BufferProxyBase,),
+        {
+            "__slots__": (),
+            "__init__": readonly_buffer_proxy_init,
+            **construct_methods_traps_dict(
+                bytearray, bytearray_traps, buffer_trap_map_readonly
+            ),
+        },
+    ),
+)
+
+
+TYPE_LOOKUP[array] = (ArrayBufferProxy, ReadonlyArrayBufferProxy)
+TYPE_LOOKUP[bytearray] = (BytearrayProxy, ReadonlyBytearrayProxy)
+LEAF_TYPES.update((array, bytearray))
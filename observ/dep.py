@@ -5,42 +5,146 @@ are attached to observable datastructures.
 
 from __future__ import annotations
 
+from contextvars import ContextVar
 from operator import attrgetter
-from typing import TYPE_CHECKING, ClassVar
-from weakref import WeakSet
+from threading import RLock
+from typing import TYPE_CHECKING, Any
+from weakref import WeakSet, ref
 
 if TYPE_CHECKING:
+    from typing import Protocol
+
     from .watcher import Watcher
 
+    class Collector(Protocol):
+        """
+        Something that collects deps on the dependency stack: a
+        Watcher, or a single evaluation of an async watcher.
+        """
+
+        def add_dep(self, dep: Dep) -> None: ...
+
+
 sub_id = attrgetter("id")
 
+# The stack of watchers that are currently evaluating. Read traps
+# register the dep of whatever they read with the watcher on top of
+# the stack. It lives in a context variable, so that every thread
+# (and every context, e.g. an asyncio task that is given a context
+# of its own) collects dependencies on its own stack. The default is
+# an empty tuple, so that reading the stack never has to handle the
+# variable not being set: an empty stack is falsy either way
+dep_stack: ContextVar[list[Collector] | tuple[()]] = ContextVar(
+    "observ_dep_stack", default=()
+)
+# Bound method, for binding in closures of hot paths
+get_dep_stack = dep_stack.get
+
+# Guards the subscriber sets of all deps. A single (reentrant) lock
+# is enough: subscribers only change when a watcher gains or loses a
+# dependency, which is rare compared to reads. Reentrant, because a
+# watcher that is garbage collected while the lock is held removes
+# itself from its deps
+subs_lock = RLock()
+
+
+def push_watcher(watcher: Collector) -> list[Collector]:
+    """
+    Pushes the given watcher onto the dependency stack of the current
+    context, and returns the stack. Pop the watcher from the returned
+    stack when its evaluation is done.
+    """
+    stack = get_dep_stack()
+    if stack:
+        # Nested evaluation: the stack is owned by this context
+        stack.append(watcher)
+        return stack
+    # Start a fresh stack for every outermost evaluation, instead of
+    # reusing an empty one: the empty stack might have been inherited
+    # from the context of another thread (e.g. on free-threaded
+    # builds, where threads start with a copy of the context of the
+    # thread that started them)
+    stack_list = [watcher]
+    dep_stack.set(stack_list)
+    return stack_list
+
 
 class Dep:
     __slots__ = ("__weakref__", "_subs")
-    stack: ClassVar[list[Watcher]] = []
 
     def __init__(self) -> None:
-        self._subs: WeakSet[Watcher] | None = None
+        # The subscribers, held weakly. Most deps have at most a single
+        # subscriber, so the WeakSet (which is large, and slow to
+        # iterate) is only created once a second one subscribes:
+        # - None: no subscribers
+        # - a weakref: a single subscriber (which might have died)
+        # - a WeakSet: any number of subscribers
+        self._subs: ref[Watcher] | WeakSet[Watcher] | None = None
 
     def add_sub(self, sub: Watcher) -> None:
-        if self._subs is None:
-            self._subs = WeakSet()
-        self._subs.add(sub)
+        with subs_lock:
+            # Any-typed, since the type is checked with `type() is`
+            # (which is cheaper than isinstance, but doesn't narrow)
+            subs: Any = self._subs
+            if subs is None:
+                self._subs = ref(sub)
+            elif type(subs) is ref:
+                current = subs()
+                if current is None:
+                    self._subs = ref(sub)
+                elif current is not sub:
+                    self._subs = WeakSet((current, sub))
+            else:
+                subs.add(sub)
 
     def remove_sub(self, sub: Watcher) -> None:
-        if self._subs:
-            self._subs.remove(sub)
+        with subs_lock:
+            subs: Any = self._subs
+            if subs is None:
+                return
+            if type(subs) is ref:
+                current = subs()
+                if current is None or current is sub:
+                    self._subs = None
+            else:
+                subs.discard(sub)
+
+    def subscribers(self) -> list[Watcher]:
+        """
+        Returns the (live) subscribers.
+        """
+        with subs_lock:
+            subs: Any = self._subs
+            if subs is None:
+                return []
+            if type(subs) is ref:
+                sub = subs()
+                return [] if sub is None else [sub]
+            return list(subs)
 
     def depend(self) -> None:
-        if self.stack:
-            self.stack[-1].add_dep(self)
+        stack = get_dep_stack()
+        if stack:
+            stack[-1].add_dep(self)
 
     def notify(self) -> None:
+        subs: Any = self._subs
+        if subs is None:
+            return
+        if type(subs) is ref:
+            sub = subs()
+            if sub is not None:
+                sub.update()
+            return
         # just iterating over self._subs even if
         # it is empty is 10x slower
         # than putting this if-statement in front of it
         # because a weakset must acquire a lock on its
         # weak references before iterating
-        if self._subs:
-            for sub in sorted(self._subs, key=sub_id):
+        if subs:
+            # Take a snapshot under the lock, and notify outside of it:
+            # the subscribers re-subscribe while they update
+            with subs_lock:
+                snapshot = sorted(subs, key=sub_id)
+            for sub in snapshot:
                 sub.update()
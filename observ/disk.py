@@ -0,0 +1,666 @@
+"""
+Disk stores keep reactive trees that are too large to be resident in
+memory in a SQLite file. Every container of the tree is stored as a
+row of its own, and is only loaded when it is read through a proxy:
+until then, the containers nested inside a loaded container are stubs.
+Loaded containers are plain dicts, lists and sets, wrapped by the
+regular proxies (with the same traps and deps), and containers that
+are no longer referenced by a proxy or a watcher are evicted again.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import pickle
+import sqlite3
+from typing import TYPE_CHECKING, Any
+from weakref import WeakValueDictionary, ref
+
+from .dep import Dep, push_watcher
+from .proxy import PLAIN_TYPES, TYPE_LOOKUP, Lazy, Proxy, proxy
+from .proxy_db import MISSING, global_listeners, proxy_db
+from .watcher import traverse
+
+if TYPE_CHECKING:
+    from .proxy_db import Change, TargetDep
+
+PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+# The number of the row of the root container
+ROOT = 0
+
+# Kinds of references to nested containers in a row: containers that
+# are nested directly are loaded when they are read, containers inside
+# tuples (which can't be replaced by the loaded container) right away
+STUB = 0
+EAGER = 1
+
+
+class Stub(Lazy):
+    """
+    Stands in for a container that has not been loaded from its store
+    (yet). Reading it through a proxy loads it, and replaces the stub
+    in its parent. Comparing it to a value loads it as well.
+    """
+
+    __slots__ = ("key", "node", "parent", "store")
+
+    def __init__(
+        self,
+        store: ref[DiskStore] | None,
+        node: int,
+        parent: Any = None,
+        key: Any = None,
+    ) -> None:
+        self.store = store
+        self.node = node
+        # Where the stub is stored (as far as known), so that it can
+        # be replaced without searching its parent
+        self.parent = parent
+        self.key = key
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"<Stub node={self.node}>"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Proxy):
+            other = other.__target__
+        return self.load() == other
+
+    def load(self) -> Any:
+        store = self.store() if self.store is not None else None
+        if store is None:
+            raise RuntimeError("DiskStore of the stub is gone")
+        return store.load(self)
+
+    def dep(self) -> Dep:
+        store = self.store() if self.store is not None else None
+        if store is None:
+            # Can't be loaded anymore, so it won't be mutated either
+            return Dep()
+        return store.subtree_dep(self.node)
+
+
+def load_stub(stub: Stub, readonly: bool, shallow: bool) -> Any:
+    return proxy(stub.load(), readonly, shallow)
+
+
+# Stubs are loaded when proxy is called on them: that is the slow path
+# of proxy (there is no proxy for the target yet), so reads of other
+# values don't pay for it
+STUB_LOADER: Any = load_stub
+TYPE_LOOKUP[Stub] = (STUB_LOADER, STUB_LOADER)
+
+
+def find(parent: Any, key: Any, value: Any) -> Any:
+    """
+    Returns the key (or index) of the given value in the given dict
+    or list, trying the given key first. Returns MISSING when the
+    value is not in the parent (anymore).
+    """
+    try:
+        if parent[key] is value:
+            return key
+    except (KeyError, IndexError, TypeError):
+        pass
+    items = parent.items() if type(parent) is dict else enumerate(parent)
+    for other_key, other in items:
+        if other is value:
+            return other_key
+    return MISSING
+
+
+class DiskStore:
+    """
+    Keeps a reactive tree in the SQLite file at the given path, and
+    loads its containers lazily: use `state` (or `reactive(store.root)`)
+    to get the tree. The file is filled with initial (by default an
+    empty dict) when it is created.
+
+    Mutations (through proxies) are written back to the file on
+    `flush` (or right away, when sync is set), on eviction and on
+    `close`. The rows of containers that are removed from the tree
+    stay in the file until `compact` is called. When more than
+    max_resident containers are loaded, containers that are not
+    referenced by a proxy or a watcher are evicted (down to three
+    quarters of max_resident): they are replaced by stubs again.
+    Referenced containers can't be evicted, so loading doesn't evict
+    again until another quarter of max_resident containers has been
+    loaded. A deep watcher does not load the whole tree: it
+    depends on the containers that are not loaded as a whole (see
+    `subtree_dep`), and is notified of any mutation inside them once
+    they are loaded. Shallow proxies return unloaded containers as
+    stubs.
+    """
+
+    __slots__ = (
+        "__weakref__",
+        "_listener",
+        "connection",
+        "dirty",
+        "evicted_to",
+        "ids",
+        "last_node",
+        "max_resident",
+        "nodes",
+        "parents",
+        "root",
+        "subtree_deps",
+        "sync",
+        "weak_self",
+    )
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        initial: Any = None,
+        max_resident: int = 10_000,
+        sync: bool = False,
+    ) -> None:
+        self._listener: Any = None
+        self.max_resident = max_resident
+        self.sync = sync
+        self.weak_self: ref[DiskStore] = ref(self)
+        # node -> loaded container, id(container) -> node, and node ->
+        # (parent, key) of the loaded containers. The parent is None
+        # for containers that can't be evicted: the ones inside tuples
+        # and the ones that are shared between parents
+        self.nodes: dict[int, Any] = {}
+        self.ids: dict[int, int] = {}
+        self.parents: dict[int, tuple[Any, Any] | None] = {}
+        # The nodes that have been mutated since the last flush
+        self.dirty: set[int] = set()
+        # The number of containers that were left loaded by the last
+        # eviction of load
+        self.evicted_to = 0
+        # node -> dep of the containers that deep watchers met as stubs
+        self.subtree_deps: WeakValueDictionary[int, Dep] = WeakValueDictionary()
+        self.connection = sqlite3.connect(os.fspath(path))
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS nodes (id INTEGER PRIMARY KEY, data BLOB)"
+        )
+        (last_node,) = self.connection.execute("SELECT max(id) FROM nodes").fetchone()
+        if last_node is None:
+            # Write the initial tree (registering its containers for
+            # just as long as that takes), and load it lazily after
+            self.last_node = ROOT - 1
+            if isinstance(initial, Proxy):
+                initial = initial.__target__
+            self.add({} if initial is None else initial)
+            self.flush()
+            self.nodes.clear()
+            self.ids.clear()
+            self.parents.clear()
+        else:
+            self.last_node = last_node
+        self.root = self.fetch(ROOT)
+
+        # Holds the store weakly: the global listeners would keep it
+        # alive otherwise
+        weak_self = self.weak_self
+
+        def listener(dep: TargetDep, change: Change) -> None:
+            store = weak_self()
+            if store is not None:
+                store.record(dep, change)
+
+        self._listener = listener
+        global_listeners.append(listener)
+
+    def __del__(self) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of containers that are loaded.
+        """
+        return len(self.nodes)
+
+    @property
+    def state(self) -> Any:
+        """
+        Returns a proxy for the root of the tree.
+        """
+        return proxy(self.root)
+
+    def record(self, dep: TargetDep, change: Change) -> None:
+        node = self.ids.get(id(dep.target))
+        if node is None:
+            # Not part of the tree
+            return
+        self.dirty.add(node)
+        if self.sync:
+            self.flush()
+
+    def subtree_dep(self, node: int) -> Dep:
+        """
+        Returns the dep that deep watchers depend on for the given node
+        while it is not loaded. When it is loaded, the watchers are
+        subscribed to the loaded container (as if they had traversed
+        it), so that they see the mutations inside it. Held weakly, by
+        the watchers that depend on it.
+        """
+        dep = self.subtree_deps.get(node)
+        if dep is None:
+            dep = Dep()
+            self.subtree_deps[node] = dep
+        return dep
+
+    def add(self, container: Any) -> int:
+        """
+        Registers the given container as a new node of the tree.
+        """
+        self.last_node += 1
+        node = self.last_node
+        self.nodes[node] = container
+        self.ids[id(container)] = node
+        self.dirty.add(node)
+        return node
+
+    def link(self, value: Any, parent: Any, key: Any) -> Any:
+        """
+        Returns the given value of the given parent as it is written
+        to the row of the parent: containers are replaced by stubs.
+        """
+        if type(value) in PLAIN_TYPES:
+            return value
+        if isinstance(value, Proxy):
+            value = value.__target__
+        cls = type(value)
+        if cls is Stub:
+            return value
+        if cls is not dict and cls is not list and cls is not set:
+            return value
+        node = self.ids.get(id(value))
+        if node is None:
+            node = self.add(value)
+        self.place(node, parent, key)
+        return Stub(None, node)
+
+    def place(self, node: int, parent: Any, key: Any) -> None:
+        """
+        Records the given parent (and key) of the given loaded node.
+        """
+        parents = self.parents
+        current = parents.get(node, MISSING)
+        if current is None:
+            return
+        if current is not MISSING:
+            other = current[0]
+            if (
+                other is not parent
+                and self.nodes.get(self.ids.get(id(other), -1)) is other
+                and find(other, current[1], self.nodes[node]) is not MISSING
+            ):
+                # Also part of another loaded container
+                parents[node] = None
+                return
+        parents[node] = (parent, key)
+
+    def write(self, node: int) -> None:
+        container = self.nodes[node]
+        cls = type(container)
+        if cls is dict:
+            link = self.link
+            row: Any = {
+                key: link(value, container, key) for key, value in container.items()
+            }
+        elif cls is list:
+            link = self.link
+            row = [
+                link(value, container, index) for index, value in enumerate(container)
+            ]
+        else:
+            row = container
+        buffer = io.BytesIO()
+        NodePickler(buffer, self, row).dump(row)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO nodes VALUES (?, ?)", (node, buffer.getvalue())
+        )
+
+    def read(
+        self,
+        node: int,
+        memo: dict[int, Any],
+        loaded: list[tuple[int, Any]],
+        store: ref[DiskStore] | None,
+    ) -> Any:
+        """
+        Reads the given node from the file. The containers that it
+        refers to are looked up in memo, and are stubs (for the given
+        store) otherwise. Every container that is read (including the
+        ones inside tuples) is added to memo and to loaded.
+        """
+        row = self.connection.execute(
+            "SELECT data FROM nodes WHERE id = ?", (node,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Node {node} is missing from the store")
+        container = NodeUnpickler(row[0], self, memo, loaded, store).load()
+        memo[node] = container
+        loaded.append((node, container))
+        return container
+
+    def adopt(self, container: Any) -> None:
+        """
+        Records the given container as the parent of the stubs and
+        loaded containers nested directly inside it.
+        """
+        cls = type(container)
+        if cls is dict:
+            items: Any = container.items()
+        elif cls is list:
+            items = enumerate(container)
+        else:
+            return
+        ids = self.ids
+        for key, value in items:
+            if type(value) is Stub:
+                value.parent = container
+                value.key = key
+            else:
+                node = ids.get(id(value))
+                if node is not None:
+                    self.place(node, container, key)
+
+    def fetch(self, node: int) -> Any:
+        """
+        Loads the given node (and the containers inside its tuples).
+        """
+        loaded: list[tuple[int, Any]] = []
+        container = self.read(node, self.nodes, loaded, self.weak_self)
+        ids = self.ids
+        for other, other_container in loaded:
+            ids[id(other_container)] = other
+        for _, other_container in loaded:
+            self.adopt(other_container)
+        return container
+
+    def load(self, stub: Stub) -> Any:
+        """
+        Returns the container for the given stub, and replaces the
+        stub in its parent by it. Called by `proxy` for stubs.
+        """
+        node = stub.node
+        container = self.nodes.get(node)
+        if container is None:
+            max_resident = self.max_resident
+            margin = max(max_resident // 4, 1)
+            if len(self.nodes) >= max(max_resident, self.evicted_to + margin):
+                self.evict(max_resident - margin)
+                self.evicted_to = len(self.nodes)
+            container = self.fetch(node)
+        parent = stub.parent
+        if parent is not None:
+            key = find(parent, stub.key, stub)
+            if key is not MISSING:
+                # Not a mutation: the stub and the container stand for
+                # the same value
+                parent[key] = container
+                self.place(node, parent, key)
+        subtree_dep = self.subtree_deps.get(node)
+        if subtree_dep is not None:
+            watchers = subtree_dep.subscribers()
+            if watchers:
+                # The deps that traversing the container would depend
+                # on: its own, and the ones of its nested stubs
+                collector = DepCollector()
+                stack = push_watcher(collector)
+                try:
+                    traverse(proxy(container))
+                finally:
+                    stack.pop()
+                for watcher in watchers:
+                    watcher.add_deps(collector.deps)
+        return container
+
+    def evict(self, keep: int = 0) -> int:
+        """
+        Writes back the mutations, and unloads the containers that are
+        not referenced by a proxy or a watcher (except for the root),
+        until at most keep containers are loaded. Returns the number
+        of unloaded containers.
+        """
+        self.flush()
+        db = proxy_db.db
+        nodes = self.nodes
+        count = 0
+        # Nested containers are loaded after their parents, so unload
+        # in reverse order: parents are unloaded after their children
+        for node in reversed(list(nodes)):
+            if len(nodes) <= keep:
+                break
+            if node == ROOT:
+                continue
+            container = nodes[node]
+            weak_dep = db.get(id(container))
+            if weak_dep is not None and weak_dep() is not None:
+                continue
+            parent_key = self.parents.get(node)
+            if parent_key is None:
+                continue
+            parent, key = parent_key
+            # When the container is no longer part of its parent, it
+            # has been removed from the tree (moving it into another
+            # container would have updated its parent on flush)
+            key = find(parent, key, container)
+            while key is not MISSING:
+                parent[key] = Stub(self.weak_self, node, parent, key)
+                key = find(parent, key, container)
+            del nodes[node]
+            del self.ids[id(container)]
+            del self.parents[node]
+            count += 1
+        return count
+
+    def flush(self) -> None:
+        """
+        Writes the mutations to the file.
+        """
+        dirty = self.dirty
+        if not dirty:
+            return
+        # Writing a container adds the containers that were inserted
+        # into it as new nodes
+        while dirty:
+            self.write(dirty.pop())
+        self.connection.commit()
+
+    def compact(self) -> int:
+        """
+        Writes back the mutations, and deletes the rows of the
+        containers that are no longer part of the tree (e.g. the ones
+        that were replaced or removed). Containers that are referenced
+        by a proxy or a watcher are kept, along with the containers
+        nested inside them: they might still be added to the tree
+        again. Reads every row that is kept. Returns the number of
+        deleted rows.
+        """
+        self.flush()
+        connection = self.connection
+        nodes = self.nodes
+        db = proxy_db.db
+        reachable: set[int] = set()
+        stack = [ROOT]
+        for node, container in nodes.items():
+            weak_dep = db.get(id(container))
+            if weak_dep is not None and weak_dep() is not None:
+                stack.append(node)
+        while stack:
+            node = stack.pop()
+            if node in reachable:
+                continue
+            reachable.add(node)
+            row = connection.execute(
+                "SELECT data FROM nodes WHERE id = ?", (node,)
+            ).fetchone()
+            if row is not None:
+                stack.extend(references(row[0]))
+        garbage = [
+            (node,)
+            for (node,) in connection.execute("SELECT id FROM nodes")
+            if node not in reachable
+        ]
+        connection.executemany("DELETE FROM nodes WHERE id = ?", garbage)
+        connection.commit()
+        # Deleted containers that are still loaded are unloaded, so that
+        # they are written as new nodes if they are added again
+        for (node,) in garbage:
+            container = nodes.pop(node, None)
+            if container is not None:
+                del self.ids[id(container)]
+                self.parents.pop(node, None)
+        return len(garbage)
+
+    def to_raw(self) -> Any:
+        """
+        Returns a raw copy of the whole tree, read from the file (after
+        writing back the mutations), without loading it into the store.
+        """
+        self.flush()
+        memo: dict[int, Any] = {}
+        loaded: list[tuple[int, Any]] = []
+        root = self.read(ROOT, memo, loaded, None)
+        stack = [container for _, container in loaded]
+        while stack:
+            current = stack.pop()
+            cls = type(current)
+            if cls is dict:
+                items: Any = list(current.items())
+            elif cls is list:
+                items = list(enumerate(current))
+            else:
+                continue
+            for key, value in items:
+                if type(value) is not Stub:
+                    continue
+                container = memo.get(value.node)
+                if container is None:
+                    loaded = []
+                    container = self.read(value.node, memo, loaded, None)
+                    stack.extend(container for _, container in loaded)
+                current[key] = container
+        return root
+
+    def close(self) -> None:
+        """
+        Writes back the mutations, and closes the file. Stubs can't be
+        loaded anymore.
+        """
+        listener = self._listener
+        if listener is None:
+            return
+        self._listener = None
+        if listener in global_listeners:
+            global_listeners.remove(listener)
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self) -> DiskStore:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class DepCollector:
+    """
+    Collects the deps that are depended on while it is on top of the
+    dependency stack.
+    """
+
+    __slots__ = ("deps",)
+
+    def __init__(self) -> None:
+        self.deps: set[Dep] = set()
+
+    def add_dep(self, dep: Dep) -> None:
+        self.deps.add(dep)
+
+
+class NodePickler(pickle.Pickler):
+    """
+    Pickler that encodes the containers nested in a row as references
+    to their nodes.
+    """
+
+    def __init__(self, file: io.BytesIO, store: DiskStore, row: Any) -> None:
+        super().__init__(file, PROTOCOL)
+        self.store = store
+        self.row = row
+
+    def persistent_id(self, obj: Any) -> tuple[int, int] | None:
+        cls = type(obj)
+        if cls is Stub:
+            return (STUB, obj.node)
+        if obj is self.row:
+            return None
+        if isinstance(obj, Proxy):
+            obj = obj.__target__
+            cls = type(obj)
+        if cls is not dict and cls is not list and cls is not set:
+            return None
+        # A container inside a tuple: it is loaded along with the
+        # tuple, and can't be evicted
+        store = self.store
+        node = store.ids.get(id(obj))
+        if node is None:
+            node = store.add(obj)
+        store.parents[node] = None
+        return (EAGER, node)
+
+
+def references(data: bytes) -> list[int]:
+    """
+    Returns the nodes that the given row refers to.
+    """
+    unpickler = ReferenceUnpickler(io.BytesIO(data))
+    unpickler.load()
+    return unpickler.nodes
+
+
+class ReferenceUnpickler(pickle.Unpickler):
+    """
+    Unpickler that collects the nodes that a row refers to, without
+    resolving them.
+    """
+
+    def __init__(self, file: io.BytesIO) -> None:
+        super().__init__(file)
+        self.nodes: list[int] = []
+
+    def persistent_load(self, pid: Any) -> Any:
+        self.nodes.append(pid[1])
+        return None
+
+
+class NodeUnpickler(pickle.Unpickler):
+    """
+    Unpickler that resolves references to nodes, see `DiskStore.read`.
+    """
+
+    def __init__(
+        self,
+        data: bytes,
+        store: DiskStore,
+        memo: dict[int, Any],
+        loaded: list[tuple[int, Any]],
+        weak_store: ref[DiskStore] | None,
+    ) -> None:
+        super().__init__(io.BytesIO(data))
+        self.store = store
+        self.nodes = memo
+        self.loaded = loaded
+        self.weak_store = weak_store
+
+    def persistent_load(self, pid: Any) -> Any:
+        kind, node = pid
+        container = self.nodes.get(node)
+        if container is not None:
+            return container
+        if kind == STUB:
+            return Stub(self.weak_store, node)
+        return self.store.read(node, self.nodes, self.loaded, self.weak_store)
@@ -0,0 +1,176 @@
+"""
+Journals persist reactive state by appending its mutations to a file
+(see oplog), instead of re-serializing the whole state on every
+change. The file starts with a full snapshot of the state, and is
+compacted into a fresh snapshot every so often.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+from typing import TYPE_CHECKING, Any
+
+from .oplog import OpApplier, OpRecorder
+from .proxy import Proxy, proxy
+from .watcher import weak
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from typing import BinaryIO
+
+# Every record in a journal file is prefixed with its length
+HEADER = struct.Struct("<I")
+
+
+def read_records(fp: BinaryIO) -> Iterator[bytes]:
+    """
+    Yields the records in the given journal file. Stops at the first
+    incomplete record: the tail of a journal that was being written
+    when the process crashed.
+    """
+    header_size = HEADER.size
+    while True:
+        header = fp.read(header_size)
+        if len(header) < header_size:
+            return
+        (size,) = HEADER.unpack(header)
+        data = fp.read(size)
+        if len(data) < size:
+            return
+        yield data
+
+
+def load_journal(path: str | os.PathLike[str]) -> Any:
+    """
+    Returns the (reactive) state that is stored in the journal at the
+    given path, by replaying its mutations on top of its snapshot.
+    """
+    with open(path, "rb") as fp:
+        records = read_records(fp)
+        state = next(records, None)
+        if state is None:
+            raise ValueError("Journal does not contain a snapshot")
+        applier = OpApplier(state)
+        for data in records:
+            applier.apply(data)
+    return proxy(applier.root)
+
+
+class Journal:
+    """
+    Appends every mutation of the given proxy (and everything nested
+    inside it) to the file at the given path, which is overwritten
+    with a snapshot of the current state first. Use `Journal.open` to
+    continue a journal that already exists, and `load_journal` to
+    read one.
+
+    Writes are buffered: call `flush` to make sure that everything
+    up to that point has been written (and `flush(fsync=True)` to make
+    sure it survives a crash of the operating system as well). After
+    compact_every mutations, the journal is compacted: the file is
+    atomically replaced by a snapshot of the current state.
+    """
+
+    __slots__ = (
+        "__weakref__",
+        "buffer_size",
+        "compact_every",
+        "count",
+        "file",
+        "path",
+        "recorder",
+        "state",
+    )
+
+    def __init__(
+        self,
+        state: Proxy[Any] | Any,
+        path: str | os.PathLike[str],
+        compact_every: int | None = 100_000,
+        buffer_size: int = 1 << 16,
+    ) -> None:
+        if not isinstance(state, Proxy):
+            raise TypeError("Journal() expects a proxy")
+        self.state = state
+        self.path = os.fspath(path)
+        self.compact_every = compact_every
+        self.buffer_size = buffer_size
+        # The number of mutations since the last snapshot
+        self.count = 0
+        self.file: BinaryIO | None = None
+        # The recorder holds the journal weakly, to avoid a cycle
+        self.recorder = OpRecorder(state.__target__, weak(self, Journal.write))
+        self.compact()
+
+    @classmethod
+    def open(
+        cls,
+        path: str | os.PathLike[str],
+        compact_every: int | None = 100_000,
+        buffer_size: int = 1 << 16,
+    ) -> Journal:
+        """
+        Loads the state from the journal at the given path (available
+        as the `state` attribute of the returned journal), and
+        continues journaling its mutations: the journal is compacted
+        right away.
+        """
+        return cls(load_journal(path), path, compact_every, buffer_size)
+
+    def write(self, data: bytes) -> None:
+        file = self.file
+        if file is None:
+            return
+        file.write(HEADER.pack(len(data)))
+        file.write(data)
+        self.count += 1
+        compact_every = self.compact_every
+        if compact_every is not None and self.count >= compact_every:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Replaces the journal with a snapshot of the current state.
+        """
+        state = self.recorder.reset()
+        if self.file is not None:
+            self.file.close()
+        # Write the snapshot to a new file, and move it into place, so
+        # that there always is a complete journal on disk
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as fp:
+            fp.write(HEADER.pack(len(state)))
+            fp.write(state)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp_path, self.path)
+        self.file = open(self.path, "ab", buffering=self.buffer_size)
+        self.count = 0
+
+    def flush(self, fsync: bool = False) -> None:
+        """
+        Writes all buffered mutations to the file.
+        """
+        file = self.file
+        if file is None:
+            return
+        file.flush()
+        if fsync:
+            os.fsync(file.fileno())
+
+    def close(self) -> None:
+        """
+        Stops journaling, and closes the file.
+        """
+        self.recorder.close()
+        file = self.file
+        if file is not None:
+            self.file = None
+            file.close()
+
+    def __enter__(self) -> Journal:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,195 @@
+"""
+Mirrors replicate reactive state to other processes: a primary sends
+the mutations of its state as batches of ops (see oplog), and
+replicas apply them to their own copy of the state, so that watchers
+fire on both sides.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import TYPE_CHECKING, Any
+from weakref import ref
+
+from .oplog import OpApplier, OpRecorder
+from .proxy import Proxy, proxy
+from .scheduler import scheduler
+from .scope import active_scope
+from .watcher import Watcher, weak
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from multiprocessing.connection import Connection
+
+# Every message starts with its kind: the (encoded) state to start
+# from, or a batch of length-prefixed ops
+SNAPSHOT = b"S"
+BATCH = b"B"
+HEADER = struct.Struct("<I")
+
+
+def pack_batch(ops: list[bytes]) -> bytes:
+    pack = HEADER.pack
+    parts = [BATCH]
+    for op in ops:
+        parts.append(pack(len(op)))
+        parts.append(op)
+    return b"".join(parts)
+
+
+def unpack_batch(message: bytes) -> Iterator[bytes]:
+    unpack_from = HEADER.unpack_from
+    header_size = HEADER.size
+    offset = 1
+    end = len(message)
+    while offset < end:
+        (size,) = unpack_from(message, offset)
+        offset += header_size
+        yield message[offset : offset + size]
+        offset += size
+
+
+class Primary:
+    """
+    Sends the state of the given proxy (and everything nested inside
+    it) to replicas through send, which is called with a message
+    (bytes): first the whole state, and after that the mutations of
+    the state, batched per flush of the scheduler. For example, pass
+    the send_bytes method of a multiprocessing Connection (which also
+    works across unix sockets, see multiprocessing.connection).
+
+    sync: Send every mutation right away, instead of batching them
+        until the next flush of the scheduler.
+    """
+
+    __slots__ = (
+        "__weakref__",
+        "flusher",
+        "pending",
+        "recorder",
+        "send",
+        "state",
+        "sync",
+    )
+
+    def __init__(
+        self,
+        state: Proxy[Any] | Any,
+        send: Callable[[bytes], Any],
+        sync: bool = False,
+    ) -> None:
+        if not isinstance(state, Proxy):
+            raise TypeError("Primary() expects a proxy")
+        self.state = state
+        self.send = send
+        self.sync = sync
+        self.pending: list[bytes] = []
+        # Queued on the scheduler to send the pending ops. It belongs
+        # to this primary, so it is not captured by the active scope
+        token = active_scope.set(None)
+        try:
+            self.flusher = BatchFlusher(self)
+        finally:
+            active_scope.reset(token)
+        # The recorder holds the primary weakly, to avoid a cycle
+        self.recorder = OpRecorder(state.__target__, weak(self, Primary.record))
+        self.resync()
+
+    def record(self, op: bytes) -> None:
+        pending = self.pending
+        pending.append(op)
+        if self.sync:
+            self.flush()
+        elif len(pending) == 1:
+            scheduler.queue(self.flusher)
+
+    def flush(self) -> None:
+        """
+        Sends the mutations that haven't been sent yet.
+        """
+        pending = self.pending
+        if pending:
+            self.pending = []
+            self.send(pack_batch(pending))
+
+    def resync(self) -> None:
+        """
+        Sends the whole state again. Replicas replace the contents of
+        their state with it. This also releases the containers that
+        have been removed from the state (the primary keeps those
+        alive until the next resync).
+        """
+        self.flush()
+        self.send(SNAPSHOT + self.recorder.reset())
+
+    def close(self) -> None:
+        """
+        Sends the pending mutations, and stops sending mutations.
+        """
+        self.flush()
+        self.recorder.close()
+
+
+class BatchFlusher(Watcher[None]):
+    """
+    Stand-in watcher that sends the pending ops of a primary when the
+    scheduler flushes.
+    """
+
+    __slots__ = ("primary",)
+
+    def __init__(self, primary: Primary) -> None:
+        self.primary = ref(primary)
+        super().__init__(lambda: None, lazy=True)
+
+    def run(self) -> None:
+        primary = self.primary()
+        if primary is not None:
+            primary.flush()
+
+
+class Replica:
+    """
+    Applies the messages of a `Primary` to its own copy of the state,
+    available as `state` once the first message has been applied.
+    Mutations are applied through proxies, so watchers of the state
+    fire as if the state was mutated locally. Mutating the state of
+    a replica locally is not supported.
+    """
+
+    __slots__ = ("applier", "state")
+
+    def __init__(self) -> None:
+        self.applier: OpApplier | None = None
+        self.state: Any = None
+
+    def apply(self, message: bytes) -> None:
+        """
+        Applies the given message of the primary.
+        """
+        kind = message[:1]
+        if kind == SNAPSHOT:
+            applier = self.applier
+            if applier is None:
+                applier = self.applier = OpApplier(message[1:])
+                self.state = proxy(applier.root)
+            else:
+                applier.reset(message[1:])
+            return
+        applier = self.applier
+        if applier is None:
+            raise RuntimeError("Replica has not received the state yet")
+        apply = applier.apply
+        for op in unpack_batch(message):
+            apply(op)
+
+    def receive(self, connection: Connection) -> int:
+        """
+        Applies all messages that are available on the given
+        connection without blocking, and returns their number.
+        """
+        count = 0
+        while connection.poll():
+            self.apply(connection.recv_bytes())
+            count += 1
+        return count
@@ -0,0 +1,237 @@
+"""
+Proxies for instances of dataclasses and classes with __slots__, see
+`reactive_class`. Attributes are tracked like the keys of a dict:
+every attribute has its own keydep.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from typing import Any
+
+from .dep import get_dep_stack
+from .proxy import OBJECT_FIELDS, TYPE_LOOKUP, Proxy, proxy
+from .proxy_db import MISSING, global_listeners
+from .traps import ReadonlyError
+
+# The attributes of the proxy itself, which are set on the proxy
+PROXY_SLOTS = frozenset({"__dep__", "__readonly__", "__shallow__", "__target__"})
+
+
+def instance_fields(cls: type) -> frozenset[str]:
+    """
+    Returns the names of the instance attributes of the given class:
+    its slots (including those of its bases) and its dataclass fields.
+    """
+    names: set[str] = set()
+    for base in cls.__mro__:
+        slots = base.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        for slot in slots:
+            if slot in ("__dict__", "__weakref__"):
+                continue
+            if slot.startswith("__") and not slot.endswith("__"):
+                # Private names are mangled
+                slot = f"_{base.__name__.lstrip('_')}{slot}"
+            names.add(slot)
+    if dataclasses.is_dataclass(cls):
+        names.update(field.name for field in dataclasses.fields(cls))
+    return frozenset(names)
+
+
+def class_attribute(cls: type, name: str) -> Any:
+    """
+    Returns the attribute with the given name as defined on the given
+    class (or its bases), without invoking descriptors.
+    """
+    for base in cls.__mro__:
+        if name in base.__dict__:
+            return base.__dict__[name]
+    return MISSING
+
+
+def reactive_class[C: type](cls: C) -> C:
+    """
+    Registers the given dataclass or class with __slots__, so that its
+    instances are proxied (by `reactive` and when read from reactive
+    state) instead of being returned as-is. Can be used as a class
+    decorator. Only the exact class is registered, not its subclasses.
+
+    Reads of the instance attributes (the slots and dataclass fields)
+    through a proxy are tracked per attribute, and writes notify the
+    watchers of the attribute when the value changes. Methods and
+    properties are bound to the proxy, so that the attributes they use
+    are tracked as well. Journals, mirrors and disk stores store
+    instances as values: attribute writes are not recorded by them.
+
+    Proxies compare and hash like their targets, and proxies of
+    dataclass instances pass for dataclass instances (for
+    `dataclasses.fields` and `dataclasses.asdict`). Note that asdict
+    copies the containers in the fields as they are: dataclass
+    instances nested in those are not converted to dicts.
+    """
+    fields = instance_fields(cls)
+    if not fields:
+        raise TypeError(
+            f"reactive_class() expects a dataclass or a class with __slots__, "
+            f"got {cls.__name__}"
+        )
+    OBJECT_FIELDS[cls] = fields
+    if dataclasses.is_dataclass(cls):
+        # The dataclasses functions look up the fields on the class of
+        # the instance, so every dataclass gets its own proxy classes
+        namespace = {"__slots__": (), "__dataclass_fields__": cls.__dataclass_fields__}
+        TYPE_LOOKUP[cls] = (
+            type(f"{cls.__name__}Proxy", (ObjectProxy,), namespace),
+            type(f"Readonly{cls.__name__}Proxy", (ReadonlyObjectProxy,), namespace),
+        )
+    else:
+        TYPE_LOOKUP[cls] = (ObjectProxy, ReadonlyObjectProxy)
+    return cls
+
+
+class ObjectProxy(Proxy[Any]):
+    """
+    Proxy for an instance of a class that has been registered with
+    `reactive_class`.
+    """
+
+    __slots__ = ()
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for names that are not attributes of the proxy
+        target = self.__target__
+        cls = type(target)
+        if name in OBJECT_FIELDS[cls]:
+            stack = get_dep_stack()
+            if stack:
+                stack[-1].add_dep(self.__dep__.keydep(name))
+            value = getattr(target, name)
+            if self.__shallow__:
+                return value
+            return proxy(value, self.__readonly__)
+        attribute = class_attribute(cls, name)
+        if hasattr(attribute, "__get__"):
+            # Methods and properties run against the proxy
+            return attribute.__get__(self, cls)
+        return getattr(target, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in PROXY_SLOTS:
+            object.__setattr__(self, name, value)
+            return
+        if self.__readonly__:
+            raise ReadonlyError()
+        target = self.__target__
+        cls = type(target)
+        if name not in OBJECT_FIELDS[cls]:
+            attribute = class_attribute(cls, name)
+            if hasattr(type(attribute), "__set__"):
+                # Property setters run against the proxy
+                attribute.__set__(self, value)
+                return
+        old_value = getattr(target, name, MISSING)
+        setattr(target, name, value)
+        new_value = getattr(target, name)
+        # Same comparison as write_key_trap
+        if old_value is not new_value and (
+            old_value is MISSING
+            or (old_value is None) != (new_value is None)
+            or old_value != new_value
+        ):
+            dep = self.__dep__
+            if dep.listeners is not None or global_listeners:
+                dep.emit(("set", name, old_value, new_value))
+            keydeps = dep.keydeps
+            if keydeps is not None:
+                keydep = keydeps.get(name)
+                if keydep is not None:
+                    keydep.notify()
+            dep.notify()
+
+    def __delattr__(self, name: str) -> None:
+        if self.__readonly__:
+            raise ReadonlyError()
+        target = self.__target__
+        old_value = getattr(target, name, MISSING)
+        delattr(target, name)
+        if old_value is MISSING:
+            return
+        dep = self.__dep__
+        if dep.listeners is not None or global_listeners:
+            dep.emit(("delete", name, old_value))
+        keydeps = dep.keydeps
+        if keydeps is not None:
+            keydep = keydeps.get(name)
+            if keydep is not None:
+                keydep.notify()
+        dep.notify()
+
+    def __eq__(self, other: object) -> bool:
+        stack = get_dep_stack()
+        if stack:
+            stack[-1].add_dep(self.__dep__)
+        if isinstance(other, Proxy):
+            other = other.__target__
+        return self.__target__ == other
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    def __lt__(self, other: object) -> bool:
+        stack = get_dep_stack()
+        if stack:
+            stack[-1].add_dep(self.__dep__)
+        if isinstance(other, Proxy):
+            other = other.__target__
+        return self.__target__ < other
+
+    def __le__(self, other: object) -> bool:
+        stack = get_dep_stack()
+        if stack:
+            stack[-1].add_dep(self.__dep__)
+        if isinstance(other, Proxy):
+            other = other.__target__
+        return self.__target__ <= other
+
+    def __gt__(self, other: object) -> bool:
+        stack = get_dep_stack()
+        if stack:
+            stack[-1].add_dep(self.__dep__)
+        if isinstance(other, Proxy):
+            other = other.__target__
+        return self.__target__ > other
+
+    def __ge__(self, other: object) -> bool:
+        stack = get_dep_stack()
+        if stack:
+            stack[-1].add_dep(self.__dep__)
+        if isinstance(other, Proxy):
+            other = other.__target__
+        return self.__target__ >= other
+
+    def __hash__(self) -> int:
+        # Hashes like the target (e.g. a frozen dataclass), so that a
+        # proxy can be used in sets and as a key wherever its target
+        # can. Unhashable targets raise a TypeError
+        stack = get_dep_stack()
+        if stack:
+            stack[-1].add_dep(self.__dep__)
+        return hash(self.__target__)
+
+    def __repr__(self) -> str:
+        stack = get_dep_stack()
+        if stack:
+            stack[-1].add_dep(self.__dep__)
+        return repr(self.__target__)
+
+
+class ReadonlyObjectProxy(ObjectProxy):
+    __slots__ = ()
+
+    def __init__(self, target: Any, readonly: bool = True, shallow: bool = False):
+        # The signature lines up with Proxy.__init__ so that proxy() can
+        # construct any proxy type positionally; the readonly argument
+        # is ignored, a ReadonlyObjectProxy is always readonly
+        super().__init__(target, True, shallow)
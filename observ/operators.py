@@ -0,0 +1,883 @@
+"""
+Reactive collection operators derive state from the items of a
+reactive list and keep it up to date incrementally.
+
+A computed that maps or filters a list re-runs its function for every
+item whenever anything about the list changes. An operator instead
+listens to the splices that are made to its source list (see
+TargetDep.emit) and only evaluates its function for the inserted
+items, while a watcher per item re-evaluates the function for a
+single item when the state that it read for that item changes.
+
+The results are readonly reactive proxies that other watchers can
+depend on like on any other reactive state. An operator lives for as
+long as its result can be observed.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from functools import partial
+from itertools import count
+from operator import add, itemgetter, sub
+from typing import TYPE_CHECKING, Any, ClassVar, cast
+from weakref import WeakMethod, ref
+
+from .dict_proxy import DictProxyBase
+from .list_proxy import ListProxyBase
+from .proxy import Proxy, proxy
+from .proxy_db import MISSING
+from .scope import active_scope
+from .watcher import Watcher
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Sequence
+
+    from .proxy import Ref
+    from .proxy_db import Change, TargetDep
+
+
+def listen_weakly(dep: TargetDep, method: Callable[[Any, Change], Any]) -> None:
+    """
+    Registers the given bound method as listener on the dep without
+    keeping its object alive. The listener removes itself from the
+    dep once the object is gone.
+    """
+    weak_dep = ref(dep)
+
+    def remove(_: Any) -> None:
+        dep = weak_dep()
+        if dep is not None:
+            dep.remove_listener(listener)
+
+    weak_method = WeakMethod(method, remove)
+
+    def listener(target: Any, change: Change) -> None:
+        method = weak_method()
+        if method is not None:
+            method(target, change)
+
+    dep.add_listener(listener)
+
+
+class ItemWatcher(Watcher[Any]):
+    """
+    Watcher that evaluates the function of an operator for a single
+    item. Instead of re-evaluating itself when notified, it hands
+    itself to its operator, which re-evaluates it and updates the
+    result of the operator.
+    """
+
+    __slots__ = ("key", "operator")
+
+    # The key of the item for dict sources, or its index for list
+    # sources (which its operator updates when items are spliced)
+    key: Any
+    operator: ref[ItemOperator]
+
+    def update(self) -> None:
+        operator = self.operator()
+        if operator is not None and self._active:
+            operator.item_changed(self)
+
+
+class ItemOperator(ABC):
+    """
+    Base class for operators that derive state from every item of a
+    reactive list (or of the values of a reactive dict, for operators
+    that accept dict sources). Keeps the result of fn for every item
+    of the source in `values`, in step with the source. Subclasses
+    maintain their result from the `splice` and `replace` calls that
+    describe how `values` changed.
+
+    For dict sources, `values` and `watchers` are dicts, and the index
+    of the `splice` and `replace` calls is the key of the changed item.
+    Setting or deleting a key is described as a splice of at most one
+    item at that key.
+
+    Items for which fn reads no reactive state get no watcher. When fn
+    is None, the values are the (raw) items themselves.
+    """
+
+    __slots__ = (
+        "__weakref__",
+        "fn",
+        "keyed",
+        "source",
+        "target",
+        "values",
+        "watchers",
+    )
+
+    # The proxy types that are accepted as source
+    sources: ClassVar[tuple[type, ...]] = (ListProxyBase,)
+
+    source: Proxy[Any]
+    target: Any
+    keyed: bool
+    fn: Callable[[Any], Any] | None
+    values: Any
+    watchers: Any
+
+    def __init__(self, source: Any, fn: Callable[[Any], Any] | None) -> None:
+        if not isinstance(source, self.sources):
+            kinds = " or ".join(
+                cls.__name__.removesuffix("ProxyBase").lower() for cls in self.sources
+            )
+            raise TypeError(f"{type(self).__name__} expects a reactive {kinds}")
+        # The strong reference to the source proxy keeps the source
+        # dep (and with it the listener below) alive
+        self.source = source
+        self.target = target = source.__target__
+        self.keyed = isinstance(source, DictProxyBase)
+        self.fn = fn
+        if self.keyed:
+            values, watchers = self.evaluate(list(target.values()), list(target))
+            self.values = dict(zip(target, values))
+            self.watchers = dict(zip(target, watchers))
+        else:
+            self.values, self.watchers = self.evaluate(target, range(len(target)))
+        listen_weakly(source.__dep__, self.changed)
+
+    def evaluate(
+        self, items: list[Any], keys: Sequence[Any]
+    ) -> tuple[list[Any], list[Any]]:
+        """
+        Returns the values and watchers for the given (raw) items,
+        which are stored under the given keys (indices for list
+        sources).
+        """
+        fn = self.fn
+        if fn is None:
+            return list(items), [None] * len(items)
+        readonly = self.source.__readonly__
+        shallow = self.source.__shallow__
+        weak_self: ref[ItemOperator] = ref(self)
+        values = []
+        watchers = []
+        # The watchers belong to this operator, so they are not
+        # captured by the effect scope that happens to be active
+        # (stopping that scope would leave the result stale)
+        token = active_scope.set(None)
+        try:
+            for position, item in enumerate(items):
+                if not shallow:
+                    item = proxy(item, readonly)
+                watcher = ItemWatcher(partial(fn, item))
+                watcher.operator = weak_self
+                watcher.key = keys[position]
+                watcher.evaluate()
+                value = watcher.value
+                # Results are stored raw, like any value in a container
+                if isinstance(value, Proxy):
+                    value = value.__target__
+                values.append(value)
+                watchers.append(watcher if watcher._deps else None)
+        finally:
+            active_scope.reset(token)
+        return values, watchers
+
+    def changed(self, target: Any, change: Change) -> None:
+        """
+        Listener for the source: re-evaluates the changed items.
+        """
+        if self.keyed:
+            self.changed_key(change)
+            return
+        _, index, removed, inserted = change
+        stop = index + len(removed)
+        for watcher in self.watchers[index:stop]:
+            if watcher is not None:
+                watcher.stop()
+        values, watchers = self.evaluate(inserted, range(index, index + len(inserted)))
+        old_values = self.values[index:stop]
+        self.values[index:stop] = values
+        self.watchers[index:stop] = watchers
+        if len(inserted) != len(removed):
+            # The items after the splice moved
+            all_watchers = self.watchers
+            for position in range(index + len(inserted), len(all_watchers)):
+                watcher = all_watchers[position]
+                if watcher is not None:
+                    watcher.key = position
+        self.splice(index, old_values, values, removed, inserted)
+
+    def changed_key(self, change: Change) -> None:
+        """
+        Handles a change of a dict source.
+        """
+        kind, key, old_item = change[:3]
+        watcher = self.watchers.pop(key, None)
+        if watcher is not None:
+            watcher.stop()
+        old_value = self.values.pop(key, MISSING)
+        old_values = [] if old_value is MISSING else [old_value]
+        removed = [] if old_item is MISSING else [old_item]
+        if kind == "set":
+            item = change[3]
+            values, watchers = self.evaluate([item], [key])
+            self.values[key] = values[0]
+            self.watchers[key] = watchers[0]
+            self.splice(key, old_values, values, removed, [item])
+        else:
+            self.splice(key, old_values, [], removed, [])
+
+    def item_changed(self, watcher: ItemWatcher) -> None:
+        """
+        Re-evaluates the item of the given watcher.
+        """
+        index = watcher.key
+        old_value = self.values[index]
+        watcher.evaluate()
+        value = watcher.value
+        if isinstance(value, Proxy):
+            value = value.__target__
+        self.values[index] = value
+        if not watcher._deps:
+            self.watchers[index] = None
+        self.replace(index, old_value, value)
+
+    @abstractmethod
+    def splice(
+        self,
+        index: Any,
+        old_values: list[Any],
+        values: list[Any],
+        removed: list[Any],
+        items: list[Any],
+    ) -> None:
+        """
+        Called when the (raw) items in removed at index, with the given
+        old values, were replaced by the items with the given values.
+        """
+
+    @abstractmethod
+    def replace(self, index: Any, old_value: Any, value: Any) -> None:
+        """
+        Called when the value of the item at index changed.
+        """
+
+    def result[R](self, output: R) -> R:
+        """
+        Returns a readonly proxy for the given output, which keeps
+        this operator alive.
+        """
+        # An Any-typed local: the type system sees the proxy as an R
+        result: Any = proxy(output, readonly=True)
+        result.__dep__.maintainer = self
+        return result
+
+
+class MapOperator(ItemOperator):
+    __slots__ = ("output",)
+
+    def __init__(self, source: Any, fn: Callable[[Any], Any]) -> None:
+        super().__init__(source, fn)
+        self.output = self.values[:]
+
+    def splice(
+        self,
+        index: Any,
+        old_values: list[Any],
+        values: list[Any],
+        removed: list[Any],
+        items: list[Any],
+    ) -> None:
+        proxy(self.output)[index : index + len(old_values)] = values
+
+    def replace(self, index: int, old_value: Any, value: Any) -> None:
+        proxy(self.output)[index] = value
+
+
+class PrefixSums:
+    """
+    Fenwick tree over a list of numbers: changing a number and summing
+    the numbers before an index both cost O(log n).
+    """
+
+    __slots__ = ("tree",)
+
+    tree: list[int]
+
+    def __init__(self, numbers: list[int]) -> None:
+        self.rebuild(numbers)
+
+    def rebuild(self, numbers: list[int]) -> None:
+        """
+        Replaces the numbers, in O(n).
+        """
+        # Node i (1-based) holds the sum of the numbers in
+        # (i - lowbit(i), i]
+        tree = [0, *numbers]
+        size = len(tree)
+        for i in range(1, size):
+            parent = i + (i & -i)
+            if parent < size:
+                tree[parent] += tree[i]
+        self.tree = tree
+
+    def append(self, number: int) -> None:
+        tree = self.tree
+        i = len(tree)
+        low = i - (i & -i)
+        total = number
+        j = i - 1
+        while j > low:
+            total += tree[j]
+            j -= j & -j
+        tree.append(total)
+
+    def add(self, index: int, delta: int) -> None:
+        """
+        Adds delta to the number at index.
+        """
+        tree = self.tree
+        size = len(tree)
+        i = index + 1
+        while i < size:
+            tree[i] += delta
+            i += i & -i
+
+    def prefix(self, index: int) -> int:
+        """
+        Returns the sum of the numbers before index.
+        """
+        tree = self.tree
+        total = 0
+        while index > 0:
+            total += tree[index]
+            index -= index & -index
+        return total
+
+
+class FilterOperator(ItemOperator):
+    __slots__ = ("counts", "output")
+
+    def __init__(self, source: Any, predicate: Callable[[Any], Any]) -> None:
+        super().__init__(source, lambda item: bool(predicate(item)))
+        self.output = [item for item, keep in zip(self.target, self.values) if keep]
+        # The number of kept items before every index
+        self.counts = PrefixSums(self.values)
+
+    def position(self, index: int) -> int:
+        """
+        Returns the position in the output for the item at index.
+        """
+        return self.counts.prefix(index)
+
+    def splice(
+        self,
+        index: Any,
+        old_values: list[Any],
+        values: list[Any],
+        removed: list[Any],
+        items: list[Any],
+    ) -> None:
+        start = self.position(index)
+        kept = [item for item, keep in zip(items, values) if keep]
+        proxy(self.output)[start : start + sum(old_values)] = kept
+        counts = self.counts
+        if len(old_values) == len(values):
+            for offset, (old_value, value) in enumerate(zip(old_values, values)):
+                if old_value != value:
+                    counts.add(index + offset, value - old_value)
+        elif not old_values and index + len(values) == len(self.values):
+            for value in values:
+                counts.append(value)
+        else:
+            counts.rebuild(self.values)
+
+    def replace(self, index: int, old_value: Any, value: Any) -> None:
+        if old_value == value:
+            return
+        position = self.position(index)
+        self.counts.add(index, value - old_value)
+        if value:
+            proxy(self.output).insert(position, self.target[index])
+        else:
+            del proxy(self.output)[position]
+
+
+class ReduceOperator(ItemOperator):
+    __slots__ = ("add", "output", "remove")
+
+    def __init__(
+        self,
+        source: Any,
+        fn: Callable[[Any], Any] | None,
+        add: Callable[[Any, Any], Any],
+        remove: Callable[[Any, Any], Any],
+        initial: Any,
+    ) -> None:
+        super().__init__(source, fn)
+        self.add = add
+        self.remove = remove
+        value = initial
+        for item_value in self.values:
+            value = add(value, item_value)
+        self.output = {"value": value}
+
+    def splice(
+        self,
+        index: Any,
+        old_values: list[Any],
+        values: list[Any],
+        removed: list[Any],
+        items: list[Any],
+    ) -> None:
+        value = self.output["value"]
+        for old_value in old_values:
+            value = self.remove(value, old_value)
+        for new_value in values:
+            value = self.add(value, new_value)
+        proxy(self.output)["value"] = value
+
+    def replace(self, index: int, old_value: Any, value: Any) -> None:
+        proxy(self.output)["value"] = self.add(
+            self.remove(self.output["value"], old_value), value
+        )
+
+
+class RecordOperator(ItemOperator):
+    """
+    Base class for operators that organize the records of a reactive
+    list or dict by the value of a key. Subclasses maintain their
+    result from `add_record` and `remove_record` calls.
+    """
+
+    __slots__ = ()
+
+    sources = (ListProxyBase, DictProxyBase)
+
+    def __init__(self, source: Any, key: Any) -> None:
+        super().__init__(source, key if callable(key) else itemgetter(key))
+
+    def records(self) -> zip[tuple[Any, Any]]:
+        """
+        Returns the (raw) records of the source with their values.
+        """
+        if self.keyed:
+            return zip(self.target.values(), self.values.values())
+        return zip(self.target, self.values)
+
+    def splice(
+        self,
+        index: Any,
+        old_values: list[Any],
+        values: list[Any],
+        removed: list[Any],
+        items: list[Any],
+    ) -> None:
+        for record, value in zip(removed, old_values):
+            self.remove_record(record, value)
+        for record, value in zip(items, values):
+            self.add_record(record, value)
+
+    def replace(self, index: Any, old_value: Any, value: Any) -> None:
+        if old_value == value:
+            return
+        record = self.target[index]
+        self.remove_record(record, old_value)
+        self.add_record(record, value)
+
+    @abstractmethod
+    def add_record(self, record: Any, value: Any) -> None:
+        """
+        Called when the given (raw) record with the given value was
+        added to the source.
+        """
+
+    @abstractmethod
+    def remove_record(self, record: Any, value: Any) -> None:
+        """
+        Called when the given (raw) record with the given value was
+        removed from the source.
+        """
+
+
+def position_of(records: list[Any], record: Any) -> int:
+    """
+    Returns the position of the given record in the given list,
+    compared by identity instead of equality.
+    """
+    for position, candidate in enumerate(records):
+        if candidate is record:
+            return position
+    raise ValueError("record not found")
+
+
+class IndexOperator(RecordOperator):
+    __slots__ = ("output", "records_by_key")
+
+    def __init__(self, source: Any, key: Any) -> None:
+        super().__init__(source, key)
+        # All records per key, so that another record can take the
+        # place of a record that is removed from the index
+        self.records_by_key: dict[Any, list[Any]] = {}
+        for record, value in self.records():
+            self.records_by_key.setdefault(value, []).append(record)
+        self.output = {
+            value: records[-1] for value, records in self.records_by_key.items()
+        }
+
+    def add_record(self, record: Any, value: Any) -> None:
+        records = self.records_by_key.get(value)
+        if records is None:
+            self.records_by_key[value] = [record]
+        else:
+            records.append(record)
+        proxy(self.output)[value] = record
+
+    def remove_record(self, record: Any, value: Any) -> None:
+        records = self.records_by_key[value]
+        del records[position_of(records, record)]
+        if records:
+            proxy(self.output)[value] = records[-1]
+        else:
+            del self.records_by_key[value]
+            del proxy(self.output)[value]
+
+
+class GroupOperator(RecordOperator):
+    __slots__ = ("output",)
+
+    def __init__(self, source: Any, key: Any) -> None:
+        super().__init__(source, key)
+        self.output: dict[Any, list[Any]] = {}
+        for record, value in self.records():
+            self.output.setdefault(value, []).append(record)
+
+    def add_record(self, record: Any, value: Any) -> None:
+        group = self.output.get(value)
+        if group is None:
+            proxy(self.output)[value] = [record]
+        else:
+            proxy(group).append(record)
+
+    def remove_record(self, record: Any, value: Any) -> None:
+        group = self.output[value]
+        if len(group) == 1:
+            del proxy(self.output)[value]
+        else:
+            del proxy(group)[position_of(group, record)]
+
+
+class Descending:
+    """
+    Wraps a sort key to sort in descending order.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Descending) and self.value == other.value
+
+    def __lt__(self, other: Descending) -> bool:
+        return other.value < self.value
+
+
+class SortedOperator(ItemOperator):
+    """
+    Keeps the items of the source in sorted order in its output. Every
+    item gets a sequence number when it enters the view, which breaks
+    ties between equal sort keys, so that every item has an exact
+    position in `entries`: the (sort key, sequence number) pairs that
+    run parallel to the output.
+    """
+
+    __slots__ = ("counter", "entries", "output", "reverse", "sequence")
+
+    entries: list[tuple[Any, int]]
+    output: list[Any]
+
+    # Splices that add or remove more items than this rebuild the
+    # output in one go instead of moving the items one by one
+    rebuild_threshold: ClassVar[int] = 16
+
+    def __init__(
+        self, source: Any, key: Callable[[Any], Any] | None, reverse: bool
+    ) -> None:
+        super().__init__(source, key)
+        self.reverse = reverse
+        self.counter = count()
+        # The sequence number of every item of the source
+        self.sequence = [next(self.counter) for _ in self.values]
+        self.entries, self.output = self.sort()
+
+    def sort_key(self, value: Any) -> Any:
+        return Descending(value) if self.reverse else value
+
+    def sort(self) -> tuple[list[tuple[Any, int]], list[Any]]:
+        """
+        Returns the sorted entries and output for the whole source.
+        """
+        sort_key = self.sort_key
+        # Sequence numbers are unique, so items are never compared
+        rows = sorted(
+            (sort_key(value), number, item)
+            for value, number, item in zip(self.values, self.sequence, self.target)
+        )
+        return [(key, number) for key, number, _ in rows], [row[2] for row in rows]
+
+    def position(self, value: Any, number: int) -> int:
+        return bisect_left(self.entries, (self.sort_key(value), number))
+
+    def splice(
+        self,
+        index: Any,
+        old_values: list[Any],
+        values: list[Any],
+        removed: list[Any],
+        items: list[Any],
+    ) -> None:
+        stop = index + len(old_values)
+        old_numbers = self.sequence[index:stop]
+        numbers = [next(self.counter) for _ in values]
+        self.sequence[index:stop] = numbers
+        if len(old_values) + len(values) > self.rebuild_threshold:
+            self.entries, output = self.sort()
+            proxy(self.output)[:] = output
+            return
+        output = proxy(self.output)
+        for old_value, number in zip(old_values, old_numbers):
+            position = self.position(old_value, number)
+            del self.entries[position]
+            del output[position]
+        for value, number, item in zip(values, numbers, items):
+            position = self.position(value, number)
+            self.entries.insert(position, (self.sort_key(value), number))
+            output.insert(position, item)
+
+    def replace(self, index: Any, old_value: Any, value: Any) -> None:
+        number = self.sequence[index]
+        old_position = self.position(old_value, number)
+        del self.entries[old_position]
+        position = self.position(value, number)
+        self.entries.insert(position, (self.sort_key(value), number))
+        if position != old_position:
+            # A move is reported as a removal and an insertion
+            output = proxy(self.output)
+            item = self.output[old_position]
+            del output[old_position]
+            output.insert(position, item)
+
+
+class Window[T]:
+    """
+    A view of the items of a reactive list between reactive bounds.
+    Watchers that read the items through the window only depend on the
+    items inside the window (and on the bounds), not on the whole
+    list: the window copies its items into a readonly reactive list of
+    its own, which is only updated when the source changes inside the
+    window, or when the window is moved. Moving the window costs
+    O(window), not O(list).
+
+    The total length of the source is available as `total`, which
+    watchers can depend on separately.
+    """
+
+    __slots__ = ("__weakref__", "items", "output", "source", "state", "target")
+
+    source: Proxy[list[T]]
+    target: list[T]
+    # Raw state of the window: start, stop and total
+    state: dict[str, int]
+    output: list[T]
+    # Readonly reactive list of the items inside the window
+    items: list[T]
+
+    def __init__(self, source: list[T], start: int, stop: int) -> None:
+        if not isinstance(source, ListProxyBase):
+            raise TypeError("window() expects a reactive list")
+        self.source = source
+        self.target = target = source.__target__
+        self.state = {"start": start, "stop": stop, "total": len(target)}
+        self.output = target[start:stop]
+        items: Any = proxy(self.output, readonly=True)
+        items.__dep__.maintainer = self
+        self.items = items
+        listen_weakly(source.__dep__, self.changed)
+
+    @property
+    def start(self) -> int:
+        return proxy(self.state, True)["start"]
+
+    @start.setter
+    def start(self, start: int) -> None:
+        self.move(start, self.state["stop"])
+
+    @property
+    def stop(self) -> int:
+        return proxy(self.state, True)["stop"]
+
+    @stop.setter
+    def stop(self, stop: int) -> None:
+        self.move(self.state["start"], stop)
+
+    @property
+    def total(self) -> int:
+        """
+        The length of the source list.
+        """
+        return proxy(self.state, True)["total"]
+
+    def move(self, start: int, stop: int) -> None:
+        """
+        Moves the window to the given bounds.
+        """
+        state = proxy(self.state)
+        state["start"] = start
+        state["stop"] = stop
+        self.refresh()
+
+    def refresh(self) -> None:
+        state = self.state
+        proxy(self.output)[:] = self.target[state["start"] : state["stop"]]
+
+    def changed(self, target: list[T], change: Change) -> None:
+        """
+        Listener for the source list.
+        """
+        _, index, removed, inserted = change
+        state = self.state
+        if len(removed) != len(inserted):
+            proxy(state)["total"] = len(target)
+        # Splices after the end of the window leave it as it is, which
+        # the slice assignment in refresh would find out as well, but
+        # at the cost of a comparison of the whole window
+        bounds = slice(state["start"], state["stop"])
+        size = len(target)
+        old_size = size - len(inserted) + len(removed)
+        if index < max(bounds.indices(size)[1], bounds.indices(old_size)[1]):
+            self.refresh()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.items)
+
+    def __getitem__(self, index: int) -> T:
+        return self.items[index]
+
+
+def reactive_map[T, R](source: list[T], fn: Callable[[T], R]) -> list[R]:
+    """
+    Returns a readonly reactive list with the result of fn for every
+    item of the given reactive list. The result is kept up to date
+    incrementally: fn is only evaluated for inserted items and for
+    items of which the state that fn read has changed.
+
+    Note that the operator tracks the given list object: when the list
+    is replaced in its parent container, create a new operator.
+    """
+    operator = MapOperator(source, fn)
+    return operator.result(operator.output)
+
+
+def reactive_filter[T](source: list[T], predicate: Callable[[T], Any]) -> list[T]:
+    """
+    Returns a readonly reactive list with the items of the given
+    reactive list for which predicate returns a truthy value, in the
+    same order. The predicate is evaluated incrementally, like the
+    function of `reactive_map`.
+    """
+    operator = FilterOperator(source, predicate)
+    return operator.result(operator.output)
+
+
+def reactive_reduce[T, A](
+    source: list[T],
+    add: Callable[[A, Any], A],
+    remove: Callable[[A, Any], A],
+    initial: A,
+    fn: Callable[[T], Any] | None = None,
+) -> Ref[A]:
+    """
+    Returns a readonly ref with the reduction of the items of the given
+    reactive list (or of the results of fn for the items). Instead of
+    reducing all items again, `add` folds a value into the result and
+    its inverse `remove` takes one out of it, so that only the items
+    that change have to be accounted for.
+    """
+    operator = ReduceOperator(source, fn, add, remove, initial)
+    return operator.result(cast("Ref[A]", operator.output))
+
+
+def reactive_sum[T](source: list[T], fn: Callable[[T], Any] | None = None) -> Ref[Any]:
+    """
+    Returns a readonly ref with the sum of the items of the given
+    reactive list (or of the results of fn for the items), which is
+    kept up to date incrementally.
+    """
+    return reactive_reduce(source, add, sub, 0, fn)
+
+
+def reactive_count[T](source: list[T], predicate: Callable[[T], Any]) -> Ref[int]:
+    """
+    Returns a readonly ref with the number of items of the given
+    reactive list for which predicate returns a truthy value, which is
+    kept up to date incrementally.
+    """
+    return reactive_reduce(source, add, sub, 0, lambda item: bool(predicate(item)))
+
+
+def index_by[K, V](source: Any, key: str | Callable[[V], K]) -> dict[K, V]:
+    """
+    Returns a readonly reactive dict that maps the value of the given
+    key (a field name, or a function of a record) to the record, for
+    the records in the given reactive list or dict. It is kept up to
+    date incrementally when records are added or removed or when their
+    key changes, and every entry has its own dep, so that a watcher
+    that looks up a single key only re-runs when that entry changes.
+
+    Keys are expected to be unique: for duplicate keys the index holds
+    the record that got the key most recently.
+    """
+    operator = IndexOperator(source, key)
+    return operator.result(operator.output)
+
+
+def group_by[K, V](source: Any, key: str | Callable[[V], K]) -> dict[K, list[V]]:
+    """
+    Returns a readonly reactive dict that maps every value of the given
+    key (a field name, or a function of a record) to the list of the
+    records with that value, for the records in the given reactive list
+    or dict. Like `index_by`, it is kept up to date incrementally and
+    every group has its own dep. Records are listed in the order in
+    which they entered their group.
+    """
+    operator = GroupOperator(source, key)
+    return operator.result(operator.output)
+
+
+def sorted_view[T](
+    source: list[T], key: Callable[[T], Any] | None = None, reverse: bool = False
+) -> list[T]:
+    """
+    Returns a readonly reactive list with the items of the given
+    reactive list in sorted order, like `sorted(source, key=key,
+    reverse=reverse)`. Instead of sorting the whole list again on every
+    change, items are moved into place by binary search when they are
+    added or removed, or when their sort key changes.
+
+    Items with equal sort keys are kept in the order in which they
+    entered the view. Use `listen` on the result to receive the moves
+    as splices.
+    """
+    operator = SortedOperator(source, key, reverse)
+    return operator.result(operator.output)
+
+
+def window[T](source: list[T], start: int, stop: int) -> Window[T]:
+    """
+    Returns a `Window` on the items of the given reactive list from
+    start up to stop. The bounds can be changed with `move`, or by
+    assigning to `start` and `stop`. Keep a reference to the window
+    (or to its `items`) to keep it up to date.
+    """
+    return Window(source, start, stop)
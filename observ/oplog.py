@@ -0,0 +1,276 @@
+"""
+Operation logs describe the mutations of a reactive tree as compact,
+self-contained records (ops), that can be applied to a copy of the
+tree elsewhere: later on (see journal) or in another process (see
+mirror).
+
+Containers are addressed by number. Both sides number the containers
+of the tree in the same (deterministic) order: first by walking the
+initial state, and then by walking the values that every op inserts.
+Values that refer to containers that are already numbered are encoded
+as references (through pickle's persistent ids), so that shared
+containers stay shared on both sides.
+"""
+
+from __future__ import annotations
+
+import io
+import pickle
+from typing import TYPE_CHECKING, Any
+from weakref import ref
+
+from .proxy import LEAF_TYPES, PLAIN_TYPES, Proxy, Raw, proxy
+from .proxy_db import global_listeners
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .proxy_db import Change, TargetDep
+
+# Op codes, for compactness
+SPLICE = 0
+SET = 1
+DELETE = 2
+ADD = 3
+DISCARD = 4
+
+PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+
+def walk(value: Any, nodes: dict[int, Any], objects: list[Any]) -> None:
+    """
+    Numbers the (mutable) containers (and buffers, see buffer_proxy)
+    in the given value that are not numbered yet, in a fixed order:
+    nodes maps the id of a container to its number, objects maps
+    numbers to containers (and keeps them alive, so their ids can't be
+    reused).
+    """
+    stack = [value]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, Proxy):
+            current = current.__target__
+        cls = type(current)
+        if cls is tuple:
+            stack.extend(reversed(current))
+            continue
+        if (
+            cls is not dict
+            and cls is not list
+            and cls is not set
+            and cls not in LEAF_TYPES
+        ):
+            continue
+        obj_id = id(current)
+        if obj_id in nodes:
+            continue
+        nodes[obj_id] = len(objects)
+        objects.append(current)
+        if cls is dict:
+            stack.extend(reversed(current.values()))
+        elif cls is list:
+            stack.extend(reversed(current))
+
+
+def is_plain(value: Any) -> bool:
+    return type(value) in PLAIN_TYPES or isinstance(value, Raw)
+
+
+class OpRecorder:
+    """
+    Records the mutations of the tree of the given (raw) root as ops,
+    and passes each encoded op to sink. Only mutations through proxies
+    are seen. Containers that are removed from the tree stay numbered
+    (and alive) until `reset` is called.
+    """
+
+    __slots__ = (
+        "__weakref__",
+        "_listener",
+        "current",
+        "nodes",
+        "objects",
+        "root",
+        "sink",
+        "skip",
+    )
+
+    def __init__(self, root: Any, sink: Callable[[bytes], Any]) -> None:
+        self.root = root
+        self.sink = sink
+        self.nodes: dict[int, int] = {}
+        self.objects: list[Any] = []
+        walk(root, self.nodes, self.objects)
+        # The mutation that is being recorded, and the mutation whose
+        # records should be skipped, as (id of target, version) pairs
+        self.current: tuple[int, int] | None = None
+        self.skip: tuple[int, int] | None = None
+
+        # Holds the recorder weakly: the global listeners would keep
+        # it alive otherwise
+        weak_self = ref(self)
+
+        def listener(dep: TargetDep, change: Change) -> None:
+            recorder = weak_self()
+            if recorder is not None:
+                recorder.record(dep, change)
+
+        self._listener: Any = listener
+        global_listeners.append(listener)
+
+    def __del__(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stops recording.
+        """
+        listener = self._listener
+        if listener is None:
+            return
+        self._listener = None
+        if listener in global_listeners:
+            global_listeners.remove(listener)
+
+    def reset(self) -> bytes:
+        """
+        Renumbers the containers of the tree (forgetting the ones that
+        are no longer part of it), and returns the encoded state of the
+        tree to start applying ops to, see `OpApplier`.
+        """
+        self.nodes = {}
+        self.objects = []
+        walk(self.root, self.nodes, self.objects)
+        # When called while recording (e.g. by the sink), the returned
+        # state includes the whole mutation that is being recorded, so
+        # its remaining records (if any) are skipped. The dep of the
+        # target is notified (bumping its version) after all of them
+        self.skip = self.current
+        return pickle.dumps(self.root, PROTOCOL)
+
+    def record(self, dep: TargetDep, change: Change) -> None:
+        obj_id = id(dep.target)
+        node = self.nodes.get(obj_id)
+        if node is None:
+            # Not part of the tree
+            return
+        current = (obj_id, dep.version)
+        if current == self.skip:
+            return
+        self.current = current
+        kind = change[0]
+        if kind == "splice":
+            _, index, removed, inserted = change
+            op: tuple[Any, ...] = (node, SPLICE, index, len(removed), inserted)
+            values = inserted
+        elif kind == "set":
+            values = change[3]
+            op = (node, SET, change[1], values)
+        elif kind == "delete":
+            values = ()
+            op = (node, DELETE, change[1])
+        elif kind == "add":
+            values = ()
+            op = (node, ADD, change[1])
+        else:
+            values = ()
+            op = (node, DISCARD, change[1])
+        if kind != "splice":
+            values = (values,)
+        if all(map(is_plain, values)):
+            self.sink(pickle.dumps(op, PROTOCOL))
+            return
+        buffer = io.BytesIO()
+        OpPickler(buffer, self.nodes).dump(op)
+        self.sink(buffer.getvalue())
+        for value in values:
+            walk(value, self.nodes, self.objects)
+
+
+class OpPickler(pickle.Pickler):
+    """
+    Pickler that encodes containers that are already numbered as
+    references to their number.
+    """
+
+    def __init__(self, file: io.BytesIO, nodes: dict[int, int]) -> None:
+        super().__init__(file, PROTOCOL)
+        self.nodes = nodes
+
+    def persistent_id(self, obj: Any) -> int | None:
+        if isinstance(obj, Proxy):
+            obj = obj.__target__
+        cls = type(obj)
+        if cls is dict or cls is list or cls is set or cls in LEAF_TYPES:
+            return self.nodes.get(id(obj))
+        return None
+
+
+class OpUnpickler(pickle.Unpickler):
+    """
+    Unpickler that resolves references to numbered containers.
+    """
+
+    def __init__(self, file: io.BytesIO, objects: list[Any]) -> None:
+        super().__init__(file)
+        self.objects = objects
+
+    def persistent_load(self, pid: Any) -> Any:
+        return self.objects[pid]
+
+
+class OpApplier:
+    """
+    Rebuilds a tree from the encoded state returned by
+    `OpRecorder.reset`, and applies encoded ops to it. Ops are applied
+    through proxies, so watchers of the tree are notified.
+    """
+
+    __slots__ = ("nodes", "objects", "root")
+
+    def __init__(self, state: bytes) -> None:
+        self.root: Any = pickle.loads(state)
+        self.nodes: dict[int, int] = {}
+        self.objects: list[Any] = []
+        walk(self.root, self.nodes, self.objects)
+
+    def reset(self, state: bytes) -> None:
+        """
+        Replaces the contents of the tree with the given encoded state
+        (through a proxy of the root), and renumbers the tree.
+        """
+        root = pickle.loads(state)
+        target = proxy(self.root, False, True)
+        cls = type(root)
+        if cls is dict:
+            for key in [key for key in self.root if key not in root]:
+                del target[key]
+            target.update(root)
+        elif cls is list:
+            target[:] = root
+        else:
+            target.intersection_update(root)
+            target.update(root)
+        self.nodes = {}
+        self.objects = []
+        walk(self.root, self.nodes, self.objects)
+
+    def apply(self, data: bytes) -> None:
+        objects = self.objects
+        node, code, *args = OpUnpickler(io.BytesIO(data), objects).load()
+        target = proxy(objects[node], False, True)
+        if code == SPLICE:
+            index, removed, inserted = args
+            target[index : index + removed] = inserted
+            for value in inserted:
+                walk(value, self.nodes, objects)
+        elif code == SET:
+            key, value = args
+            target[key] = value
+            walk(value, self.nodes, objects)
+        elif code == DELETE:
+            del target[args[0]]
+        elif code == ADD:
+            target.add(args[0])
+        else:
+            target.discard(args[0])
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
+from abc import ABC, abstractmethod
 from copy import copy, deepcopy
 from typing import TYPE_CHECKING, Any, cast
 
-from .proxy_db import proxy_db
+from .proxy_db import MISSING, db_lock, proxy_db
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
     from typing import TypedDict
 
-    from .proxy_db import TargetDep
+    from .dep import Dep
+    from .proxy_db import Change, TargetDep
 
 
 class Proxy[T]:
@@ -40,6 +43,8 @@ class Proxy[T]:
         self.__target__ = target
         self.__readonly__ = readonly
         self.__shallow__ = shallow
+        # Called by proxy() with db_lock held, so that the lock is only
+        # taken once per created proxy
         dep: TargetDep = proxy_db.target_dep(target)
         dep.register_proxy((readonly, shallow), self)
         self.__dep__ = dep
@@ -50,18 +55,143 @@ class Proxy[T]:
     def __deepcopy__(self, memo: dict[int, Any]) -> T:
         return deepcopy(self.__target__, memo)
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Pickles the target along with the proxy configuration, and
+        # rebuilds the proxy (through proxy) on unpickling. The pickle
+        # memo takes care of targets that are shared or wrapped by
+        # multiple proxies
+        return proxy, (self.__target__, self.__readonly__, self.__shallow__)
+
 
 # Lookup dict for mapping a type (dict, list, set) to a tuple
 # of proxy types (writable, readonly) for that type. Keyed on the
 # exact type, so subclasses are (deliberately) not proxied
 TYPE_LOOKUP: dict[type, tuple[type[Proxy[Any]], type[Proxy[Any]]]] = {}
 
+# Lookup dict for mapping a class that has been registered with
+# reactive_class to the names of its instance attributes, which are
+# the 'items' of its instances (see object_proxy)
+OBJECT_FIELDS: dict[type, frozenset[str]] = {}
+
+# Mutable types whose proxies have a dep but no nested values, such as
+# the buffers in buffer_proxy: they are visited as a whole (e.g. by
+# deep watchers) and copied as a whole (e.g. by to_raw)
+LEAF_TYPES: set[type] = set()
+
+
+def object_values(obj: Any, fields: frozenset[str]) -> list[Any]:
+    """
+    Returns the values of the given instance attributes of the given
+    object, skipping the ones that are not set.
+    """
+    values = []
+    for name in fields:
+        value = getattr(obj, name, MISSING)
+        if value is not MISSING:
+            values.append(value)
+    return values
+
+
 # Types of values that can't be proxied. Note the exact type is
 # checked (no subclasses) so that these can be ruled out with a
 # single set containment check
 PLAIN_TYPES: frozenset[type] = frozenset({type(None), bool, int, float, str, bytes})
 
 
+class Raw:
+    """
+    Marker base class for containers that are never proxied, see
+    `mark_raw`.
+    """
+
+    __slots__ = ()
+
+
+class Lazy(ABC):
+    """
+    Base class for placeholders of containers that have not been
+    loaded yet, such as the stubs of a disk store. Proxies load them
+    when they are read, and so does everything that walks the raw
+    targets (e.g. to_raw and serialization). Deep watchers depend on
+    them instead, see `dep`.
+    """
+
+    __slots__ = ()
+
+    @abstractmethod
+    def load(self) -> Any:
+        """
+        Loads the container, replaces the placeholder by it (where it
+        is stored), and returns the (raw) container.
+        """
+
+    @abstractmethod
+    def dep(self) -> Dep:
+        """
+        Returns a dep that is notified when anything inside the
+        container is mutated (which requires loading it first), so
+        that deep watchers don't have to load it.
+        """
+
+
+class RawDict[K, V](dict[K, V], Raw):
+    __slots__ = ()
+
+
+class RawList[T](list[T], Raw):
+    __slots__ = ()
+
+
+class RawSet[T](set[T], Raw):
+    __slots__ = ()
+
+
+class RawTuple[T](tuple[T, ...], Raw):
+    __slots__ = ()
+
+
+RAW_TYPES: dict[type, type] = {
+    dict: RawDict,
+    list: RawList,
+    set: RawSet,
+    tuple: RawTuple,
+}
+
+
+def mark_raw[T](target: T) -> T:
+    """
+    Returns a marked COPY of the given dict, list, set or tuple that
+    observ will never make reactive: it is returned as-is from reads,
+    deep watchers don't descend into it, and to_raw doesn't copy it.
+    Stored in reactive state, it is only tracked as a value of its
+    parent. Use it for large values that are only ever replaced as a
+    whole.
+
+    The given container itself is NOT marked: store the returned copy,
+    and drop the original (or stop mutating it), since the two are
+    separate containers from then on:
+
+        mesh = mark_raw(mesh)
+        state["mesh"] = mesh
+
+    The copy is shallow (the values inside it are shared with the
+    original), and has a subclass of the type of the given container.
+    The subclass is what marks it: like any subclass of the plain
+    types, it is not proxied, so marking costs nothing on reads. The
+    builtin containers can't be marked in place: they don't accept
+    attributes, and a registry of marked containers would have to keep
+    them alive (they don't support weak references) and would add a
+    lookup to every read. Other values are returned as-is.
+    """
+    if isinstance(target, Proxy):
+        unwrapped: Any = target.__target__
+        target = unwrapped
+    raw_type = RAW_TYPES.get(type(target))
+    if raw_type is None:
+        return target
+    return raw_type(target)
+
+
 def proxy[T](target: T, readonly: bool = False, shallow: bool = False) -> T:
     """
     Returns a Proxy for the given object. If a proxy for the given
@@ -110,10 +240,15 @@ def proxy[T](target: T, readonly: bool = False, shallow: bool = False) -> T:
     proxy_types = TYPE_LOOKUP.get(type(target))
     if proxy_types is not None:
         proxy_type = proxy_types[1] if readonly else proxy_types[0]
-        new_proxy: Any = proxy_type(target, readonly, shallow)
+        with db_lock:
+            # Check again: another thread might have been first
+            new_proxy: Any = proxy_db.get_proxy(target, readonly, shallow)
+            if new_proxy is None:
+                created: Any = proxy_type(target, readonly, shallow)
+                new_proxy = created
         return new_proxy
 
-    if isinstance(target, tuple):
+    if isinstance(target, tuple) and not isinstance(target, Raw):
         return cast(T, tuple(proxy(x, readonly, shallow) for x in target))
 
     # We can't proxy a plain value
@@ -189,27 +324,265 @@ def trigger_ref[T](target: Proxy[T] | T) -> None:
     dep.notify()
 
 
-def to_raw[T](target: Proxy[T] | T) -> T:
+def listen(
+    target: Proxy[Any] | Any, callback: Callable[[Change], Any]
+) -> Callable[[], None]:
+    """
+    Calls the callback with a change record for every effective
+    mutation of the given proxy's target, right before the watchers
+    that depend on it are notified. Lists report splices as
+    ("splice", index, removed, inserted), dicts report ("set", key,
+    old, new) and ("delete", key, old), sets report ("add", value)
+    and ("discard", value), and arrays report ("region", region, old)
+    (see regions). Buffers (array.array and bytearray) report splices
+    too, of slices of the buffer. The records contain raw values.
+
+    Returns a function that stops listening.
+    """
+    if not isinstance(target, Proxy):
+        raise TypeError("listen() expects a proxy")
+    dep = target.__dep__
+
+    def listener(target: Any, change: Change) -> None:
+        callback(change)
+
+    dep.add_listener(listener)
+
+    def stop() -> None:
+        dep.remove_listener(listener)
+
+    return stop
+
+
+def version(target: Proxy[Any] | Any, deep: bool = False) -> int:
+    """
+    Returns the mutation version of the given proxy's target: a number
+    that increases with every effective mutation of the target, so
+    that checking whether it has changed since it was last looked at
+    is a matter of comparing two numbers, without a watcher.
+
+    With deep=True, the returned version also increases with every
+    mutation of the containers nested inside the target. Computing it
+    visits every nested container (but no other values), so its cost
+    is proportional to the number of containers in the tree. The deps
+    of the nested containers are kept alive (by the deps of their
+    parents) until their parents are mutated.
+    """
+    if not isinstance(target, Proxy):
+        raise TypeError("version() expects a proxy")
+    result = target.__dep__.version
+    if not deep:
+        return result
+
+    # All versions come from a single global counter, so the latest
+    # mutation anywhere in the tree always holds the highest version.
+    # Nested containers that don't have a dep yet get one (like in
+    # traverse), which starts out at a new (higher) version. Every dep
+    # keeps the deps of the containers directly inside it alive, so
+    # that their versions are not lost in between deep requests. A
+    # mutation releases them (see TargetDep.notify), which is safe: it
+    # bumps the version of the parent, and with it the deep version
+    root = target.__dep__
+    # The previous nested deps are kept alive until all of them have
+    # been visited again
+    previous = [root.nested]
+    root.nested = []
+    db = proxy_db.db
+    seen_ids: set[int] = set()
+    # Values, along with the nested deps of their parent
+    stack: list[tuple[Any, list[TargetDep]]] = [(target.__target__, root.nested)]
+    while stack:
+        current, siblings = stack.pop()
+        if isinstance(current, Proxy):
+            current = current.__target__
+        cls = type(current)
+        if cls is dict:
+            values = current.values()
+        elif cls is list or cls is tuple:
+            values = current
+        elif cls is set or cls in LEAF_TYPES:
+            values = ()
+        else:
+            fields = OBJECT_FIELDS.get(cls)
+            if fields is None:
+                continue
+            values = object_values(current, fields)
+        obj_id = id(current)
+        if obj_id in seen_ids:
+            continue
+        seen_ids.add(obj_id)
+        if cls is not tuple and current is not root.target:
+            weak_dep = db.get(obj_id)
+            dep = weak_dep() if weak_dep is not None else None
+            if dep is None:
+                dep = proxy(current).__dep__
+            siblings.append(dep)
+            if dep.version > result:
+                result = dep.version
+            previous.append(dep.nested)
+            siblings = dep.nested = []
+        stack.extend(
+            (value, siblings) for value in values if type(value) not in PLAIN_TYPES
+        )
+    return result
+
+
+def to_raw[T](target: Proxy[T] | T, copy: bool = True, assume_raw: bool = False) -> T:
     """
     Returns a raw object from which any trace of proxy has been replaced
-    with its wrapped target value.
+    with its wrapped target value. Containers that are shared within
+    the given value are shared within the result as well, and cycles
+    are supported.
+
+    With copy=False, the wrapped target itself is returned (without
+    copying anything) when no proxies are stored inside of it, which
+    is enough for read-only access such as serialization. The result
+    must not be modified then, and reflects later changes. Finding out
+    whether proxies are stored inside of it visits the whole tree,
+    unless assume_raw is set: then the caller vouches that the tree
+    holds no proxies (and no containers that are not loaded, see
+    disk), and the target is returned as-is in constant time.
     """
     # The casts below are needed because the type system cannot know
     # that rebuilding a container from its (recursively unproxied)
     # items yields a value of the same type as the original target
     if isinstance(target, Proxy):
-        return cast(T, to_raw(target.__target__))
+        target = target.__target__
+    if not copy and (assume_raw or not contains_proxy(target)):
+        return cast(T, target)
+    return cast(T, copy_tree(target))
 
-    if isinstance(target, list):
-        return cast(T, [to_raw(t) for t in target])
 
-    if isinstance(target, dict):
-        return cast(T, {key: to_raw(value) for key, value in target.items()})
+def contains_proxy(target: Any) -> bool:
+    """
+    Returns whether a proxy (or a placeholder of a container that has
+    not been loaded, see Lazy) is stored anywhere inside of the given
+    (raw) value.
+    """
+    seen_ids: set[int] = set()
+    stack = [target]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, Raw):
+            continue
+        if isinstance(current, dict):
+            values = current.values()
+        elif isinstance(current, (list, tuple, set)):
+            values = current
+        else:
+            fields = OBJECT_FIELDS.get(type(current))
+            if fields is None:
+                continue
+            values = object_values(current, fields)
+        obj_id = id(current)
+        if obj_id in seen_ids:
+            continue
+        seen_ids.add(obj_id)
+        for value in values:
+            if type(value) in PLAIN_TYPES:
+                continue
+            if isinstance(value, (Proxy, Lazy)):
+                return True
+            stack.append(value)
+    return False
+
+
+def copy_tree(target: Any, resolve: Callable[[Any], Any] | None = None) -> Any:
+    """
+    Non-recursively copies the given (raw) value, replacing any proxy
+    with a copy of its target. Every container is copied once (keyed
+    by id), so shared containers and cycles are preserved.
 
-    if isinstance(target, tuple):
-        return cast(T, tuple(to_raw(t) for t in target))
+    resolve: Returns the contents to copy for a given (raw) container,
+        if it should not be the container itself (see Snapshot).
+    """
+    copies: dict[int, Any] = {}
+    # Containers that have been copied (into copies) but whose items
+    # still have to be filled in
+    stack: list[Any] = []
+    result = copy_node(target, copies, stack)
+    plain_types = PLAIN_TYPES
+    while stack:
+        original = stack.pop()
+        source = original if resolve is None else resolve(original)
+        copy = copies[id(original)]
+        # Copy all items at once, and replace the (rare) non-plain
+        # ones afterwards
+        if isinstance(copy, dict):
+            copy.update(source)
+            for key, value in source.items():
+                if type(value) not in plain_types:
+                    copy[key] = copy_node(value, copies, stack)
+        elif isinstance(copy, list):
+            copy.extend(source)
+            for index, value in enumerate(source):
+                if type(value) not in plain_types:
+                    copy[index] = copy_node(value, copies, stack)
+        elif type(copy) in LEAF_TYPES:
+            # Buffers only hold plain values
+            copy.extend(source)
+        elif not isinstance(copy, set):
+            # An instance of a class registered with reactive_class.
+            # The copy is made with object.__setattr__, which also
+            # works for frozen dataclasses
+            for name in OBJECT_FIELDS[type(copy)]:
+                value = getattr(source, name, MISSING)
+                if value is MISSING:
+                    if hasattr(copy, name):
+                        delattr(copy, name)
+                    continue
+                if type(value) not in plain_types:
+                    value = copy_node(value, copies, stack)
+                object.__setattr__(copy, name, value)
+        else:
+            # Set items are hashable, so only tuples can contain
+            # anything that has to be copied
+            copy.update(
+                copy_node(value, copies, stack) if type(value) is tuple else value
+                for value in source
+            )
+    return result
 
-    if isinstance(target, set):
-        return cast(T, {to_raw(t) for t in target})
 
-    return target
+def copy_node(value: Any, copies: dict[int, Any], stack: list[Any]) -> Any:
+    """
+    Returns the copy of the given value for copy_tree: plain values
+    and raw marked values are returned as-is, and placeholders are
+    loaded. Containers are copied
+    empty and pushed onto the stack, to be filled in by copy_tree.
+    """
+    if isinstance(value, Proxy):
+        value = value.__target__
+    if type(value) in PLAIN_TYPES or isinstance(value, Raw):
+        return value
+    if isinstance(value, Lazy):
+        value = value.load()
+    obj_id = id(value)
+    copy = copies.get(obj_id)
+    if copy is not None:
+        return copy
+    if isinstance(value, dict):
+        copy = {}
+    elif isinstance(value, list):
+        copy = []
+    elif isinstance(value, set):
+        copy = set()
+    elif isinstance(value, tuple):
+        # Tuples can't be filled in afterwards, so they are copied
+        # right away (recursively, but only nested tuples recurse).
+        # A tuple can't be part of a cycle without a mutable
+        # container in between, and those are copied empty first
+        copy = tuple(copy_node(item, copies, stack) for item in value)
+        copies[obj_id] = copy
+        return copy
+    elif type(value) in OBJECT_FIELDS:
+        # Only the instance attributes are copied (by copy_tree)
+        copy = object.__new__(type(value))
+    elif type(value) in LEAF_TYPES:
+        # An empty buffer of the same type (and typecode)
+        copy = value[:0]
+    else:
+        return value
+    copies[obj_id] = copy
+    stack.append(value)
+    return copy
@@ -29,16 +29,62 @@ and has removed itself from the registry.
 
 from __future__ import annotations
 
+from itertools import count
+from threading import RLock
 from typing import TYPE_CHECKING, Any
 from weakref import WeakValueDictionary, ref
 
 from .dep import Dep
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from .proxy import Proxy
 
     # A proxy configuration: the (readonly, shallow) flags
     ProxyConfig = tuple[bool, bool]
+    # A record that describes a single effective mutation of a target,
+    # see TargetDep.emit
+    Change = tuple[Any, ...]
+    # A listener is called with the (raw) target and a change record
+    Listener = Callable[[Any, Change], Any]
+    # A global listener is called with the TargetDep and a change record
+    GlobalListener = Callable[["TargetDep", Change], Any]
+
+
+class _Missing:
+    """
+    Type of the MISSING sentinel.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+    def __reduce__(self) -> str:
+        return "MISSING"
+
+
+# Sentinel to distinguish 'key not present' from 'value is None'
+MISSING: Any = _Missing()
+
+# Source of the versions of targets (see TargetDep.version). A single
+# global counter instead of one per target, so that a target whose
+# TargetDep is recreated never gets a version that it had before
+versions = count(1)
+
+# Listeners that receive the change records of all targets (see
+# TargetDep.emit), e.g. to preserve the state of a snapshot. Mutated
+# in place only: the traps hold on to this list
+global_listeners: list[GlobalListener] = []
+
+# Guards the creation and removal of registry entries (TargetDeps,
+# their proxies and their keydeps), so that concurrent threads always
+# end up with the same deps for the same target. Lookups of existing
+# entries don't take the lock. Reentrant, because garbage collection
+# can trigger the removal of an entry while the lock is held
+db_lock = RLock()
 
 
 class TargetDep(Dep):
@@ -49,14 +95,35 @@ class TargetDep(Dep):
     matter which proxy they go through.
     """
 
-    __slots__ = ("keydeps", "proxies", "target")
-
+    __slots__ = (
+        "_mark",
+        "_version",
+        "keydeps",
+        "listeners",
+        "maintainer",
+        "nested",
+        "proxies",
+        "target",
+    )
+
+    _mark: VersionMark | None
+    _version: int
     keydeps: WeakValueDictionary[Any, KeyDep] | None
+    listeners: list[Listener] | None
+    maintainer: Any
+    nested: list[TargetDep] | None
     proxies: dict[ProxyConfig, ref[Proxy[Any]]]
 
     def __init__(self, target: Any) -> None:
         super().__init__()
         self.target = target
+        # See version. It starts out at a version that no other target
+        # had before, since mutations that happened while there was no
+        # TargetDep are unknown
+        self._version = next(versions)
+        # Subscribed while the version has been read since the last
+        # mutation, see VersionMark
+        self._mark = None
         # Per-key deps (dict targets only). Starts out as None and is
         # only materialized (as a WeakValueDictionary) when a key is
         # read with dependency tracking active, since constructing a
@@ -68,6 +135,36 @@ class TargetDep(Dep):
         # Weakrefs to the proxies that wrap the target,
         # keyed on (readonly, shallow)
         self.proxies = {}
+        # Callbacks that receive a change record for every effective
+        # mutation of the target. None when there are no listeners,
+        # so that the write traps can skip building the records
+        self.listeners = None
+        # The object that maintains the contents of a derived target
+        # (e.g. the output of a reactive operator), if any. It is kept
+        # alive for exactly as long as the target can be observed
+        self.maintainer = None
+        # The deps of the containers directly inside the target, as of
+        # the last time a deep version that includes the target was
+        # requested (see version). Keeps those deps (and thereby their
+        # versions) alive until the target is mutated, also when they
+        # are mutated through transient proxies
+        self.nested = None
+
+    @property
+    def version(self) -> int:
+        """
+        A number that increases with every effective mutation of the
+        target (every notify), as compared to when it was last read.
+        Bumping it is left to a VersionMark that only subscribes once
+        the version has been read, so that writes to targets whose
+        version nobody looks at don't pay for it.
+        """
+        if self._mark is None:
+            # Any-typed: a mark is subscribed like a watcher, but isn't one
+            mark: Any = VersionMark(self)
+            self._mark = mark
+            self.add_sub(mark)
+        return self._version
 
     def keydep(self, key: Any) -> KeyDep:
         """
@@ -77,36 +174,89 @@ class TargetDep(Dep):
         watcher) holds a reference to it.
         """
         keydeps = self.keydeps
-        if keydeps is None:
-            keydeps = self.keydeps = WeakValueDictionary()
-        else:
+        if keydeps is not None:
             keydep = keydeps.get(key)
             if keydep is not None:
                 return keydep
-        keydep = KeyDep(self)
-        keydeps[key] = keydep
-        return keydep
+        with db_lock:
+            # Check again: another thread might have been first
+            keydeps = self.keydeps
+            if keydeps is None:
+                keydeps = self.keydeps = WeakValueDictionary()
+            else:
+                keydep = keydeps.get(key)
+                if keydep is not None:
+                    return keydep
+            keydep = KeyDep(self)
+            keydeps[key] = keydep
+            return keydep
+
+    def add_listener(self, listener: Listener) -> None:
+        """
+        Registers a listener that is called with the target and a
+        change record for every effective mutation of the target,
+        right before the subscribers of the target are notified.
+        Note that listeners are held strongly.
+        """
+        listeners = self.listeners
+        if listeners is None:
+            self.listeners = [listener]
+        else:
+            listeners.append(listener)
+
+    def remove_listener(self, listener: Listener) -> None:
+        """
+        Removes a listener that was registered with `add_listener`.
+        """
+        listeners = self.listeners
+        if listeners is not None and listener in listeners:
+            listeners.remove(listener)
+            if not listeners:
+                self.listeners = None
+
+    def emit(self, change: Change) -> None:
+        """
+        Passes the given change record to all listeners. The records
+        are tuples that start with the kind of change:
+
+        - ("splice", index, removed, inserted): the items in `removed`
+          (a list) at `index` of a list were replaced by the items
+          in `inserted` (a list)
+        - ("set", key, old, new): key of a dict was set to new; old is
+          MISSING when the key was added
+        - ("delete", key, old): key was removed from a dict
+        - ("add", value) and ("discard", value): value was added to,
+          or removed from, a set
+        - ("region", region, old): the given region (a tuple of
+          slices) of an array was written to, old is a copy of its
+          previous contents (see regions)
+
+        Records contain raw values, and together with the current
+        state of the target they describe the previous state exactly.
+        """
+        target = self.target
+        # Iterate a snapshot: listeners may remove themselves
+        for listener in tuple(self.listeners or ()):
+            listener(target, change)
+        if global_listeners:
+            for global_listener in tuple(global_listeners):
+                global_listener(self, change)
 
     def register_proxy(self, config: ProxyConfig, proxy: Proxy[Any]) -> None:
         """
         Registers the proxy as the proxy that wraps the target with
         the given (readonly, shallow) configuration. There can be only
-        one proxy per configuration.
+        one proxy per configuration. Call with db_lock held.
         """
         proxies = self.proxies
         existing = proxies.get(config)
         if existing is not None and existing() is not None:
             raise RuntimeError("Proxy with existing configuration already in db")
-
-        def remove(
-            weak_proxy: ref[Proxy[Any]],
-            proxies: dict[ProxyConfig, ref[Proxy[Any]]] = proxies,
-            config: ProxyConfig = config,
-        ) -> None:
-            if proxies.get(config) is weak_proxy:
-                del proxies[config]
-
-        proxies[config] = ref(proxy, remove)
+        # No callback to remove the entry once the proxy is gone: there
+        # are at most four configurations, a dead entry is replaced by
+        # the next proxy with the same configuration, and the proxy is
+        # usually the last reference to this dep anyway
+        proxies[config] = ref(proxy)
 
     def get_proxy(self, config: ProxyConfig) -> Proxy[Any] | None:
         """
@@ -119,6 +269,33 @@ class TargetDep(Dep):
         return weak_proxy()
 
 
+class VersionMark:
+    """
+    Subscriber that bumps the version of a TargetDep on the first
+    mutation after the version was read, and then unsubscribes (by
+    letting go of itself: deps hold their subscribers weakly). Its id
+    sorts it before all watchers (see Dep.notify), so that watchers
+    that update synchronously see the new version.
+    """
+
+    __slots__ = ("__weakref__", "dep")
+
+    id = -1
+
+    def __init__(self, dep: TargetDep) -> None:
+        # Held weakly: the dep holds the mark
+        self.dep = ref(dep)
+
+    def update(self) -> None:
+        dep = self.dep()
+        if dep is not None and dep._mark is self:
+            dep._version = next(versions)
+            dep._mark = None
+            # Releases the deps of containers that might have been
+            # removed, see version()
+            dep.nested = None
+
+
 class KeyDep(Dep):
     """
     The Dep for a single key of a target. It holds a strong reference
@@ -150,7 +327,7 @@ class ProxyDb:
     def target_dep(self, target: Any) -> TargetDep:
         """
         Returns the TargetDep for the given target, creating it (and
-        registering it) if there is none yet.
+        registering it) if there is none yet. Call with db_lock held.
         """
         db = self.db
         obj_id = id(target)
@@ -169,8 +346,9 @@ class ProxyDb:
         ) -> None:
             # Guard against the entry having been replaced in the
             # meantime, so a stale callback can't remove a live entry
-            if db.get(obj_id) is weak_dep:
-                del db[obj_id]
+            with db_lock:
+                if db.get(obj_id) is weak_dep:
+                    del db[obj_id]
 
         db[obj_id] = ref(dep, remove)
         return dep
@@ -0,0 +1,479 @@
+"""
+Reactive NumPy arrays. Writes to an array through its proxy (item
+assignment, in-place operators and ufuncs with out=) notify the
+watchers of the array, and are described by the region of the array
+that they wrote to, so that consumers (e.g. uploads of GPU buffers)
+can process just the changed parts, see `DirtyRegions`.
+
+Requires numpy (see the numpy dependency group).
+"""
+
+from __future__ import annotations
+
+from operator import index as operator_index
+from typing import Any
+from weakref import ref
+
+import numpy as np
+from numpy.lib.mixins import NDArrayOperatorsMixin
+
+from .dep import get_dep_stack
+from .proxy import TYPE_LOOKUP, Proxy, proxy
+from .proxy_db import global_listeners
+from .traps import ReadonlyError
+
+# A region of an array: a (start:stop) slice for every axis
+Region = tuple[slice, ...]
+
+# id(array) -> weakref to the arrays that have been made reactive
+TRACKED: dict[int, ref[np.ndarray]] = {}
+
+# id(array) -> weakrefs to the DirtyRegions that collect its regions.
+# They get just the regions, so unlike listeners, they don't make
+# writes copy the old contents
+DIRTY: dict[int, list[ref[DirtyRegions]]] = {}
+
+
+def reactive_array(array: np.ndarray, readonly: bool = False) -> Any:
+    """
+    Returns a proxy for the given array, and makes the array reactive
+    from then on: reading it from reactive state returns a proxy too.
+    Arrays are opaque in reactive state otherwise.
+
+    Writes through the proxy notify its watchers, and emit a change
+    record ("region", region, old) for listeners (see `listen`): the
+    region that was written to as a tuple of slices (one for every
+    axis), and a copy of its contents from before the write. Writes
+    are not compared to the old contents. Reads return plain arrays
+    (and views): writes to those are not tracked. The same goes for
+    `proxy.flat` and the mutating methods other than `fill`, `sort`,
+    `partition` and `put` (e.g. `resize`): they act on the array
+    itself. The numpy functions that write to an array (`np.copyto`,
+    `np.put`, `np.place`, `np.putmask` and `np.fill_diagonal`) are
+    tracked as writes to the whole array.
+    """
+    if isinstance(array, Proxy):
+        array = array.__target__
+    if type(array) is not np.ndarray:
+        raise TypeError("reactive_array() expects a numpy array")
+    obj_id = id(array)
+    weak_array = TRACKED.get(obj_id)
+    if weak_array is None or weak_array() is not array:
+
+        def remove(weak_array: ref[np.ndarray], obj_id: int = obj_id) -> None:
+            if TRACKED.get(obj_id) is weak_array:
+                del TRACKED[obj_id]
+
+        TRACKED[obj_id] = ref(array, remove)
+    return proxy(array, readonly)
+
+
+def array_proxy(target: np.ndarray, readonly: bool, shallow: bool) -> Any:
+    # Only the arrays that have been made reactive are proxied
+    weak_array = TRACKED.get(id(target))
+    if weak_array is None or weak_array() is not target:
+        return target
+    return ArrayProxy(target, readonly, shallow)
+
+
+# Constructs the proxy (or returns the array as-is) when proxy is
+# called on an array that doesn't have a proxy yet
+ARRAY_PROXY: Any = array_proxy
+TYPE_LOOKUP[np.ndarray] = (ARRAY_PROXY, ARRAY_PROXY)
+
+
+def region_of(shape: tuple[int, ...], key: Any) -> Region:
+    """
+    Returns the bounding box of the items of an array of the given
+    shape that the given index selects. Boolean and integer array
+    indices are bounded by their smallest and largest index.
+    """
+    if type(key) is not tuple:
+        key = (key,)
+    key = tuple(item.__target__ if isinstance(item, Proxy) else item for item in key)
+    consumed = 0
+    for item in key:
+        if item is None or item is Ellipsis:
+            continue
+        if isinstance(item, (np.ndarray, list)):
+            item = np.asarray(item)
+            consumed += item.ndim if item.dtype == bool else 1
+        else:
+            consumed += 1
+
+    region: list[slice] = []
+    for item in key:
+        if item is None:
+            continue
+        axis = len(region)
+        if item is Ellipsis:
+            region.extend(
+                slice(0, size) for size in shape[axis : len(shape) - consumed + axis]
+            )
+            continue
+        if isinstance(item, slice):
+            indices = range(*item.indices(shape[axis]))
+            if indices:
+                region.append(
+                    slice(
+                        min(indices[0], indices[-1]), max(indices[0], indices[-1]) + 1
+                    )
+                )
+            else:
+                region.append(slice(0, 0))
+            continue
+        if isinstance(item, (np.ndarray, list)):
+            item = np.asarray(item)
+            if item.dtype == bool:
+                for indices in item.nonzero():
+                    region.append(bounds(indices))
+                continue
+            item = np.where(item < 0, item + shape[axis], item)
+            region.append(bounds(item))
+            continue
+        index = operator_index(item)
+        if index < 0:
+            index += shape[axis]
+        region.append(slice(index, index + 1))
+    region.extend(slice(0, size) for size in shape[len(region) :])
+    return tuple(region)
+
+
+def bounds(indices: np.ndarray) -> slice:
+    if not indices.size:
+        return slice(0, 0)
+    return slice(int(indices.min()), int(indices.max()) + 1)
+
+
+def whole(shape: tuple[int, ...]) -> Region:
+    return tuple(slice(0, size) for size in shape)
+
+
+def write_region(target: np.ndarray, key: Any) -> Region:
+    shape = target.shape
+    if type(key) is int and -shape[0] <= key < shape[0]:
+        # Fast path for the most common write: a single row
+        if key < 0:
+            key += shape[0]
+        return (slice(key, key + 1), *[slice(0, size) for size in shape[1:]])
+    try:
+        return region_of(shape, key)
+    except (IndexError, TypeError, ValueError):
+        # The write itself will raise (or do something exotic)
+        return whole(shape)
+
+
+def unwrap(value: Any) -> Any:
+    if isinstance(value, Proxy):
+        return value.__target__
+    return value
+
+
+def unwrap_arrays(value: Any, proxies: list[ArrayProxy]) -> Any:
+    # Replaces the array proxies in the arguments of a numpy function
+    # (which may be nested in lists and tuples) by their targets
+    if isinstance(value, ArrayProxy):
+        proxies.append(value)
+        return value.__target__
+    if type(value) is list or type(value) is tuple:
+        return type(value)(unwrap_arrays(item, proxies) for item in value)
+    return value
+
+
+# The numpy functions that write to an array that is passed to them,
+# with the name of that argument
+WRITING_FUNCTIONS: dict[Any, str] = {
+    np.copyto: "dst",
+    np.put: "a",
+    np.place: "arr",
+    np.putmask: "a",
+    np.fill_diagonal: "a",
+}
+
+
+class ArrayProxy(NDArrayOperatorsMixin, Proxy[np.ndarray]):
+    """
+    Proxy for an array that has been made reactive with
+    `reactive_array`.
+    """
+
+    __slots__ = ()
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return reactive_array, (self.__target__, self.__readonly__)
+
+    def _depend(self) -> None:
+        stack = get_dep_stack()
+        if stack:
+            stack[-1].add_dep(self.__dep__)
+
+    def _written(self, region: Region, old: Any) -> None:
+        dep = self.__dep__
+        if old is not None:
+            dep.emit(("region", region, old))
+        dirty = DIRTY.get(id(self.__target__))
+        if dirty is not None:
+            for weak_regions in tuple(dirty):
+                regions = weak_regions()
+                if regions is not None:
+                    regions.add(region)
+        dep.notify()
+
+    def __getattr__(self, name: str) -> Any:
+        # Attributes and (non-mutating) methods of the array
+        self._depend()
+        return getattr(self.__target__, name)
+
+    def __len__(self) -> int:
+        self._depend()
+        return len(self.__target__)
+
+    def __contains__(self, value: Any) -> bool:
+        self._depend()
+        return unwrap(value) in self.__target__
+
+    def __iter__(self) -> Any:
+        self._depend()
+        return iter(self.__target__)
+
+    def __repr__(self) -> str:
+        self._depend()
+        return repr(self.__target__)
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        self._depend()
+        target = self.__target__
+        if dtype is None and not copy:
+            return target
+        return np.array(target, dtype=dtype, copy=True)
+
+    def __getitem__(self, key: Any) -> Any:
+        self._depend()
+        if type(key) is tuple:
+            key = tuple(map(unwrap, key))
+        else:
+            key = unwrap(key)
+        return self.__target__[key]
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        if self.__readonly__:
+            raise ReadonlyError()
+        target = self.__target__
+        region = write_region(target, key)
+        dep = self.__dep__
+        old = None
+        if dep.listeners is not None or global_listeners:
+            old = target[region].copy()
+        if type(key) is tuple:
+            key = tuple(map(unwrap, key))
+        else:
+            key = unwrap(key)
+        target[key] = unwrap(value)
+        self._written(region, old)
+
+    def __array_ufunc__(
+        self, ufunc: np.ufunc, method: str, *inputs: Any, **kwargs: Any
+    ) -> Any:
+        if ufunc is np.not_equal and len(inputs) == 2 and not kwargs:
+            first, second = inputs
+            if first is not second and unwrap(first) is unwrap(second):
+                # An array proxy and its own target. In-place operators
+                # return the proxy, so `state[key] += 1` stores the
+                # proxy in place of its target, and the write traps
+                # compare the two with !=: they are the same array
+                return False
+        stack = get_dep_stack()
+        for value in inputs:
+            if stack and isinstance(value, Proxy):
+                stack[-1].add_dep(value.__dep__)
+        # Array proxies that are written to: the outputs, and the first
+        # input of ufunc.at (which works in place)
+        written: list[tuple[ArrayProxy, Region]] = []
+        out = kwargs.get("out")
+        if out:
+            for value in out:
+                if isinstance(value, ArrayProxy):
+                    written.append((value, whole(value.__target__.shape)))
+            kwargs["out"] = tuple(map(unwrap, out))
+        if method == "at" and isinstance(inputs[0], ArrayProxy):
+            written.append((inputs[0], write_region(inputs[0].__target__, inputs[1])))
+        olds = []
+        for array, region in written:
+            if array.__readonly__:
+                raise ReadonlyError()
+            dep = array.__dep__
+            if dep.listeners is not None or global_listeners:
+                olds.append(array.__target__[region].copy())
+            else:
+                olds.append(None)
+
+        result = getattr(ufunc, method)(*map(unwrap, inputs), **kwargs)
+
+        for (array, region), old in zip(written, olds, strict=True):
+            array._written(region, old)
+        if out:
+            # Return the proxies for the outputs, not their targets
+            if type(result) is tuple:
+                return tuple(
+                    proxied if result_value is unwrap(proxied) else result_value
+                    for proxied, result_value in zip(out, result, strict=True)
+                )
+            if result is unwrap(out[0]):
+                return out[0]
+        return result
+
+    def __array_function__(
+        self, func: Any, types: Any, args: tuple[Any, ...], kwargs: Any
+    ) -> Any:
+        written = None
+        name = WRITING_FUNCTIONS.get(func)
+        if name is not None:
+            array = args[0] if args else kwargs.get(name)
+            if isinstance(array, ArrayProxy):
+                if array.__readonly__:
+                    raise ReadonlyError()
+                written = array
+        proxies: list[ArrayProxy] = []
+        args = unwrap_arrays(args, proxies)
+        kwargs = {key: unwrap_arrays(value, proxies) for key, value in kwargs.items()}
+        stack = get_dep_stack()
+        if stack:
+            for value in proxies:
+                if value is not written:
+                    stack[-1].add_dep(value.__dep__)
+        if written is None:
+            return func(*args, **kwargs)
+
+        target = written.__target__
+        old = None
+        if written.__dep__.listeners is not None or global_listeners:
+            old = target.copy()
+        result = func(*args, **kwargs)
+        written._written(whole(target.shape), old)
+        return result
+
+    def fill(self, value: Any) -> None:
+        self[...] = value
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        self._write_whole("sort", args, kwargs)
+
+    def partition(self, *args: Any, **kwargs: Any) -> None:
+        self._write_whole("partition", args, kwargs)
+
+    def put(self, *args: Any, **kwargs: Any) -> None:
+        self._write_whole("put", args, kwargs)
+
+    def _write_whole(self, method: str, args: tuple[Any, ...], kwargs: Any) -> None:
+        if self.__readonly__:
+            raise ReadonlyError()
+        target = self.__target__
+        dep = self.__dep__
+        old = None
+        if dep.listeners is not None or global_listeners:
+            old = target.copy()
+        getattr(target, method)(*args, **kwargs)
+        self._written(whole(target.shape), old)
+
+
+class DirtyRegions:
+    """
+    Collects the regions of the given array proxy that are written to,
+    until they are cleared. Typically used together with a watcher of
+    the array: its callback processes the dirty regions (e.g. `ranges`)
+    and clears them.
+
+    limit: The number of regions to keep at most. When there are more,
+        they are replaced by their bounding box.
+    """
+
+    __slots__ = ("__weakref__", "_ref", "array", "limit", "regions")
+
+    def __init__(self, array: ArrayProxy | Any, limit: int = 64) -> None:
+        if not isinstance(array, ArrayProxy):
+            raise TypeError("DirtyRegions() expects an array proxy")
+        self.array = array
+        self.limit = limit
+        self.regions: list[Region] = []
+
+        # Not a listener of the array: listeners get the old contents
+        # of every write, which the writes would have to copy
+        self._ref: ref[DirtyRegions] | None = ref(self)
+        DIRTY.setdefault(id(array.__target__), []).append(self._ref)
+
+    def __del__(self) -> None:
+        self.close()
+
+    def __bool__(self) -> bool:
+        return bool(self.regions)
+
+    def __len__(self) -> int:
+        return len(self.regions)
+
+    def add(self, region: Region) -> None:
+        """
+        Marks the given region as dirty.
+        """
+        regions = self.regions
+        if regions and regions[-1] == region:
+            return
+        regions.append(region)
+        if len(regions) > self.limit:
+            self.regions = [bounding_box(regions)]
+
+    def bounding_box(self) -> Region | None:
+        """
+        Returns the bounding box of the dirty regions, or None when
+        there are none.
+        """
+        if not self.regions:
+            return None
+        return bounding_box(self.regions)
+
+    def ranges(self, axis: int = 0) -> list[tuple[int, int]]:
+        """
+        Returns the (start, stop) ranges of indices along the given
+        axis that are dirty, sorted and merged: ranges that overlap or
+        touch are combined.
+        """
+        spans = sorted(
+            (region[axis].start, region[axis].stop)
+            for region in self.regions
+            if region[axis].start < region[axis].stop
+        )
+        merged: list[tuple[int, int]] = []
+        for start, stop in spans:
+            if merged and start <= merged[-1][1]:
+                if stop > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], stop)
+            else:
+                merged.append((start, stop))
+        return merged
+
+    def clear(self) -> None:
+        """
+        Forgets the dirty regions.
+        """
+        self.regions = []
+
+    def close(self) -> None:
+        """
+        Stops collecting regions.
+        """
+        weak_self = self._ref
+        if weak_self is None:
+            return
+        self._ref = None
+        obj_id = id(self.array.__target__)
+        dirty = DIRTY.get(obj_id)
+        if dirty is not None and weak_self in dirty:
+            dirty.remove(weak_self)
+            if not dirty:
+                del DIRTY[obj_id]
+
+
+def bounding_box(regions: list[Region]) -> Region:
+    return tuple(
+        slice(min(axis.start for axis in axes), max(axis.stop for axis in axes))
+        for axes in zip(*regions, strict=True)
+    )
@@ -0,0 +1,193 @@
+"""
+Effect scopes capture the watchers (and computeds) that are created
+while they are active, so that they can be kept alive, paused,
+resumed and stopped together.
+"""
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
+from weakref import ref
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from contextvars import Token
+    from types import TracebackType
+
+    from .watcher import Watcher
+
+# The scope that captures newly created watchers. Context-local, like
+# the dependency stack, so that scopes on different threads (or in
+# different asyncio tasks) don't capture each other's watchers
+active_scope: ContextVar[EffectScope | None] = ContextVar(
+    "observ_active_scope", default=None
+)
+
+
+def current_scope() -> EffectScope | None:
+    """
+    Returns the effect scope that is currently active, if any.
+    """
+    return active_scope.get()
+
+
+class EffectScope:
+    """
+    Captures every watcher (and computed) that is created inside of
+    it, and keeps them alive until the scope is stopped. Use it as a
+    context manager (or through `run`), as often as needed:
+
+        scope = EffectScope()
+        with scope:
+            watch(...)
+            ...
+        scope.stop()
+
+    Scopes that are created inside an active scope are captured as
+    well (and stopped along with it), unless they are detached.
+    Watchers and scopes that are stopped on their own are removed from
+    the scope that captured them.
+    """
+
+    __slots__ = (
+        "__weakref__",
+        "_active",
+        "_parent",
+        "_paused",
+        "_tokens",
+        "scopes",
+        "watchers",
+    )
+
+    # Dicts (used as ordered sets), so that stopped watchers and
+    # scopes remove themselves in O(1)
+    scopes: dict[EffectScope, None]
+    watchers: dict[Watcher, None]
+
+    def __init__(self, detached: bool = False) -> None:
+        self._active = True
+        self._paused = False
+        self._tokens: list[Token[EffectScope | None]] = []
+        self.watchers = {}
+        self.scopes = {}
+        # The scope that captured this scope, held weakly: the parent
+        # holds its nested scopes strongly
+        self._parent: ref[EffectScope] | None = None
+        if not detached:
+            parent = active_scope.get()
+            if parent is not None:
+                parent.scopes[self] = None
+                self._parent = ref(parent)
+
+    def __enter__(self) -> EffectScope:
+        if not self._active:
+            raise RuntimeError("Cannot enter a stopped effect scope")
+        self._tokens.append(active_scope.set(self))
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        active_scope.reset(self._tokens.pop())
+
+    def __len__(self) -> int:
+        """
+        Returns the number of watchers in this scope, including the
+        ones in nested scopes.
+        """
+        return len(self.watchers) + sum(len(scope) for scope in self.scopes)
+
+    def run[T](self, fn: Callable[[], T]) -> T:
+        """
+        Calls fn with this scope active, and returns its result.
+        """
+        with self:
+            return fn()
+
+    @property
+    def active(self) -> bool:
+        """
+        Returns whether this scope has not been stopped yet.
+        """
+        return self._active
+
+    @property
+    def paused(self) -> bool:
+        """
+        Returns whether this scope is currently paused.
+        """
+        return self._paused
+
+    def add(self, watcher: Watcher) -> None:
+        """
+        Adds the given watcher to this scope. Watchers that are created
+        while the scope is active are added automatically.
+        """
+        if not self._active:
+            raise RuntimeError("Cannot add a watcher to a stopped effect scope")
+        self.watchers[watcher] = None
+        watcher._scope = ref(self)
+        if self._paused:
+            watcher.pause()
+
+    def remove(self, watcher: Watcher) -> None:
+        """
+        Removes the given watcher from this scope, without stopping it.
+        Watchers that are stopped remove themselves.
+        """
+        self.watchers.pop(watcher, None)
+
+    def stop(self) -> None:
+        """
+        Stops all watchers in this scope (and its nested scopes), and
+        releases them. A stopped scope can't be used anymore.
+        """
+        if not self._active:
+            return
+        self._active = False
+        self._paused = False
+        # Releasing the watchers releases their deps: watchers hold
+        # their deps strongly, deps hold their subscribers weakly.
+        # Released first, so that the watchers and scopes don't remove
+        # themselves one by one
+        watchers, self.watchers = self.watchers, {}
+        scopes, self.scopes = self.scopes, {}
+        for watcher in watchers:
+            watcher.stop()
+        for scope in scopes:
+            scope.stop()
+        parent_ref = self._parent
+        if parent_ref is not None:
+            self._parent = None
+            parent = parent_ref()
+            if parent is not None:
+                parent.scopes.pop(self, None)
+
+    def pause(self) -> None:
+        """
+        Pauses all watchers in this scope (and its nested scopes).
+        """
+        if not self._active or self._paused:
+            return
+        self._paused = True
+        for watcher in self.watchers:
+            watcher.pause()
+        for scope in self.scopes:
+            scope.pause()
+
+    def resume(self) -> None:
+        """
+        Resumes all watchers in this scope (and its nested scopes).
+        Watchers whose dependencies changed while paused trigger once.
+        """
+        if not self._active or not self._paused:
+            return
+        self._paused = False
+        for watcher in self.watchers:
+            watcher.resume()
+        for scope in self.scopes:
+            scope.resume()
@@ -0,0 +1,77 @@
+"""
+Serializes reactive state to JSON directly from the raw targets behind
+the proxies, without building a raw copy (see `to_raw`) first.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+from .dep import get_dep_stack
+from .proxy import Lazy, Proxy
+from .watcher import traverse
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from typing import IO
+
+
+def unwrap(obj: Any) -> Any:
+    """
+    The default function of the encoders: proxies (which the encoder
+    doesn't recognize as containers) are replaced by their targets,
+    and placeholders (see Lazy) by their loaded containers.
+    """
+    if isinstance(obj, Proxy):
+        return obj.__target__
+    if isinstance(obj, Lazy):
+        return obj.load()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def iter_json(target: Any, track: bool = True, **kwargs: Any) -> Iterator[str]:
+    """
+    Returns an iterator that encodes the given proxy (or any value
+    that contains proxies) as JSON, chunk by chunk, as it is consumed.
+    The state is read while iterating, not when this function returns:
+    don't modify it from the moment this function is called until the
+    iterator is exhausted (or dropped).
+
+    track: When called while a watcher (or computed) is evaluating,
+        make it depend on everything that is serialized (like a deep
+        watcher would), so that it re-evaluates when any of it changes.
+    kwargs: Passed on to `json.JSONEncoder`, e.g. indent or sort_keys.
+    """
+    if track and get_dep_stack():
+        traverse(target)
+    encoder = json.JSONEncoder(default=unwrap, **kwargs)
+    if isinstance(target, Proxy):
+        target = target.__target__
+    return encoder.iterencode(target)
+
+
+def dump_json(target: Any, fp: IO[str], track: bool = True, **kwargs: Any) -> None:
+    """
+    Writes the given proxy (or any value that contains proxies) as
+    JSON to the given file(-like object), chunk by chunk. See
+    `iter_json` for the arguments.
+    """
+    write = fp.write
+    for chunk in iter_json(target, track, **kwargs):
+        write(chunk)
+
+
+def dumps_json(target: Any, track: bool = True, **kwargs: Any) -> str:
+    """
+    Returns the given proxy (or any value that contains proxies) as a
+    JSON string. Faster than joining the chunks of `iter_json`, since
+    the whole string is encoded at once. See `iter_json` for the
+    arguments.
+    """
+    if track and get_dep_stack():
+        traverse(target)
+    encoder = json.JSONEncoder(default=unwrap, **kwargs)
+    if isinstance(target, Proxy):
+        target = target.__target__
+    return encoder.encode(target)
@@ -0,0 +1,325 @@
+"""
+Snapshots freeze the state of a reactive tree in constant time: the
+containers in the tree are only copied when they are mutated after
+the snapshot was taken (copy-on-write), so the cost of keeping the
+previous state around is proportional to what changed.
+"""
+
+from __future__ import annotations
+
+from copy import copy
+from typing import TYPE_CHECKING, Any
+from weakref import ref
+
+from .proxy import (
+    LEAF_TYPES,
+    OBJECT_FIELDS,
+    PLAIN_TYPES,
+    Lazy,
+    Proxy,
+    Raw,
+    copy_tree,
+    proxy,
+)
+from .proxy_db import MISSING, global_listeners
+
+if TYPE_CHECKING:
+    from .proxy_db import Change, TargetDep
+
+
+def snapshot(target: Proxy[Any] | Any) -> Snapshot:
+    """
+    Returns a snapshot of the current state of the given proxy (and
+    everything nested inside it). Taking a snapshot doesn't copy
+    anything: containers are copied when they are first mutated
+    (through a proxy) while the snapshot is alive. Use `to_raw` to get
+    the state as it was, and `restore` to undo all changes.
+    """
+    if not isinstance(target, Proxy):
+        raise TypeError("snapshot() expects a proxy")
+    return Snapshot(target.__target__)
+
+
+class Snapshot:
+    """
+    The frozen state of a reactive tree, see `snapshot`.
+
+    Every container of the tree that is mutated while the snapshot is
+    alive is preserved. Whether a mutated container is part of the
+    tree is decided when it is first mutated, by walking the tree as
+    of the snapshot until the container is found. The walk resumes
+    where it left off for the next container, so every container of
+    the tree is visited at most once, and taking the snapshot stays
+    cheap. When the tree holds containers that are not loaded (see
+    disk), every mutated container is preserved. Release the snapshot
+    (or drop it) to stop preserving.
+    """
+
+    __slots__ = (
+        "__weakref__",
+        "_listener",
+        "found",
+        "members",
+        "pending",
+        "preserved",
+        "root",
+    )
+
+    def __init__(self, root: Any) -> None:
+        self.root = root
+        # id(container) -> [container, copy as of the snapshot, version
+        # of the container right after copying]. The container itself
+        # is kept alive so that its id can't be reused
+        self.preserved: dict[int, list[Any]] = {}
+        # The ids of the containers of the tree that have been visited
+        # by the walk (see is_member). The tree as of the snapshot (the
+        # root and the copies) keeps them alive
+        self.members: set[int] | Everything = set()
+        # The values that the walk has yet to visit, None once it is
+        # complete
+        self.pending: list[Any] | None = [root]
+        # Mutated containers that the walk found, whose contents are
+        # yet to be added to pending. Their copies can only be walked
+        # once their mutation is complete
+        self.found: list[Any] = []
+
+        # Holds the snapshot weakly: the global listeners would keep
+        # it alive otherwise
+        weak_self = ref(self)
+
+        def listener(dep: TargetDep, change: Change) -> None:
+            snapshot = weak_self()
+            if snapshot is not None:
+                snapshot.record(dep, change)
+
+        self._listener: Any = listener
+        global_listeners.append(listener)
+
+    def __del__(self) -> None:
+        self.release()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of containers that have been preserved.
+        """
+        return len(self.preserved)
+
+    @property
+    def active(self) -> bool:
+        """
+        Returns whether the snapshot is still preserving state.
+        """
+        return self._listener is not None
+
+    def release(self) -> None:
+        """
+        Stops preserving state. The snapshot can't be used anymore.
+        """
+        listener = self._listener
+        if listener is None:
+            return
+        self._listener = None
+        self.preserved = {}
+        self.members = set()
+        self.pending = None
+        self.found = []
+        if listener in global_listeners:
+            global_listeners.remove(listener)
+
+    def record(self, dep: TargetDep, change: Change) -> None:
+        """
+        Preserves the state of the target of the given dep from before
+        the mutation that the given change record describes. Change
+        records are emitted after a mutation, so the target is copied
+        and the change is undone on the copy. Containers that are not
+        part of the tree are ignored.
+        """
+        target = dep.target
+        obj_id = id(target)
+        entry = self.preserved.get(obj_id)
+        if entry is None:
+            if not self.is_member(target):
+                return
+            # Instances of classes registered with reactive_class (and
+            # array.array, see buffer_proxy) don't have a copy method
+            cls = type(target)
+            if cls in OBJECT_FIELDS or cls in LEAF_TYPES:
+                frozen = copy(target)
+            else:
+                frozen = target.copy()
+            entry = [target, frozen, dep.version]
+            self.preserved[obj_id] = entry
+        elif entry[2] != dep.version:
+            # Preserved by an earlier mutation: the dep is notified
+            # (which bumps its version) after all records of a single
+            # mutation have been emitted
+            return
+        undo(entry[1], change)
+
+    def is_member(self, target: Any) -> bool:
+        """
+        Returns whether the given (raw) container, which is about to be
+        preserved, is part of the tree as of the snapshot. Walks the
+        tree until the container is found, or the walk is complete.
+        """
+        members = self.members
+        if id(target) in members:
+            return True
+        pending = self.pending
+        if pending is None or isinstance(members, Everything):
+            # The walk is complete (or was given up, see below)
+            return False
+        # The mutations of the containers that were found before are
+        # complete by now: records of a single mutation are all for
+        # the same container, which was preserved by the first one
+        found = self.found
+        while found:
+            push_contents(pending, self.resolve(found.pop()))
+        plain_types = PLAIN_TYPES
+        while pending:
+            current = pending.pop()
+            if isinstance(current, Proxy):
+                current = current.__target__
+            cls = type(current)
+            if cls in plain_types or isinstance(current, Raw):
+                continue
+            if cls is tuple:
+                pending.extend(current)
+                continue
+            if isinstance(current, Lazy):
+                # Can't be walked without loading, so everything is
+                # preserved from now on
+                self.members = EVERYTHING
+                self.pending = None
+                return True
+            obj_id = id(current)
+            if obj_id in members:
+                continue
+            members.add(obj_id)
+            if current is target:
+                # Already mutated: its contents are walked as of the
+                # snapshot (from its copy) later on
+                found.append(current)
+                return True
+            push_contents(pending, self.resolve(current))
+        self.pending = None
+        return False
+
+    def resolve(self, value: Any) -> Any:
+        """
+        Returns the given (raw) container as it was when the snapshot
+        was taken.
+        """
+        entry = self.preserved.get(id(value))
+        if entry is not None and entry[0] is value:
+            return entry[1]
+        return value
+
+    def to_raw(self) -> Any:
+        """
+        Returns a raw copy of the tree as it was when the snapshot was
+        taken. Shared containers (and cycles) are preserved.
+        """
+        if self._listener is None:
+            raise RuntimeError("Snapshot has been released")
+        return copy_tree(self.root, self.resolve)
+
+    def restore(self) -> None:
+        """
+        Writes the state of the snapshot back into the tree (through
+        proxies, so that watchers are notified). Only the containers
+        that changed are written to.
+        """
+        if self._listener is None:
+            raise RuntimeError("Snapshot has been released")
+        for target, frozen, _ in list(self.preserved.values()):
+            writable = proxy(target, False, True)
+            cls = type(target)
+            if cls is list or cls in LEAF_TYPES:
+                writable[:] = frozen
+            elif cls is dict:
+                for key in [key for key in target if key not in frozen]:
+                    del writable[key]
+                writable.update(frozen)
+            elif cls in OBJECT_FIELDS:
+                for name in OBJECT_FIELDS[cls]:
+                    value = getattr(frozen, name, MISSING)
+                    if value is not MISSING:
+                        setattr(writable, name, value)
+                    elif hasattr(target, name):
+                        delattr(writable, name)
+            elif cls is set:
+                writable.difference_update(target - frozen)
+                writable.update(frozen)
+            else:
+                # An array (see regions)
+                writable[...] = frozen
+        # The tree is back in the state of the snapshot, so nothing
+        # needs to be preserved anymore
+        self.preserved = {}
+
+
+class Everything:
+    """
+    Contains every value (see Snapshot.members).
+    """
+
+    __slots__ = ()
+
+    def __contains__(self, value: object) -> bool:
+        return True
+
+
+EVERYTHING = Everything()
+
+
+def push_contents(pending: list[Any], source: Any) -> None:
+    """
+    Adds the values inside the given (raw) container that can be (or
+    hold) containers to the given list.
+    """
+    cls = type(source)
+    if cls is dict:
+        pending.extend(source.values())
+    elif cls is list:
+        pending.extend(source)
+    elif cls is set:
+        # Only tuples can contain containers
+        pending.extend(value for value in source if type(value) is tuple)
+    elif cls in OBJECT_FIELDS:
+        pending.extend(getattr(source, name, None) for name in OBJECT_FIELDS[cls])
+
+
+def undo(copy: Any, change: Change) -> None:
+    """
+    Reverts the change that the given record describes on the given
+    copy of the changed target.
+    """
+    kind = change[0]
+    if kind == "splice":
+        _, index, removed, inserted = change
+        copy[index : index + len(inserted)] = removed
+    elif kind == "region":
+        # An array (see regions)
+        copy[change[1]] = change[2]
+    elif type(copy) in OBJECT_FIELDS:
+        # An attribute was set or deleted. The copy is written with
+        # object.__setattr__, which also works for frozen dataclasses
+        name, old = change[1], change[2]
+        if old is MISSING:
+            object.__delattr__(copy, name)
+        else:
+            object.__setattr__(copy, name, old)
+    elif kind == "set":
+        _, key, old, _ = change
+        if old is MISSING:
+            del copy[key]
+        else:
+            copy[key] = old
+    elif kind == "delete":
+        # Note that the key ends up at the end of the dict
+        copy[change[1]] = change[2]
+    elif kind == "add":
+        copy.discard(change[1])
+    else:
+        copy.add(change[1])
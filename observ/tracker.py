@@ -0,0 +1,356 @@
+"""
+Dirty trackers accumulate which sources changed, so that render loops
+(and other polling integrations) can pick up all changes once per
+frame, instead of reacting to them through callbacks.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import TYPE_CHECKING, Any
+from weakref import ref
+
+from .dep import push_watcher
+from .proxy import (
+    OBJECT_FIELDS,
+    PLAIN_TYPES,
+    TYPE_LOOKUP,
+    Lazy,
+    Proxy,
+    object_values,
+    proxy,
+)
+from .proxy_db import TargetDep, proxy_db
+from .watcher import Watcher, traverse
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from .dep import Dep
+    from .watcher import Watchable
+
+
+def lookup_key(key: Any) -> Any:
+    """
+    Returns the key to store a source under: the key itself when it
+    is hashable, and otherwise its identity (e.g. for dict and list
+    proxies, which are the default keys of their sources).
+    """
+    try:
+        hash(key)
+    except TypeError:
+        return (DirtyTracker, id(key))
+    return key
+
+
+class DirtyTracker:
+    """
+    Tracks a number of sources (proxies, computeds or functions) and
+    collects the ones that changed, without running any callbacks:
+
+        tracker = DirtyTracker()
+        tracker.track(state["camera"], key="camera")
+        tracker.track(visible_items, key="items")
+
+        def draw_frame():
+            for key in tracker.collect():
+                ...
+
+    Proxies are watched deeply (like with `watch`). Every source is
+    reported at most once per `collect`, no matter how often it
+    changed in between.
+
+    A proxy source is traversed once, when it is tracked. After that,
+    collecting only scans the containers of the source that changed,
+    to start tracking the containers that were added to them.
+    Containers that were removed from the source are tracked until the
+    source is traversed again (which happens once the scanned
+    containers add up to the size of the source): changes to them
+    still report the source until then.
+    """
+
+    __slots__ = ("__weakref__", "_dirty", "sources")
+
+    def __init__(self) -> None:
+        # lookup key (see lookup_key) -> watcher
+        self.sources: dict[Any, TrackedSource] = {}
+        # The watchers that became dirty since the last collect, in
+        # order. A deque, so that notifications from other threads
+        # can't get lost while collecting
+        self._dirty: deque[TrackedSource] = deque()
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def __contains__(self, key: Any) -> bool:
+        return lookup_key(key) in self.sources
+
+    def track(
+        self, source: Watchable[Any], key: Any = None, deep: bool | None = None
+    ) -> Any:
+        """
+        Starts tracking the given source, and returns the key that
+        `collect` reports it with: key, or the source itself when no
+        key is given. Tracking a key again replaces its source.
+        """
+        if key is None:
+            key = source
+        self.untrack(key)
+        self.sources[lookup_key(key)] = TrackedSource(self, source, key, deep)
+        return key
+
+    def untrack(self, key: Any) -> None:
+        """
+        Stops tracking the source with the given key, if any.
+        """
+        watcher = self.sources.pop(lookup_key(key), None)
+        if watcher is not None:
+            watcher.stop()
+
+    def collect(self) -> list[Any]:
+        """
+        Returns the keys of the sources that changed since the last
+        call (in order of their first change), and resets them. Sources
+        that didn't change are not visited. Changed functions (and
+        computeds) are re-evaluated to track their (possibly changed)
+        dependencies. Changed proxies are not: only their containers
+        that changed are scanned, so the cost is proportional to the
+        size of the changes.
+        """
+        dirty = self._dirty
+        keys = []
+        while dirty:
+            watcher = dirty.popleft()
+            if not watcher.active:
+                continue
+            watcher.refresh()
+            keys.append(watcher.key)
+        return keys
+
+    def clear(self) -> None:
+        """
+        Stops tracking all sources.
+        """
+        sources = self.sources
+        self.sources = {}
+        self._dirty.clear()
+        for watcher in sources.values():
+            watcher.stop()
+
+
+class TrackedSource(Watcher[Any]):
+    """
+    Watcher that marks itself dirty in its tracker when its
+    dependencies change. It is only re-evaluated when collected.
+
+    For proxy sources, it subscribes a ContainerMark to the dep of
+    every container instead of itself, so that it knows which
+    containers changed (see refresh).
+    """
+
+    __slots__ = ("changed", "key", "marks", "scanned", "tracker")
+
+    # dep -> the mark that is subscribed to it, None for sources that
+    # are re-evaluated when they changed
+    marks: dict[Dep, ContainerMark] | None
+
+    def __init__(
+        self, tracker: DirtyTracker, source: Watchable[Any], key: Any, deep: bool | None
+    ) -> None:
+        # Held weakly: the tracker holds its watchers
+        self.tracker = ref(tracker)
+        self.key = key
+        self.marks = None
+        # The deps that notified since the last refresh
+        self.changed: set[Dep] = set()
+        # The number of values that were scanned since the source was
+        # last traversed
+        self.scanned = 0
+        super().__init__(source, lazy=True, deep=deep)
+        if isinstance(source, Proxy) and self.deep:
+            self.marks = {}
+        self.evaluate()
+
+    def update(self) -> None:
+        if self._paused:
+            self._pending_update = True
+            return
+        if self.dirty:
+            return
+        self.dirty = True
+        tracker = self.tracker()
+        if tracker is not None:
+            tracker._dirty.append(self)
+
+    def container_changed(self, dep: Dep) -> None:
+        """
+        Called by the mark of the given dep when it is notified.
+        """
+        self.changed.add(dep)
+        self.update()
+
+    def refresh(self) -> None:
+        """
+        Brings the dependencies up to date after the source changed:
+        scans the containers that changed, and tracks the ones that
+        were added to them. Sources without marks are re-evaluated.
+        """
+        marks = self.marks
+        changed = self.changed
+        self.changed = set()
+        if marks is None:
+            self.evaluate()
+            return
+        targets = []
+        for dep in changed:
+            if not isinstance(dep, TargetDep):
+                # E.g. the dep of a container that is not loaded
+                self.traverse()
+                return
+            targets.append(dep.target)
+        self._new_deps = new_deps = set()
+        stack = push_watcher(self)
+        try:
+            for target in targets:
+                self.scanned += self.track_contents(target)
+        finally:
+            stack.pop()
+            self._deps |= new_deps
+            self._new_deps = None
+        self.dirty = False
+        # Containers that were removed from the source stay subscribed
+        # until the next traversal, whose cost is amortized over the
+        # scans
+        if self.scanned > len(marks):
+            self.traverse()
+
+    def traverse(self) -> None:
+        """
+        Traverses the whole source, which also unsubscribes from the
+        containers that were removed from it.
+        """
+        self.scanned = 0
+        self.evaluate()
+
+    def track_contents(self, target: Any) -> int:
+        """
+        Traverses the values of the given (raw) container that are not
+        tracked yet. Returns the number of values in the container.
+        """
+        marks: Any = self.marks
+        db = proxy_db.db
+        cls = type(target)
+        if cls is dict:
+            values = list(target.values())
+        elif cls is list or cls is set:
+            values = list(target)
+        elif cls in OBJECT_FIELDS:
+            values = object_values(target, OBJECT_FIELDS[cls])
+        else:
+            return 0
+        size = len(values)
+        while values:
+            value = values.pop()
+            cls = type(value)
+            if cls in PLAIN_TYPES:
+                continue
+            if cls is tuple:
+                # Tuples have no dep of their own
+                values.extend(value)
+                continue
+            if isinstance(value, Lazy):
+                self.add_dep(value.dep())
+                continue
+            raw = value.__target__ if isinstance(value, Proxy) else value
+            weak_dep = db.get(id(raw))
+            dep = weak_dep() if weak_dep is not None else None
+            if dep is not None and dep in marks:
+                # Tracked along with everything inside it
+                continue
+            if isinstance(value, Proxy):
+                traverse(value)
+            elif cls in TYPE_LOOKUP:
+                traverse(proxy(value))
+        return size
+
+    def add_dep(self, dep: Dep) -> None:
+        marks = self.marks
+        if marks is None:
+            super().add_dep(dep)
+            return
+        new_deps: Any = self._new_deps
+        if new_deps is None:
+            return
+        if dep not in new_deps:
+            new_deps.add(dep)
+            if dep not in marks:
+                self.subscribe(dep)
+
+    def add_deps(self, deps: Iterable[Dep]) -> None:
+        marks = self.marks
+        if marks is None:
+            super().add_deps(deps)
+            return
+        new_deps = self._new_deps
+        current = self._deps if new_deps is None else new_deps
+        for dep in deps:
+            if dep not in current:
+                current.add(dep)
+                if dep not in marks:
+                    self.subscribe(dep)
+
+    def subscribe(self, dep: Dep) -> None:
+        marks: Any = self.marks
+        # Any-typed: a mark is subscribed like a watcher, but isn't one
+        mark: Any = ContainerMark(self, dep)
+        marks[dep] = mark
+        dep.add_sub(mark)
+
+    def cleanup_deps(self) -> None:
+        marks = self.marks
+        if marks is None:
+            super().cleanup_deps()
+            return
+        new_deps = self._new_deps
+        if new_deps is None:
+            return
+        for dep in self._deps - new_deps:
+            mark: Any = marks.pop(dep, None)
+            if mark is not None:
+                dep.remove_sub(mark)
+        self._deps = new_deps
+        self._new_deps = None
+
+    def stop(self) -> None:
+        super().stop()
+        self.changed = set()
+        if self.marks is not None:
+            # The deps hold their marks weakly
+            self.marks = {}
+
+
+class ContainerMark:
+    """
+    Subscriber to the dep of a container of a tracked proxy, which
+    tells its source which container changed.
+    """
+
+    __slots__ = ("__weakref__", "dep", "id", "source")
+
+    def __init__(self, source: TrackedSource, dep: Dep) -> None:
+        # Held weakly: the source holds its marks
+        self.source = ref(source)
+        self.dep = dep
+        # Sorts like its source, see Dep.notify
+        self.id = source.id
+
+    def update(self) -> None:
+        source = self.source()
+        if source is not None and source._active:
+            source.container_changed(self.dep)
+
+    def add_deps(self, deps: Iterable[Dep]) -> None:
+        # See DiskStore.load
+        source = self.source()
+        if source is not None and source._active:
+            source.add_deps(deps)
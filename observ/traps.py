@@ -1,15 +1,18 @@
 from __future__ import annotations
 
 from functools import partial, wraps
+from operator import index as operator_index
 from typing import TYPE_CHECKING, Any
 
-from .dep import Dep
+from .dep import get_dep_stack
 from .proxy import Proxy, proxy
+from .proxy_db import MISSING, global_listeners
 
 if TYPE_CHECKING:
     from collections.abc import Callable
 
     from .dict_proxy import DictProxyBase
+    from .proxy_db import TargetDep
 
     # A trap wraps a method of a container type (dict, list or set)
     # with dependency tracking and/or change notification
@@ -21,11 +24,12 @@ if TYPE_CHECKING:
 # Performance notes that apply to all trap factories below. Traps are
 # the per-read/per-write entry points of observ, so their call overhead
 # is felt in every interaction with a proxy:
-# - The Dep.stack list (a ClassVar that is only ever mutated, never
-#   reassigned) is bound to a closure variable, which is cheaper to
-#   load than a global plus an attribute
-# - Dep.depend() is inlined as dep_stack[-1].add_dep(dep), which saves
-#   a method call plus a second check of the stack per tracked read
+# - The getter of the (context-local) dependency stack is bound to a
+#   closure variable, which is cheaper to load than a global plus an
+#   attribute. ContextVar.get() is a C-level lookup that is cached per
+#   thread, so this costs about as much as a shared list would
+# - Dep.depend() is inlined as stack[-1].add_dep(dep), which saves a
+#   method call plus a second lookup of the stack per tracked read
 # - proxy() is called with positional arguments; keyword arguments
 #   make a call measurably slower
 # - Trap signatures only take **kwargs when a wrapped method actually
@@ -45,12 +49,13 @@ class ReadonlyError(Exception):
 
 def read_trap(method: str, obj_cls: type) -> Trap:
     fn = getattr(obj_cls, method)
-    dep_stack = Dep.stack
+    get_stack = get_dep_stack
 
     @wraps(fn)
     def trap(self: Proxy[Any], *args: Any) -> Any:
-        if dep_stack:
-            dep_stack[-1].add_dep(self.__dep__)
+        stack = get_stack()
+        if stack:
+            stack[-1].add_dep(self.__dep__)
         value = fn(self.__target__, *args)
         if self.__shallow__:
             return value
@@ -69,14 +74,15 @@ def iterate_trap(method: str, obj_cls: type) -> Trap:
     fn = getattr(obj_cls, method)
     # Hoist the method check out of the trap
     is_items = method == "items"
-    dep_stack = Dep.stack
+    get_stack = get_dep_stack
 
     # The wrapped iterator methods (items, values, keys, __iter__,
     # __reversed__) take no arguments at all
     @wraps(fn)
     def trap(self: Proxy[Any]) -> Any:
-        if dep_stack:
-            dep_stack[-1].add_dep(self.__dep__)
+        stack = get_stack()
+        if stack:
+            stack[-1].add_dep(self.__dep__)
         iterator = fn(self.__target__)
         if self.__shallow__:
             return iterator
@@ -92,12 +98,13 @@ def iterate_trap(method: str, obj_cls: type) -> Trap:
 
 def read_key_trap(method: str, obj_cls: type) -> Trap:
     fn = getattr(obj_cls, method)
-    dep_stack = Dep.stack
+    get_stack = get_dep_stack
 
     @wraps(fn)
     def trap(self: Proxy[Any], key: Any, *args: Any) -> Any:
-        if dep_stack:
-            dep_stack[-1].add_dep(self.__dep__.keydep(key))
+        stack = get_stack()
+        if stack:
+            stack[-1].add_dep(self.__dep__.keydep(key))
         value = fn(self.__target__, key, *args)
         if self.__shallow__:
             return value
@@ -107,7 +114,7 @@ def read_key_trap(method: str, obj_cls: type) -> Trap:
 
 
 # Sentinel to distinguish 'key not present' from 'value is None'
-_MISSING = object()
+_MISSING = MISSING
 
 # Stand-in for TargetDep.keydeps when it hasn't been materialized
 # (never written to, only used for lookups)
@@ -159,9 +166,13 @@ def write_dict_trap(method: str, obj_cls: type) -> Trap:
         retval = fn(target, incoming)
         dep = self.__dep__
         keydeps = dep.keydeps if dep.keydeps is not None else _NO_KEYDEPS
+        emitting = dep.listeners is not None or bool(global_listeners)
         change_detected = False
         for key, old_value in old_values.items():
-            if old_value is not target_get(key, _MISSING):
+            new_value = target_get(key, _MISSING)
+            if old_value is not new_value:
+                if emitting:
+                    dep.emit(("set", key, old_value, new_value))
                 keydep = keydeps.get(key)
                 if keydep is not None:
                     keydep.notify()
@@ -173,16 +184,106 @@ def write_dict_trap(method: str, obj_cls: type) -> Trap:
     return trap
 
 
+def splice_start(method: str, target: list[Any], args: tuple[Any, ...]) -> Any:
+    """
+    Returns the index and the items that the given list method is
+    about to replace when it is called with the given arguments. The
+    number of inserted items follows from the change in length.
+    Extended slices and whole-list operations are described as a
+    splice of the whole list. Arguments for which the method will
+    raise describe an empty splice.
+    """
+    size = len(target)
+    if method in ("append", "extend", "__iadd__"):
+        return size, []
+    if method == "insert":
+        index = operator_index(args[0])
+        if index < 0:
+            index = max(index + size, 0)
+        return min(index, size), []
+    if method == "remove":
+        try:
+            index = target.index(args[0])
+        except ValueError:
+            return 0, []
+        return index, [target[index]]
+    if method in ("pop", "__delitem__", "__setitem__"):
+        key = args[0] if args else -1
+        if type(key) is slice:
+            start, stop, step = key.indices(size)
+            if step == 1:
+                return start, target[start : max(start, stop)]
+        else:
+            try:
+                index = operator_index(key)
+            except TypeError:
+                return 0, []
+            if index < 0:
+                index += size
+            if 0 <= index < size:
+                return index, [target[index]]
+            return 0, []
+    # clear, __imul__ and extended slices
+    return 0, target[:]
+
+
+def emit_splice(
+    dep: TargetDep, target: list[Any], index: int, removed: list[Any], size: int
+) -> None:
+    """
+    Emits the splice at index that replaced the removed items, given
+    the size of the target before the mutation.
+    """
+    stop = index + len(target) - size + len(removed)
+    dep.emit(("splice", index, removed, target[index:stop]))
+
+
+def emit_set_difference(dep: TargetDep, old: set[Any], new: set[Any]) -> None:
+    """
+    Emits the changes that turned the old set into the new set.
+    """
+    for value in old - new:
+        dep.emit(("discard", value))
+    for value in new - old:
+        dep.emit(("add", value))
+
+
 def write_len_compare_trap(method: str, obj_cls: type) -> Trap:
     fn = getattr(obj_cls, method)
+    is_list = obj_cls is list
+    is_single = method in ("add", "discard", "remove", "pop")
 
     @wraps(fn)
     def trap(self: Proxy[Any], *args: Any) -> Any:
         target = self.__target__
+        dep = self.__dep__
         old_len = len(target)
+        if dep.listeners is not None or global_listeners:
+            if is_list:
+                index, removed = splice_start(method, target, args)
+                retval = fn(target, *args)
+                if len(target) != old_len:
+                    emit_splice(dep, target, index, removed, old_len)
+                    dep.notify()
+            elif is_single:
+                # Set methods that add or remove a single value
+                retval = fn(target, *args)
+                if len(target) != old_len:
+                    if method == "add":
+                        dep.emit(("add", args[0]))
+                    else:
+                        dep.emit(("discard", retval if method == "pop" else args[0]))
+                    dep.notify()
+            else:
+                old = target.copy()
+                retval = fn(target, *args)
+                if len(target) != old_len:
+                    emit_set_difference(dep, old, target)
+                    dep.notify()
+            return retval
         retval = fn(target, *args)
         if len(target) != old_len:
-            self.__dep__.notify()
+            dep.notify()
         return retval
 
     return trap
@@ -190,6 +291,7 @@ def write_len_compare_trap(method: str, obj_cls: type) -> Trap:
 
 def write_copy_compare_trap(method: str, obj_cls: type) -> Trap:
     fn = getattr(obj_cls, method)
+    is_list = obj_cls is list
 
     # list.sort takes keyword arguments (key and reverse), so this is
     # the one write trap that must accept **kwargs
@@ -199,7 +301,13 @@ def write_copy_compare_trap(method: str, obj_cls: type) -> Trap:
         old = target.copy()
         retval = fn(target, *args, **kwargs)
         if target != old:
-            self.__dep__.notify()
+            dep = self.__dep__
+            if dep.listeners is not None or global_listeners:
+                if is_list:
+                    dep.emit(("splice", 0, old, target[:]))
+                else:
+                    emit_set_difference(dep, old, target)
+            dep.notify()
         return retval
 
     return trap
@@ -216,18 +324,29 @@ def write_setitem_trap(method: str, obj_cls: type) -> Trap:
         except (IndexError, TypeError):
             # Let the actual operation raise the appropriate error
             return fn(target, key, value)
+        dep = self.__dep__
         if type(key) is slice:
             # Slice assignment can change the length as well as
             # replace a same-length stretch of items
             old_len = len(target)
-            retval = fn(target, key, value)
-            changed = len(target) != old_len or target[key] != old_value
+            if dep.listeners is not None or global_listeners:
+                index, removed = splice_start(method, target, (key,))
+                retval = fn(target, key, value)
+                changed = len(target) != old_len or target[key] != old_value
+                if changed:
+                    emit_splice(dep, target, index, removed, old_len)
+            else:
+                retval = fn(target, key, value)
+                changed = len(target) != old_len or target[key] != old_value
         else:
             retval = fn(target, key, value)
             new_value = target[key]
             changed = new_value is not old_value and new_value != old_value
+            if changed and (dep.listeners is not None or global_listeners):
+                index, _ = splice_start(method, target, (key,))
+                dep.emit(("splice", index, [old_value], [new_value]))
         if changed:
-            self.__dep__.notify()
+            dep.notify()
         return retval
 
     return trap
@@ -258,6 +377,8 @@ def write_key_trap(method: str, obj_cls: type) -> Trap:
             or old_value != new_value
         ):
             dep = self.__dep__
+            if dep.listeners is not None or global_listeners:
+                dep.emit(("set", key, old_value, new_value))
             keydeps = dep.keydeps
             if keydeps is not None:
                 keydep = keydeps.get(key)
@@ -275,8 +396,15 @@ def delete_trap(method: str, obj_cls: type) -> Trap:
     # The wrapped deleter methods (clear, popitem) take no arguments
     @wraps(fn)
     def trap(self: DictProxyBase) -> Any:
-        retval = fn(self.__target__)
         dep = self.__dep__
+        if dep.listeners is not None or global_listeners:
+            old = self.__target__.copy()
+            retval = fn(self.__target__)
+            for key, value in old.items():
+                if key not in self.__target__:
+                    dep.emit(("delete", key, value))
+        else:
+            retval = fn(self.__target__)
         dep.notify()
         keydeps = dep.keydeps if dep.keydeps is not None else _NO_KEYDEPS
         for key in self._orphaned_keydeps():
@@ -295,10 +423,13 @@ def delete_key_trap(method: str, obj_cls: type) -> Trap:
 
     @wraps(fn)
     def trap(self: Proxy[Any], key: Any, *args: Any) -> Any:
-        key_existed = key in self.__target__
-        retval = fn(self.__target__, key, *args)
-        if key_existed:
+        target = self.__target__
+        old_value = target.get(key, _MISSING)
+        retval = fn(target, key, *args)
+        if old_value is not _MISSING:
             dep = self.__dep__
+            if dep.listeners is not None or global_listeners:
+                dep.emit(("delete", key, old_value))
             dep.notify()
             keydeps = dep.keydeps
             if keydeps is not None:
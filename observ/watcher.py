@@ -8,22 +8,37 @@ from __future__ import annotations
 
 import asyncio
 import inspect
-from collections import deque
+from collections import OrderedDict, deque
 from collections.abc import Container
-from functools import wraps
+from functools import partial, wraps
 from itertools import count
 from typing import TYPE_CHECKING, Any, cast, overload
 from weakref import ref
 
-from .dep import Dep
-from .proxy import PLAIN_TYPES, Proxy, proxy
-from .proxy_db import proxy_db
+from .dep import Dep, dep_stack, get_dep_stack, push_watcher
+from .proxy import (
+    LEAF_TYPES,
+    OBJECT_FIELDS,
+    PLAIN_TYPES,
+    TYPE_LOOKUP,
+    Lazy,
+    Proxy,
+    object_values,
+    proxy,
+    to_raw,
+    trigger_ref,
+)
+from .proxy_db import MISSING, proxy_db
 from .scheduler import scheduler
+from .scope import active_scope
 
 if TYPE_CHECKING:
-    from collections.abc import Awaitable, Callable
+    from collections.abc import Awaitable, Callable, Iterable
+    from concurrent.futures import Executor, Future
     from types import MethodType
-    from typing import ClassVar, Protocol, TypeIs
+    from typing import ClassVar, Literal, Protocol, TypeIs
+
+    from .scope import EffectScope
 
     # Something that can be watched: a function (which doesn't have to
     # return anything) or a coroutine function, or a proxy (or other
@@ -34,6 +49,9 @@ if TYPE_CHECKING:
     type WatchCallback[T] = (
         Callable[[], Any] | Callable[[T], Any] | Callable[[T, T], Any]
     )
+    # Decides whether a newly evaluated value (the second argument)
+    # is equal to the previous value
+    type Equals[T] = Callable[[T | None, T], bool] | Literal["version"]
 
     class Computed[T](Protocol):
         """
@@ -51,6 +69,7 @@ def watch[T](
     sync: bool = False,
     deep: bool | None = None,
     immediate: bool = False,
+    equals: Equals[T] | None = None,
 ) -> Watcher[T]:
     """
     Watch the given function (or proxy) and call the optional callback
@@ -69,8 +88,18 @@ def watch[T](
     deep: Also watch for changes nested inside the watched value.
         Defaults to False when fn is callable, True otherwise.
     immediate: Call the callback right away with the initial value.
+    equals: Function that decides whether a newly evaluated value is
+        equal to the previous one, in which case the callback is not
+        called: equals(old, new) -> bool. It is called for every
+        newly evaluated value, the first time with None for old.
+        Pass "version" to compare (nested) containers by their
+        mutation versions, see `VersionEquals`. By default, values
+        are compared with !=, and containers (or any value, for deep
+        watchers) are always considered changed.
     """
-    watcher = Watcher(fn, sync=sync, lazy=False, deep=deep, callback=callback)
+    watcher = Watcher(
+        fn, sync=sync, lazy=False, deep=deep, callback=callback, equals=equals
+    )
     if immediate:
         watcher.dirty = True
         watcher.evaluate()
@@ -93,16 +122,46 @@ def watch_effect[T](
 
 
 @overload
-def computed[T](_fn: Callable[[], T]) -> Computed[T]: ...
+def computed[T](
+    _fn: Callable[[], T], *, deep: bool = True, equals: Equals[T] | None = None
+) -> Computed[T]: ...
 
 
 @overload
-def computed[T](*, deep: bool = True) -> Callable[[Callable[[], T]], Computed[T]]: ...
+def computed[T](
+    *, deep: bool = True, equals: Equals[T] | None = None
+) -> Callable[[Callable[[], T]], Computed[T]]: ...
 
 
+@overload
 def computed[T](
-    _fn: Callable[[], T] | None = None, *, deep: bool = True
-) -> Computed[T] | Callable[[Callable[[], T]], Computed[T]]:
+    _fn: Callable[[Any], T],
+    *,
+    deep: bool = True,
+    equals: Equals[T] | None = None,
+    inputs: Callable[[], Any],
+    executor: Executor,
+) -> Computed[T]: ...
+
+
+@overload
+def computed[T](
+    *,
+    deep: bool = True,
+    equals: Equals[T] | None = None,
+    inputs: Callable[[], Any],
+    executor: Executor,
+) -> Callable[[Callable[[Any], T]], Computed[T]]: ...
+
+
+def computed[T](
+    _fn: Callable[..., T] | None = None,
+    *,
+    deep: bool = True,
+    equals: Equals[T] | None = None,
+    inputs: Callable[[], Any] | None = None,
+    executor: Executor | None = None,
+) -> Computed[T] | Callable[[Callable[..., T]], Computed[T]]:
     """
     Create derived state from a function: the result is cached and
     only recomputed (lazily) when any of the reactive state it depends
@@ -110,19 +169,41 @@ def computed[T](
 
     Make sure fn doesn't need any arguments to run and that no
     reactive state is changed within the function.
+
+    When equals is given (see `watch`), a newly evaluated value that
+    is equal to the previous one is dropped: the computed keeps
+    returning the previous value, which keeps its identity stable.
+
+    To offload heavy work, pass a `concurrent.futures` executor and
+    an inputs function. Then inputs is evaluated (and its reactive
+    state depended on) instead, and fn is called in the executor
+    with a raw copy of its result (see `to_raw`), whenever it
+    changes. The computed returns the latest result (None until the
+    first one is in), and results arrive on the thread of the
+    running asyncio loop; without a running loop, changes block
+    until the result is in. Results of inputs that have changed in
+    the meantime are discarded. For a process pool, fn must be
+    picklable, so don't use the decorator syntax in that case.
     """
 
-    def decorator_computed(fn: Callable[[], T]) -> Computed[T]:
+    def decorator_computed(fn: Callable[..., T]) -> Computed[T]:
+        if executor is not None:
+            if inputs is None:
+                raise TypeError("computed() with an executor requires inputs")
+            return executor_computed(fn, inputs, executor, deep, equals)
+
         # The cast pins T for the watcher: inference against the
         # Watchable union cannot rule out that fn is a watched (plain)
-        # callable value rather than the function to evaluate
-        watcher = cast("Watcher[T]", Watcher(fn, deep=deep))
+        # callable value rather than the function to evaluate. For the
+        # same reason, equals is passed as an Any-typed local
+        watcher_equals: Any = equals
+        watcher = cast("Watcher[T]", Watcher(fn, deep=deep, equals=watcher_equals))
 
         @wraps(fn)
         def getter() -> T:
             if watcher.dirty:
                 watcher.evaluate()
-            if Dep.stack:
+            if get_dep_stack():
                 watcher.depend()
             # An Any-typed local instead of typing.cast, which would
             # incur a function call at runtime in this hot path (the
@@ -139,6 +220,127 @@ def computed[T](
     return decorator_computed(_fn)
 
 
+def computed_family[T](
+    fn: Callable[..., T], maxsize: int | None = 128, deep: bool = True
+) -> ComputedFamily[T]:
+    """
+    Create a family of computeds: the returned callable takes the
+    arguments for fn, and returns the value of the computed for that
+    combination of arguments. Computeds are created when they are
+    first needed, and are cached by their (hashable) arguments. Each
+    one has dependency tracking of its own.
+
+    When more than maxsize computeds are cached, the least recently
+    used ones are stopped and dropped (pass None for no limit), except
+    for the ones that are evaluating.
+    """
+    return ComputedFamily(fn, maxsize, deep)
+
+
+class ComputedFamily[T]:
+    """
+    The callable returned by `computed_family`.
+    """
+
+    __slots__ = ("computeds", "deep", "fn", "maxsize")
+
+    def __init__(self, fn: Callable[..., T], maxsize: int | None, deep: bool) -> None:
+        self.fn = fn
+        self.maxsize = maxsize
+        self.deep = deep
+        # Arguments -> computed, in order of use (most recent last)
+        self.computeds: OrderedDict[tuple[Any, ...], Computed[T]] = OrderedDict()
+
+    def __call__(self, *args: Any) -> T:
+        computeds = self.computeds
+        getter = computeds.get(args)
+        if getter is None:
+            getter = self.create(args)
+        else:
+            computeds.move_to_end(args)
+        return getter()
+
+    def __len__(self) -> int:
+        return len(self.computeds)
+
+    def __contains__(self, args: tuple[Any, ...]) -> bool:
+        return args in self.computeds
+
+    def create(self, args: tuple[Any, ...]) -> Computed[T]:
+        # The computeds belong to the family, so they are not captured
+        # by the effect scope that happens to be active when they are
+        # first needed (stopping that scope would break the cache)
+        token = active_scope.set(None)
+        try:
+            getter = computed(partial(self.fn, *args), deep=self.deep)
+        finally:
+            active_scope.reset(token)
+        computeds = self.computeds
+        computeds[args] = getter
+        maxsize = self.maxsize
+        if maxsize is not None and len(computeds) > maxsize:
+            # Neither the new computed nor the ones that are evaluating
+            # (e.g. the callers of this one, in a recursive family) are
+            # evicted: the cache exceeds maxsize until they are done
+            stack = get_dep_stack()
+            evicted = []
+            excess = len(computeds) - maxsize
+            for key, cached in computeds.items():
+                if len(evicted) == excess:
+                    break
+                if cached is not getter and cached.__watcher__ not in stack:
+                    evicted.append(key)
+            for key in evicted:
+                computeds.pop(key).__watcher__.stop()
+        return getter
+
+    def evict(self, *args: Any) -> None:
+        """
+        Stops and drops the computed for the given arguments, if any.
+        """
+        getter = self.computeds.pop(args, None)
+        if getter is not None:
+            getter.__watcher__.stop()
+
+    def clear(self) -> None:
+        """
+        Stops and drops all computeds.
+        """
+        computeds = self.computeds
+        self.computeds = OrderedDict()
+        for getter in computeds.values():
+            getter.__watcher__.stop()
+
+
+def executor_computed[T](
+    fn: Callable[[Any], T],
+    inputs: Callable[[], Any],
+    executor: Executor,
+    deep: bool,
+    equals: Equals[T] | None = None,
+) -> Computed[T]:
+    """
+    Returns the getter of a computed that runs fn in the given
+    executor, see `computed`.
+    """
+    watcher = ExecutorWatcher(inputs, fn, executor, deep, equals)
+    state = watcher.state
+
+    @wraps(fn)
+    def getter() -> T:
+        # Dependents depend on the result, not on the inputs: they
+        # are notified when a new result is published
+        value: Any = proxy(state, True, True)["value"]
+        error = state["error"]
+        if error is not None:
+            raise error
+        return value
+
+    computed_getter = cast("Computed[T]", getter)
+    computed_getter.__watcher__ = watcher
+    return computed_getter
+
+
 def traverse(obj: Any) -> None:
     """
     Non-recursively traverse the whole tree to make sure that the dep of
@@ -170,7 +372,7 @@ def traverse(obj: Any) -> None:
     seen_ids: set[int] = set()
     stack: deque[tuple[Any, bool]] = deque([(obj, False)])
     db = proxy_db.db
-    track = bool(Dep.stack)
+    track = bool(get_dep_stack())
 
     while stack:
         current, tracked = stack.pop()
@@ -180,9 +382,11 @@ def traverse(obj: Any) -> None:
             # are tracked depends on the shallow flag
             tracked = True
             child_tracked = not current.__shallow__
+            proxied = current
             current = current.__target__
         else:
             child_tracked = tracked
+            proxied = None
 
         # We are only interested in traversing a fixed set of types
         # otherwise we can just continue with the next branch
@@ -192,7 +396,33 @@ def traverse(obj: Any) -> None:
         elif cls is list or cls is set or cls is tuple:
             val_iter = current
         else:
-            continue
+            fields = OBJECT_FIELDS.get(cls)
+            if fields is None:
+                # Proxies of other types (e.g. buffers, see buffer_proxy,
+                # and arrays, see regions) have a dep, but nothing to
+                # traverse
+                if proxied is not None:
+                    if track:
+                        proxied.__dep__.depend()
+                elif not track or not tracked:
+                    pass
+                elif isinstance(current, Lazy):
+                    # A container that has not been loaded (e.g. of a
+                    # disk store): depend on it without loading it
+                    current.dep().depend()
+                elif cls in TYPE_LOOKUP:
+                    weak_dep = db.get(id(current))
+                    dep = weak_dep() if weak_dep is not None else None
+                    if dep is None:
+                        # Not every value of a proxied type is proxied
+                        # (e.g. arrays that were not made reactive)
+                        created = proxy(current)
+                        if isinstance(created, Proxy):
+                            dep = created.__dep__
+                    if dep is not None:
+                        dep.depend()
+                continue
+            val_iter = object_values(current, fields)
 
         # Check if we've seen this object before
         obj_id = id(current)
@@ -228,6 +458,110 @@ def traverse(obj: Any) -> None:
             )
 
 
+def version_signature(obj: Any) -> list[Any]:
+    """
+    Non-recursively computes a signature of the given (nested) value
+    that changes whenever the value is mutated, without comparing any
+    contents: every container that has a dep (see `traverse`) is
+    represented by its identity and its mutation version (see
+    TargetDep.version). Containers without a dep can't be mutated
+    through a proxy, so those are represented by their contents.
+    """
+    signature: list[Any] = []
+    seen_ids: set[int] = set()
+    stack: list[Any] = [obj]
+    db = proxy_db.db
+
+    while stack:
+        current = stack.pop()
+        if isinstance(current, Proxy):
+            current = current.__target__
+
+        cls = type(current)
+        fields = None
+        leaf = False
+        if cls is not dict and cls is not list and cls is not set:
+            if cls is tuple:
+                signature.append((tuple, len(current)))
+                stack.extend(current)
+                continue
+            fields = OBJECT_FIELDS.get(cls)
+            if fields is None:
+                leaf = cls in LEAF_TYPES
+                if not leaf:
+                    if isinstance(current, Lazy):
+                        # By identity: comparing would load it
+                        signature.append((Lazy, id(current)))
+                    else:
+                        signature.append(current)
+                    continue
+
+        obj_id = id(current)
+        if obj_id in seen_ids:
+            signature.append((obj_id,))
+            continue
+        seen_ids.add(obj_id)
+
+        weak_dep = db.get(obj_id)
+        dep = weak_dep() if weak_dep is not None else None
+        if dep is not None:
+            # The version covers the container's own contents, so only
+            # its nested containers need to be visited
+            signature.append((obj_id, dep.version))
+            if fields is not None:
+                values = object_values(current, fields)
+            elif cls is not set and not leaf:
+                values = current.values() if cls is dict else current
+            else:
+                continue
+            stack.extend(value for value in values if type(value) not in PLAIN_TYPES)
+        elif fields is not None:
+            # The identity and the attributes, by name
+            signature.append((cls, obj_id))
+            for name in sorted(fields):
+                value = getattr(current, name, MISSING)
+                signature.append(name)
+                stack.append(value)
+        elif cls is dict:
+            signature.append((dict, len(current)))
+            signature.extend(current)
+            stack.extend(current.values())
+        elif cls is list:
+            signature.append((list, len(current)))
+            stack.extend(current)
+        elif leaf:
+            signature.append(current[:])
+        else:
+            signature.append(frozenset(current))
+
+    return signature
+
+
+class VersionEquals:
+    """
+    Equality function for watchers (see `watch`) that considers two
+    values equal when none of the reactive containers in the new value
+    have been mutated since the previous value was evaluated (and the
+    new value is made up of the same containers). Unlike comparing
+    the contents, this does not depend on the size of the containers,
+    only on their number.
+
+    Remembers the signature of the last value that it has seen, so
+    every watcher needs an instance of its own.
+    """
+
+    __slots__ = ("signature",)
+
+    def __init__(self) -> None:
+        self.signature: list[Any] | None = None
+
+    def __call__(self, old: Any, new: Any) -> bool:
+        signature = version_signature(new)
+        equal = signature == self.signature
+        self.signature = signature
+        return equal
+
+
 # Every Watcher gets a unique ID which is used to
 # keep track of the order in which subscribers will
 # be notified
@@ -243,7 +577,53 @@ class WrongNumberOfArgumentsError(TypeError):
     pass
 
 
-class Watcher[T]:
+class AsyncRun:
+    """
+    A single evaluation of an async watched function. It stands in
+    for the watcher on the dependency stack, so that the deps of
+    evaluations that are in flight at the same time are collected
+    separately. The watcher is subscribed to every dep right away,
+    so that changes that happen during the evaluation are noticed.
+    """
+
+    __slots__ = ("deps", "watcher")
+
+    def __init__(self, watcher: Watcher[Any]) -> None:
+        self.watcher = watcher
+        self.deps: set[Dep] = set()
+
+    def add_dep(self, dep: Dep) -> None:
+        deps = self.deps
+        if dep not in deps:
+            deps.add(dep)
+            watcher = self.watcher
+            if dep not in watcher._deps:
+                dep.add_sub(watcher)
+
+
+class WatcherType(type):
+    """
+    Metaclass of Watcher that gives watchers a finalizer only while an
+    on_destroyed hook is registered: a finalizer makes the destruction
+    of every single watcher call into Python.
+    """
+
+    def __setattr__(cls, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name == "on_destroyed":
+            if value is None:
+                if "__del__" in cls.__dict__:
+                    del cls.__del__
+            else:
+                cls.__del__ = _call_on_destroyed
+
+
+def _call_on_destroyed(watcher: Watcher[Any]) -> None:
+    if Watcher.on_destroyed:
+        Watcher.on_destroyed(watcher)
+
+
+class Watcher[T](metaclass=WatcherType):
     __slots__ = (
         "__weakref__",
         "_active",
@@ -252,11 +632,14 @@ class Watcher[T]:
         "_number_of_callback_args",
         "_paused",
         "_pending_update",
+        "_run",
+        "_scope",
         "_tasks",
         "callback",
         "callback_async",
         "deep",
         "dirty",
+        "equals",
         "fn",
         "fn_async",
         "id",
@@ -276,11 +659,16 @@ class Watcher[T]:
     fn: Callable[[], Any]
     fn_async: bool
     _deps: set[Dep]
-    _new_deps: set[Dep]
-    _tasks: set[asyncio.Task[Any]]
+    _new_deps: set[Dep] | None
+    _tasks: set[asyncio.Task[Any]] | None
+    _run: AsyncRun | None
+    # The effect scope that captured the watcher, held weakly: the
+    # scope holds its watchers strongly
+    _scope: ref[EffectScope] | None
     sync: bool
     callback: Callable[..., Any] | None
     callback_async: bool
+    equals: Callable[[T | None, T], bool] | None
     no_recurse: bool
     deep: bool
     lazy: bool
@@ -298,12 +686,14 @@ class Watcher[T]:
         lazy: bool = True,
         deep: bool | None = None,
         callback: WatchCallback[T] | None = None,
+        equals: Equals[T] | None = None,
     ) -> None:
         """
         sync: Ignore the scheduler
         lazy: Only reevaluate when value is requested
         deep: Deep watch the watched value
         callback: Method to call when value has changed
+        equals: Decides whether a new value equals the previous one
         """
         self.id = next(_ids)
         self._active = True
@@ -327,14 +717,20 @@ class Watcher[T]:
                 deep = True
         # Plain sets: WeakSet operations are implemented in Python and
         # dominate the cost of re-collecting deps on every evaluation.
-        # Strong references are safe here: deps don't reference watchers
-        # strongly (Dep._subs is a WeakSet). The strong reference is also
+        # Strong references are safe here: deps only reference their
+        # watchers weakly (see Dep._subs). The strong reference is also
         # what keeps the registry entry of a dep's container (and with
         # it, the identity of its deps) alive for exactly as long as
         # this watcher depends on it; deps are released on the next
         # cleanup_deps() or when the watcher is deactivated or collected.
-        self._deps, self._new_deps = set(), set()
-        self._tasks = set()
+        self._deps = set()
+        # Only allocated while the watcher evaluates
+        self._new_deps = None
+        # Only allocated once the watcher starts an asyncio task
+        self._tasks = None
+        self._run = None
+        # Set by the scope that adds the watcher
+        self._scope = None
 
         self.sync = sync
         if callable(callback):
@@ -350,9 +746,20 @@ class Watcher[T]:
         self.deep = bool(deep)
         self.lazy = lazy
         self.dirty = self.lazy
-        self.value = None if self.lazy else self.get()
+        if equals == "version":
+            # Stateful, so every watcher needs one of its own
+            self.equals = VersionEquals()
+        else:
+            self.equals = equals
+        self.value = None
+        if not self.lazy:
+            self.evaluate()
         self._number_of_callback_args = None
 
+        scope = active_scope.get()
+        if scope is not None:
+            scope.add(self)
+
         if Watcher.on_created:
             Watcher.on_created(self)
 
@@ -380,7 +787,14 @@ class Watcher[T]:
         self.callback_async = False
         self.value = None
         self._deps.clear()
-        self._new_deps.clear()
+        self._new_deps = None
+
+        scope_ref = self._scope
+        if scope_ref is not None:
+            self._scope = None
+            scope = scope_ref()
+            if scope is not None:
+                scope.remove(self)
 
     def pause(self) -> None:
         """
@@ -403,10 +817,6 @@ class Watcher[T]:
             self._pending_update = False
             self.update()
 
-    def __del__(self) -> None:
-        if Watcher.on_destroyed:
-            Watcher.on_destroyed(self)
-
     @property
     def active(self) -> bool:
         """
@@ -432,15 +842,20 @@ class Watcher[T]:
             self.dirty = True
             return
 
-        if Dep.stack and Dep.stack[-1] is self and self.no_recurse:
-            return
+        if self.no_recurse:
+            stack = get_dep_stack()
+            if stack and (stack[-1] is self or stack[-1] is self._run):
+                return
         if self.sync:
             self.run()
         else:
             scheduler.queue(self)
 
     def evaluate(self) -> None:
-        self.value = self.get()
+        value: Any = self.get()
+        equals = self.equals
+        if equals is None or not equals(self.value, value):
+            self.value = value
         self.dirty = False
 
     def run(self) -> None:
@@ -453,8 +868,23 @@ class Watcher[T]:
         if self._paused:
             self._pending_update = True
             return
-        value = self.get()
-        if self.deep or isinstance(value, Container) or value != self.value:
+        if self.fn_async:
+            # The evaluation publishes its value when it completes
+            self.get_async(publish=True)
+            return
+        self.publish(self.get())
+
+    def publish(self, value: T | None) -> None:
+        """
+        Stores the given newly evaluated value, and runs the callback
+        if the value has changed.
+        """
+        equals: Any = self.equals
+        if equals is not None:
+            changed = not equals(self.value, value)
+        else:
+            changed = self.deep or isinstance(value, Container) or value != self.value
+        if changed:
             old_value = self.value
             self.value = value
             if self.callback:
@@ -503,9 +933,7 @@ class Watcher[T]:
             if not loop.is_running():
                 loop.run_until_complete(maybe_coro)
             else:
-                task = loop.create_task(maybe_coro)
-                self._tasks.add(task)
-                task.add_done_callback(self._tasks.discard)
+                self.keep_task(loop.create_task(maybe_coro))
 
     def _run_callback(self, *args: Any) -> Any:
         """
@@ -552,44 +980,145 @@ class Watcher[T]:
                 raise
 
     def get(self) -> T | None:
-        Dep.stack.append(self)
+        if self.fn_async:
+            return self.get_async(publish=False)
+        # Evaluations can be nested (e.g. when the watched function
+        # writes to a dep of its own sync watcher): the inner one
+        # cleans up its own set of new deps, after which the outer one
+        # continues with its set
+        outer_deps = self._new_deps
+        self._new_deps = set()
+        stack = push_watcher(self)
         try:
-            value_or_coro = self.fn()
-            if self.fn_async and value_or_coro:
-                loop = asyncio.get_event_loop()
-                if not loop.is_running():
-                    value_or_coro = loop.run_until_complete(value_or_coro)
-                else:
-                    task = loop.create_task(value_or_coro)
-                    self._tasks.add(task)
-                    task.add_done_callback(self._tasks.discard)
-                    return None
+            value = self.fn()
             if self.deep:
-                traverse(value_or_coro)
+                traverse(value)
         finally:
-            Dep.stack.pop()
+            stack.pop()
             self.cleanup_deps()
-        return value_or_coro
+            if self._active:
+                self._new_deps = outer_deps
+        return value
+
+    def get_async(self, publish: bool) -> T | None:
+        """
+        Starts an evaluation of the async watched function. When the
+        event loop is running, the evaluation runs in a task and the
+        current value is returned; otherwise the evaluation runs to
+        completion. The value of the evaluation is stored when it
+        completes, and when publish is True, the callback is run if
+        the value has changed.
+        """
+        run = AsyncRun(self)
+        self._run = run
+        coro = self.track_async(run, self.fn(), publish)
+        loop = asyncio.get_event_loop()
+        if not loop.is_running():
+            return loop.run_until_complete(coro)
+        self.keep_task(loop.create_task(coro))
+        return self.value
+
+    def keep_task(self, task: asyncio.Task[Any]) -> None:
+        """
+        References the given task (and thereby keeps it alive) until
+        it is done.
+        """
+        tasks = self._tasks
+        if tasks is None:
+            tasks = self._tasks = set()
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    async def track_async(
+        self, run: AsyncRun, coro: Awaitable[T], publish: bool
+    ) -> T | None:
+        # Every task runs in a context of its own, so reads are
+        # attributed to this evaluation across all suspension points,
+        # also when other evaluations run in between. Set a new stack
+        # instead of pushing onto the current one, which the task's
+        # context shares with the context that created the task
+        dep_stack.set([run])
+        try:
+            value = await coro
+            if self.deep:
+                traverse(value)
+        finally:
+            dep_stack.set(())
+            latest = self.finish_async(run)
+        if latest:
+            if publish:
+                self.publish(value)
+            else:
+                equals = self.equals
+                if equals is None or not equals(self.value, value):
+                    self.value = value
+        return value
+
+    def finish_async(self, run: AsyncRun) -> bool:
+        """
+        Replaces the deps of this watcher with the deps that the given
+        evaluation collected, unless a newer evaluation has started in
+        the meantime: then only the subscriptions that no other
+        evaluation needs are dropped. Returns whether the evaluation
+        is the latest one.
+        """
+        if run is self._run and self._active:
+            self._run = None
+            deps = run.deps
+            for dep in self._deps - deps:
+                dep.remove_sub(self)
+            self._deps = deps
+            return True
+        current = self._run
+        for dep in run.deps:
+            if dep not in self._deps and (current is None or dep not in current.deps):
+                dep.remove_sub(self)
+        return False
 
     def add_dep(self, dep: Dep) -> None:
-        if dep not in self._new_deps:
-            self._new_deps.add(dep)
+        # Only called while evaluating, so the set of new deps exists,
+        # unless the watcher was stopped during the evaluation
+        new_deps: Any = self._new_deps
+        if new_deps is None:
+            return
+        if dep not in new_deps:
+            new_deps.add(dep)
             if dep not in self._deps:
                 dep.add_sub(self)
 
+    def add_deps(self, deps: Iterable[Dep]) -> None:
+        """
+        Subscribes to the given deps as if the (last) evaluation had
+        depended on them, e.g. for containers that are loaded after it
+        (see disk). The next evaluation drops them if it doesn't.
+        """
+        new_deps = self._new_deps
+        current = self._deps if new_deps is None else new_deps
+        for dep in deps:
+            if dep not in current:
+                current.add(dep)
+                dep.add_sub(self)
+
     def cleanup_deps(self) -> None:
+        new_deps = self._new_deps
+        if new_deps is None:
+            # Already cleaned up by a nested evaluation (or stopped)
+            return
         # A C-level set difference beats a Python-level loop with a
         # containment check per dep, and this runs after every watcher
         # evaluation (where the difference is typically empty)
-        for dep in self._deps - self._new_deps:
+        for dep in self._deps - new_deps:
             dep.remove_sub(self)
-        self._deps, self._new_deps = self._new_deps, self._deps
-        self._new_deps.clear()
+        # The set of new deps is not kept around in between
+        # evaluations: an empty set costs as much memory as the
+        # watcher itself
+        self._deps = new_deps
+        self._new_deps = None
 
     def depend(self) -> None:
         """This function is used by other watchers to depend on everything
         this watcher depends on."""
-        if Dep.stack:
+        if get_dep_stack():
             for dep in self._deps:
                 dep.depend()
 
@@ -599,6 +1128,127 @@ class Watcher[T]:
         return f"{getattr(fn, '__module__', None)}.{getattr(fn, '__qualname__', None)}"
 
 
+class ExecutorWatcher[T](Watcher[T]):
+    """
+    Watcher that evaluates its (inputs) function with dependency
+    tracking, and runs its work function in an executor on a raw copy
+    of the result. The result of the latest submission is published
+    in state["value"], which is notified when it changes. When the
+    work raises, the exception is published in state["error"] instead,
+    and raised by the getter of the computed.
+    """
+
+    __slots__ = ("executor", "future", "generation", "state", "work")
+
+    def __init__(
+        self,
+        inputs: Callable[[], Any],
+        work: Callable[[Any], T],
+        executor: Executor,
+        deep: bool,
+        equals: Equals[T] | None = None,
+    ) -> None:
+        self.work = work
+        self.executor = executor
+        self.future: Future[T] | None = None
+        # Increased with every submission, so that stale results
+        # can be recognized
+        self.generation = 0
+        # Raw state: dependents read it through a readonly proxy
+        self.state: dict[str, Any] = {"value": None, "error": None}
+        super().__init__(inputs, lazy=True, deep=deep, equals=equals)
+        self.dirty = False
+        self.run()
+
+    def update(self) -> None:
+        if self._paused:
+            self._pending_update = True
+            return
+        # Dirty means that a submission is already planned
+        if self.dirty:
+            return
+        self.dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.run()
+        else:
+            # Submit on the next iteration of the loop, so that a
+            # burst of changes results in a single submission
+            loop.call_soon(self.run)
+
+    def run(self) -> None:
+        if not self._active:
+            return
+        if self._paused:
+            self._pending_update = True
+            return
+        self.dirty = False
+        inputs = to_raw(self.get())
+
+        if self.future is not None:
+            # Only succeeds when the work hasn't started yet
+            self.future.cancel()
+        self.generation += 1
+        generation = self.generation
+        future = self.executor.submit(self.work, inputs)
+        self.future = future
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.finish(generation, future)
+            return
+
+        # The future is referenced by this watcher, so refer back
+        # weakly to prevent a reference cycle
+        weak_self = ref(self)
+
+        def done(future: Future[T]) -> None:
+            if (this := weak_self()) is not None:
+                try:
+                    loop.call_soon_threadsafe(this.finish, generation, future)
+                except RuntimeError:
+                    # The loop has been closed in the meantime
+                    pass
+
+        future.add_done_callback(done)
+
+    def finish(self, generation: int, future: Future[T]) -> None:
+        """
+        Publishes the result of the given future, unless it's stale.
+        Waits for the future when it is not done yet.
+        """
+        if generation != self.generation or not self._active or future.cancelled():
+            return
+        self.future = None
+        state = self.state
+        # Not raised here: this might run in a callback of the loop,
+        # away from the code that reads the computed
+        error = future.exception()
+        if error is not None:
+            state["error"] = error
+        else:
+            value = future.result()
+            equals = self.equals
+            if (
+                state["error"] is None
+                and equals is not None
+                and equals(self.value, value)
+            ):
+                return
+            self.value = value
+            state["value"] = value
+            state["error"] = None
+        trigger_ref(proxy(state, True, True))
+
+    def stop(self) -> None:
+        if self.future is not None:
+            self.future.cancel()
+            self.future = None
+        super().stop()
+
+
 # Code flags that mark parameters the plain co_argcount doesn't count
 _CO_VAR_FLAGS = inspect.CO_VARARGS | inspect.CO_VARKEYWORDS
 
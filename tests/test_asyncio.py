@@ -111,15 +111,14 @@ def test_asyncio_watch_effect_plain_loop(plain_loop):
         a.append(3)
 
     plain_loop.run_until_complete(_coroutine())
-    # nothing happens because the coroutine did not run eagerly
-    # (synchronously until its first await statement) which
-    # means that the reactive datastructures were not accessed
-    # while the Dep tracking mechanism was active
-    assert called == 1
+    # the coroutine did not run eagerly (synchronously until its
+    # first await statement), but the evaluation tracks its own
+    # dependencies once it runs
+    assert called == 2
     assert completed == 1
     flush(plain_loop)
-    assert called == 1
-    assert completed == 1
+    assert called == 2
+    assert completed == 2
 
 
 def test_asyncio_watch_effect_method(eager_loop):
@@ -299,56 +298,24 @@ def test_asyncio_watcher_multi(
         a.append(3)
 
     # ASSERTS pt II
-    if not expr_async and callback_async and write_async:
-        # dependency tracking works because expr_async,
-        # and the callback only executed partially since the loop
-        # was running when it was triggered. that makes sense.
-        assert (called, completed) == (1, 0)
-    elif expr_async and callback_async and not create_async and write_async:
-        # when the loop is running, and our expression is async, the watcher cannot
-        # access the return value, since the expression is not executed until completion
-        # HOWEVER, in this specific scenario, we were able to get it during creation
-        # since the loop wasn't running then. so the value goes from 2 to None
-        # and the callback is triggered
-        assert (called, completed) == (1, 0)
-    elif create_loop is create_plain_loop and expr_async and create_async:
-        # in this case, dependency tracking did not work, and it makes
-        # sense; the async expression did not start execution
-        # until after Watcher.get(), so no dependencies were recorded
-        # this is the unsupported scenario that will never work
-        # use py>=3.12 and asyncio.eager_task_factory
-        assert (called, completed) == (0, 0)
-    elif (
-        create_loop is create_eager_loop and expr_async and create_async and write_async
-    ):
-        # when the loop is running, and our expression is async, the watcher cannot
-        # access the return value, since the expression is not executed until completion
-        # so it cannot check if the value changed (it was None, and it will always
-        # be None), so the callback does not trigger
+    if expr_async and write_async:
+        # when the loop is running, the async expression is evaluated
+        # in a task, and the callback is triggered once the evaluation
+        # completes (and its value has changed), which takes more
+        # than a single iteration of the loop
         assert (called, completed) == (0, 0)
+    elif callback_async and (write_async or expr_async):
+        # the callback is triggered while the loop is running, so it
+        # only executed partially. that makes sense.
+        assert (called, completed) == (1, 0)
     else:
         # in all other cases the callback runs to completion
         assert (called, completed) == (1, 1)
     flush(loop)
-    if expr_async and create_async and write_async:
-        # when the loop is running, and our expression is async, the watcher cannot
-        # access the return value, since the expression is not executed until completion
-        # so it cannot check if the value changed (it was None, and it will always
-        # be None), so the callback does not trigger
-        assert (called, completed) == (0, 0)
-    elif (
-        create_loop is create_plain_loop
-        and expr_async
-        and create_async
-        and not write_async
-    ):
-        # we don't expect this to work because dependency tracking
-        # didn't work
-        # use py>=3.12 and asyncio.eager_task_factory
-        assert (called, completed) == (0, 0)
-    else:
-        # in all other cases the callback runs to completion
-        assert (called, completed) == (1, 1)
+    # the dependencies of the async expression are tracked across
+    # its await statements, no matter how it was started, so the
+    # callback always runs to completion
+    assert (called, completed) == (1, 1)
 
 
 we_testcases = []
@@ -454,14 +421,7 @@ def test_asyncio_watcheffect_multi(create_loop, expr_async, create_async, write_
         a.append(3)
 
     # ASSERTS pt II
-    if create_loop is create_plain_loop and expr_async and create_async:
-        # in this case, dependency tracking did not work, and it makes
-        # sense; the async expression did not start execution
-        # until after Watcher.get(), so no dependencies were recorded
-        # this is the unsupported scenario that will never work
-        # use py>=3.12 and asyncio.eager_task_factory
-        assert (called, completed) == (1, 1)
-    elif expr_async and write_async:
+    if expr_async and write_async:
         # when the state is modified while the loop is running,
         # (the common case!)
         # we expect the expression to have retriggered
@@ -473,12 +433,77 @@ def test_asyncio_watcheffect_multi(create_loop, expr_async, create_async, write_
         # run completely
         assert (called, completed) == (2, 2)
     flush(loop)
-    if create_loop is create_plain_loop and expr_async and create_async:
-        # as explained before,
-        # this is the unsupported scenario that will never work
-        # use py>=3.12 and asyncio.eager_task_factory
-        assert (called, completed) == (1, 1)
-    else:
-        # in all other cases, we expected the expression to
-        # run completely
-        assert (called, completed) == (2, 2)
+    # the dependencies of the async expression are tracked across
+    # its await statements, no matter how it was started
+    assert (called, completed) == (2, 2)
+
+
+def test_asyncio_concurrent_evaluations_track_own_deps(plain_loop):
+    state = reactive({"a": 1, "b": 2, "ready": 0})
+    runs = []
+
+    def make_effect(key):
+        async def _expr():
+            _ = state["ready"]
+            await asyncio.sleep(0)
+            # The other effect is in flight as well at this point
+            runs.append((key, state[key]))
+            await asyncio.sleep(0)
+
+        return _expr
+
+    async def _create():
+        return [watch_effect(make_effect(key), sync=True) for key in "ab"]
+
+    watchers = plain_loop.run_until_complete(_create())  # noqa: F841
+    flush(plain_loop)
+    assert sorted(runs) == [("a", 1), ("b", 2)]
+
+    runs.clear()
+    state["a"] = 10
+    flush(plain_loop)
+    assert runs == [("a", 10)]
+
+    runs.clear()
+    state["b"] = 20
+    flush(plain_loop)
+    assert runs == [("b", 20)]
+
+    runs.clear()
+    state["ready"] = 1
+    flush(plain_loop)
+    assert sorted(runs) == [("a", 10), ("b", 20)]
+
+
+def test_asyncio_stale_evaluation(plain_loop):
+    state = reactive({"key": "first", "first": 1, "second": 2})
+    values = []
+
+    async def _expr():
+        key = state["key"]
+        await asyncio.sleep(0)
+        return state[key]
+
+    async def _create():
+        return watch(_expr, values.append, sync=True)
+
+    watcher = plain_loop.run_until_complete(_create())
+    flush(plain_loop)
+    assert watcher.value == 1
+
+    async def _write():
+        # Start two evaluations: only the last one counts
+        state["first"] = 10
+        # Let the first evaluation read the key before changing it
+        await asyncio.sleep(0)
+        state["key"] = "second"
+
+    plain_loop.run_until_complete(_write())
+    flush(plain_loop)
+    assert watcher.value == 2
+    assert values == [2]
+
+    # The dep on 'first' was only collected by the stale evaluation
+    state["first"] = 100
+    flush(plain_loop)
+    assert values == [2]
@@ -0,0 +1,194 @@
+from array import array
+
+import pytest
+
+from observ import (
+    Journal,
+    computed,
+    listen,
+    load_journal,
+    reactive,
+    readonly,
+    snapshot,
+    to_raw,
+    version,
+    watch,
+)
+from observ.buffer_proxy import (
+    ArrayBufferProxy,
+    BytearrayProxy,
+    array_traps,
+    bytearray_traps,
+)
+from observ.proxy import Proxy
+from observ.traps import ReadonlyError
+
+# Not wrapped: the attributes of the proxy itself, class methods and
+# buffer protocol methods (see BufferProxyBase.__buffer__)
+EXCLUDED = {
+    "__buffer__",
+    "__release_buffer__",
+    "__copy__",
+    "__deepcopy__",
+    "__class_getitem__",
+    "__module__",
+    "fromhex",
+    "maketrans",
+    "itemsize",
+    "typecode",
+}
+
+
+@pytest.mark.parametrize(
+    "cls, traps", [(array, array_traps), (bytearray, bytearray_traps)]
+)
+def test_wrapping_complete(cls, traps):
+    wrapped = [method for methods in traps.values() for method in methods]
+    assert len(wrapped) == len(set(wrapped))
+    assert set(dir(cls)) - set(dir(object)) - EXCLUDED == set(wrapped) - set(
+        dir(object)
+    )
+
+
+def test_buffer_proxies():
+    state = reactive({"samples": array("d", [1, 2, 3]), "raw": bytearray(b"abc")})
+    assert isinstance(state["samples"], ArrayBufferProxy)
+    assert isinstance(state["raw"], BytearrayProxy)
+    assert isinstance(readonly(state)["samples"], Proxy)
+
+    samples = state["samples"]
+    assert samples.typecode == "d"
+    assert samples[1:] == array("d", [2, 3])
+    assert samples == array("d", [1, 2, 3])
+    assert samples.tolist() == [1, 2, 3]
+    assert list(samples) == [1, 2, 3]
+    assert 3 in samples
+    assert state["raw"].upper() == b"ABC"
+
+
+def test_buffer_writes_notify():
+    samples = reactive(array("i", [1, 2, 3]))
+    total = computed(lambda: sum(samples))
+    called = []
+    watcher = watch(  # noqa: F841
+        lambda: samples, lambda: called.append(1), sync=True, deep=True
+    )
+    assert total() == 6
+
+    samples.append(4)
+    samples.extend([5, 6])
+    samples.frombytes(array("i", [7]).tobytes())
+    samples[0] = 0
+    del samples[-1]
+    samples.reverse()
+    assert called == [1] * 6
+    assert total() == 20
+
+    # Writes that don't change anything don't notify
+    samples[0] = samples[0]
+    samples[1:3] = samples[1:3]
+    samples.extend([])
+    samples *= 1
+    assert called == [1] * 6
+
+    # In-place operators keep the proxy
+    samples += array("i", [7])
+    assert isinstance(samples, ArrayBufferProxy)
+    samples *= 2
+    assert isinstance(samples, ArrayBufferProxy)
+    assert called == [1] * 8
+    assert total() == 54
+
+
+def test_buffer_deep_watch_single_dep():
+    state = reactive({"series": [array("d", range(1_000)), bytearray(10)]})
+    called = []
+    watcher = watch(lambda: state, lambda: called.append(1), sync=True, deep=True)
+    # The buffers are leaves: a single dep each, no matter their size
+    assert len(watcher._deps) == 4
+
+    state["series"][0][500] = -1
+    assert called == [1]
+    state["series"][1].append(1)
+    assert called == [1, 1]
+
+
+def test_buffer_change_records():
+    raw = reactive(bytearray(b"hello"))
+    changes = []
+    stop = listen(raw, changes.append)
+    raw[0] = ord("j")
+    raw[1:3] = b"EE"
+    raw.append(ord("!"))
+    raw.remove(ord("l"))
+    raw.insert(0, ord(">"))
+    stop()
+    assert changes == [
+        ("splice", 0, bytearray(b"h"), bytearray(b"j")),
+        ("splice", 1, bytearray(b"el"), bytearray(b"EE")),
+        ("splice", 5, bytearray(), bytearray(b"!")),
+        ("splice", 3, bytearray(b"l"), bytearray()),
+        ("splice", 0, bytearray(), bytearray(b">")),
+    ]
+    assert raw == bytearray(b">jEEo!")
+
+
+def test_buffer_memoryview():
+    samples = reactive(array("h", [1, 2, 3]))
+    first = computed(lambda: memoryview(samples)[0])
+    assert first() == 1
+
+    view = memoryview(samples)
+    assert view.readonly
+    assert view.tolist() == [1, 2, 3]
+    with pytest.raises(TypeError):
+        view[0] = 2
+    view.release()
+
+    samples[0] = 5
+    assert first() == 5
+
+
+def test_buffer_readonly():
+    samples = readonly(array("d", [1, 2]))
+    assert samples[0] == 1
+    with pytest.raises(ReadonlyError):
+        samples[0] = 2
+    with pytest.raises(ReadonlyError):
+        samples.append(3)
+    with pytest.raises(ReadonlyError):
+        readonly(bytearray(b"abc")).clear()
+
+
+def test_buffer_snapshot_and_to_raw():
+    state = reactive({"samples": array("d", [1, 2, 3]), "raw": bytearray(b"abc")})
+    before = version(state, deep=True)
+    snap = snapshot(state)
+    state["samples"].pop(0)
+    state["samples"].byteswap()
+    state["raw"][:] = b"xyz"
+    assert version(state, deep=True) > before
+    assert snap.to_raw() == {"samples": array("d", [1, 2, 3]), "raw": b"abc"}
+
+    snap.restore()
+    raw = to_raw(state)
+    assert raw == {"samples": array("d", [1, 2, 3]), "raw": b"abc"}
+    # Buffers are copied
+    raw["samples"].append(4)
+    assert len(state["samples"]) == 3
+
+
+def test_buffer_journal(tmp_path):
+    path = tmp_path / "state.journal"
+    state = reactive({"samples": array("d", [1, 2]), "raw": bytearray(b"ab")})
+    with Journal(state, path) as journal:
+        state["samples"].append(3)
+        state["samples"][0] = 0
+        state["raw"].extend(b"cd")
+        state["copy"] = state["samples"]
+        state["copy"].reverse()
+        journal.flush()
+        loaded = load_journal(path)
+
+    assert to_raw(loaded) == to_raw(state)
+    assert loaded["copy"] is loaded["samples"]
@@ -1,6 +1,6 @@
 from unittest.mock import Mock
 
-from observ.dep import Dep
+from observ.dep import push_watcher
 from observ.dict_proxy import DictProxy, dict_traps
 from observ.list_proxy import ListProxy, list_traps
 from observ.set_proxy import SetProxy, set_traps
@@ -134,13 +134,13 @@ def test_list_depend():
     }
     for name in COLLECTIONS[ListProxy]["READERS"]:
         m = Mock()
-        Dep.stack.append(m)
+        stack = push_watcher(m)
         try:
             coll = ListProxy([2])
             getattr(coll, name)(*args[name])
             m.add_dep.assert_called_once_with(coll.__dep__)
         finally:
-            Dep.stack.pop()
+            stack.pop()
 
 
 def test_set_notify():
@@ -201,13 +201,13 @@ def test_set_depend():
     }
     for name in COLLECTIONS[SetProxy]["READERS"]:
         m = Mock()
-        Dep.stack.append(m)
+        stack = push_watcher(m)
         try:
             coll = SetProxy({2})
             getattr(coll, name)(*args[name])
             m.add_dep.assert_called_once_with(coll.__dep__)
         finally:
-            Dep.stack.pop()
+            stack.pop()
 
 
 def test_dict_notify():
@@ -298,13 +298,13 @@ def test_dict_depend():
 
     for name in COLLECTIONS[DictProxy]["READERS"]:
         m = Mock()
-        Dep.stack.append(m)
+        stack = push_watcher(m)
         try:
             coll = DictProxy({2: 3})
             getattr(coll, name)(*args[name])
             m.add_dep.assert_called_once_with(coll.__dep__)
         finally:
-            Dep.stack.pop()
+            stack.pop()
 
 
 def test_dict_keydepend():
@@ -315,13 +315,13 @@ def test_dict_keydepend():
     }
     for name in COLLECTIONS[DictProxy]["KEYREADERS"]:
         m = Mock()
-        Dep.stack.append(m)
+        stack = push_watcher(m)
         try:
             coll = DictProxy({2: 3})
             getattr(coll, name)(*args[name])
             m.add_dep.assert_called_once_with(coll.__dep__.keydeps[args[name][0]])
         finally:
-            Dep.stack.pop()
+            stack.pop()
 
 
 def test_dict_delete_notify():
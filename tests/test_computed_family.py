@@ -0,0 +1,88 @@
+from observ import EffectScope, computed_family, reactive, watch
+
+
+def test_computed_family():
+    rows = reactive([{"value": i} for i in range(10)])
+    calls = []
+
+    def doubled(index, factor=2):
+        calls.append(index)
+        return rows[index]["value"] * factor
+
+    family = computed_family(doubled)
+    assert family(1) == 2
+    assert family(1) == 2
+    assert family(2, 3) == 6
+    assert calls == [1, 2]
+    assert len(family) == 2
+    assert (1,) in family
+
+    # Every computed tracks its own deps
+    rows[1]["value"] = 10
+    assert family(2, 3) == 6
+    assert calls == [1, 2]
+    assert family(1) == 20
+    assert calls == [1, 2, 1]
+
+
+def test_computed_family_lru():
+    state = reactive({i: i for i in range(10)})
+    family = computed_family(lambda key: state[key], maxsize=2)
+
+    assert family(1) == 1
+    assert family(2) == 2
+    # Use 1, so that 2 is the least recently used
+    assert family(1) == 1
+    watcher_2 = family.computeds[(2,)].__watcher__
+    assert family(3) == 3
+    assert list(family.computeds) == [(1,), (3,)]
+    assert not watcher_2.active
+
+    family.evict(1)
+    assert list(family.computeds) == [(3,)]
+    family.clear()
+    assert len(family) == 0
+
+
+def test_computed_family_dependents():
+    state = reactive({"a": 1, "b": 2})
+    family = computed_family(lambda key: state[key], maxsize=1)
+    called = []
+    watcher = watch(lambda: family("a") + family("b"), called.append, sync=True)
+    assert watcher.value == 3
+
+    # Entries have been evicted, but the dependent still tracks
+    # the underlying state
+    state["a"] = 10
+    assert called == [12]
+
+
+def test_computed_family_not_captured_by_scope():
+    state = reactive({"a": 1})
+    family = computed_family(lambda key: state[key])
+    scope = EffectScope()
+    with scope:
+        assert family("a") == 1
+    scope.stop()
+    state["a"] = 2
+    assert family("a") == 2
+
+
+def test_computed_family_recursive():
+    state = reactive({"offset": 0})
+
+    def fib(n):
+        if n < 2:
+            return n + state["offset"]
+        return family(n - 1) + family(n - 2)
+
+    family = computed_family(fib, maxsize=2)
+    assert family(6) == 8
+    # Only the computeds that were evaluating exceeded maxsize
+    assert family(-1) == -1
+    assert len(family) == 2
+    for watcher in (getter.__watcher__ for getter in family.computeds.values()):
+        assert watcher.active
+
+    state["offset"] = 1
+    assert family(6) == 21
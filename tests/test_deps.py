@@ -1,6 +1,8 @@
 from unittest.mock import Mock
+from weakref import WeakSet, ref
 
 from observ import computed, reactive, watch
+from observ.dep import Dep
 
 
 def test_deps_copy():
@@ -84,3 +86,39 @@ def test_deps_released_on_deactivation():
     watcher()
 
     assert len(watcher._deps) == 0
+
+
+def test_dep_subscriber_storage():
+    dep = Dep()
+    first = Mock(id=1)
+    second = Mock(id=2)
+
+    # A single subscriber is stored inline
+    dep.add_sub(first)
+    dep.add_sub(first)
+    assert type(dep._subs) is ref
+    dep.notify()
+    first.update.assert_called_once()
+
+    # A second subscriber upgrades the storage
+    dep.add_sub(second)
+    assert type(dep._subs) is WeakSet
+    dep.notify()
+    assert first.update.call_count == 2
+    second.update.assert_called_once()
+
+    dep.remove_sub(first)
+    dep.remove_sub(second)
+    dep.notify()
+    assert first.update.call_count == 2
+
+    # A dead single subscriber is replaced, and never notified
+    other = Dep()
+    other.add_sub(Mock(id=3))
+    other.notify()
+    other.add_sub(first)
+    assert other._subs() is first
+    other.remove_sub(second)
+    assert other._subs() is first
+    other.remove_sub(first)
+    assert other._subs is None
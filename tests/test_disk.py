@@ -0,0 +1,241 @@
+import json
+
+import pytest
+
+from observ import DiskStore, dumps_json, reactive, to_raw, watch
+from observ.disk import Stub
+
+
+def mutate(state):
+    state["a"].append(4)
+    state["a"].insert(0, {"nested": [1]})
+    state["a"][0]["nested"].append(2)
+    del state["a"][1]
+    state["b"]["c"] = {"d": {1, 2}}
+    state["b"]["c"]["d"].add(3)
+    state["b"]["c"]["d"].discard(1)
+    state.update({"e": (1, [2]), "f": None})
+    state["e"][1].append(3)
+    state.pop("f")
+    state["b"]["g"] = state["a"][0]
+    state["b"]["g"]["nested"].append(3)
+
+
+def test_disk_store(tmp_path):
+    path = tmp_path / "state.db"
+    state = reactive({"a": [1, 2, 3], "b": {"x": 1, "y": 2}})
+    with DiskStore(path, {"a": [1, 2, 3], "b": {"x": 1, "y": 2}}) as store:
+        mutate(store.state)
+        mutate(state)
+        assert to_raw(store.state) == to_raw(state)
+
+    with DiskStore(path) as store:
+        assert store.to_raw() == to_raw(state)
+        # Shared containers stay shared
+        assert store.state["b"]["g"] is store.state["a"][0]
+        assert store.to_raw() == to_raw(state)
+
+
+def test_disk_store_lazy(tmp_path):
+    path = tmp_path / "state.db"
+    DiskStore(path, {"a": {"b": {"c": [1, 2]}}, "d": [{"e": 1}]}).close()
+
+    store = DiskStore(path)
+    assert len(store) == 1
+    assert type(store.root["a"]) is Stub
+
+    c = store.state["a"]["b"]["c"]
+    assert c == [1, 2]
+    assert len(store) == 4
+    assert type(store.root["a"]) is dict
+    assert type(store.root["d"]) is Stub
+
+    # Nothing references "a" anymore, except for the proxy of "c"
+    del c
+    assert store.evict() == 3
+    assert len(store) == 1
+    assert type(store.root["a"]) is Stub
+    assert store.state["a"]["b"]["c"] == [1, 2]
+    store.close()
+
+
+def test_disk_store_evicts_unreferenced(tmp_path):
+    path = tmp_path / "state.db"
+    initial = {str(i): {"value": i} for i in range(100)}
+    store = DiskStore(path, initial, max_resident=10)
+
+    kept = store.state["0"]
+    for i in range(100):
+        assert store.state[str(i)]["value"] == i
+        assert len(store) <= 11
+    # Referenced containers are not evicted
+    assert kept["value"] == 0
+    assert store.state["0"] is kept
+
+    kept["value"] = "kept"
+    for i in range(1, 100):
+        store.state[str(i)]["value"] = -i
+    store.close()
+
+    expected = {str(i): {"value": -i} for i in range(100)}
+    expected["0"]["value"] = "kept"
+    assert DiskStore(path).to_raw() == expected
+
+
+def test_disk_store_eviction_hysteresis(tmp_path, monkeypatch):
+    initial = {str(i): {"value": i} for i in range(100)}
+    store = DiskStore(tmp_path / "state.db", initial, max_resident=8)
+    evictions = []
+    evict = DiskStore.evict
+
+    def counting_evict(self, keep=0):
+        evictions.append(len(self))
+        return evict(self, keep)
+
+    monkeypatch.setattr(DiskStore, "evict", counting_evict)
+
+    # Referenced containers can't be evicted: loading evicts again
+    # once another quarter of max_resident has been loaded
+    kept = [store.state[str(i)] for i in range(40)]
+    assert len(store) == 41
+    assert evictions == list(range(8, 41, 2))
+
+    del kept
+    for i in range(40, 100):
+        assert store.state[str(i)]["value"] == i
+    # Evicts down to three quarters of max_resident
+    assert len(store) <= 8
+
+
+def test_disk_store_watchers(tmp_path):
+    store = DiskStore(tmp_path / "state.db", {"a": {"b": 1}, "c": [1]})
+    state = store.state
+    called = []
+
+    watcher = watch(
+        lambda: state["a"]["b"], lambda new, old: called.append(new), sync=True
+    )
+    # The watcher keeps its deps (and thereby the containers) loaded
+    assert store.evict() == 0
+    state["a"]["b"] = 2
+    assert called == [2]
+
+    deep = watch(state, lambda: called.append("deep"), sync=True, deep=True)
+    state["c"].append(2)
+    assert called == [2, "deep"]
+
+    del watcher, deep
+    store.close()
+
+
+def test_disk_store_sync(tmp_path):
+    path = tmp_path / "state.db"
+    store = DiskStore(path, [{"a": 1}], sync=True)
+    store.state[0]["a"] = 2
+    store.state.append((3, [4]))
+    store.state[1][1].append(5)
+
+    # Written right away, so a second store sees the mutations
+    other = DiskStore(path)
+    assert other.to_raw() == [{"a": 2}, (3, [4, 5])]
+    other.close()
+    store.close()
+
+
+def test_disk_store_removed(tmp_path):
+    store = DiskStore(tmp_path / "state.db", {"a": {"b": {}}, "c": []})
+    state = store.state
+    assert state["a"]["b"] == {}
+    c = state["c"]
+    # Move the (raw) container: a proxy in the tree would keep it loaded
+    c.append(store.root["a"]["b"])
+    del state["a"]["b"]
+    store.evict()
+    assert type(store.root["c"][0]) is Stub
+    assert c[0] == {}
+    assert store.to_raw() == {"a": {}, "c": [{}]}
+    store.close()
+
+
+def test_disk_store_closed(tmp_path):
+    store = DiskStore(tmp_path / "state.db", {"a": {}})
+    root = store.root
+    del store
+    with pytest.raises(RuntimeError):
+        reactive(root)["a"]
+
+
+def test_disk_store_loads_stubs(tmp_path):
+    initial = {"a": {"b": [1, {"c": 2}]}, "d": {"e": (1, [2])}}
+    DiskStore(tmp_path / "state.db", initial).close()
+
+    store = DiskStore(tmp_path / "state.db")
+    assert to_raw(store.state) == initial
+    store.close()
+
+    store = DiskStore(tmp_path / "state.db")
+    assert to_raw(store.state, copy=False) == initial
+    store.close()
+
+    store = DiskStore(tmp_path / "state.db")
+    assert store.state == initial
+    assert store.state["a"] != {"b": []}
+    store.close()
+
+    store = DiskStore(tmp_path / "state.db")
+    assert dumps_json(store.state) == json.dumps(initial)
+    copied = store.state.copy()
+    assert copied["a"] == initial["a"]
+    assert to_raw(copied) == initial
+    store.close()
+
+
+def test_disk_store_deep_watchers(tmp_path):
+    initial = {"a": {"b": [0, {"c": 1}]}, "d": {"e": 1}}
+    DiskStore(tmp_path / "state.db", initial).close()
+    store = DiskStore(tmp_path / "state.db")
+    state = store.state
+    called = []
+    watcher = watch(  # noqa: F841
+        lambda: state, lambda: called.append(1), sync=True, deep=True
+    )
+    # The deep watcher doesn't load the tree
+    assert len(store) == 1
+
+    # Writes inside containers that were not loaded when the watcher
+    # evaluated are seen (the write itself loads them)
+    state["a"]["b"][1]["c"] = 3
+    assert called == [1]
+    state["a"]["b"][1]["c"] = 4
+    assert called == [1, 1]
+    # Reads don't notify
+    assert state["d"]["e"] == 1
+    assert called == [1, 1]
+    state["d"]["e"] = 2
+    assert called == [1, 1, 1]
+    store.close()
+
+
+def test_disk_store_compact(tmp_path):
+    store = DiskStore(tmp_path / "state.db", {"x": {"y": [1]}, "z": {}})
+    state = store.state
+    for i in range(3):
+        state["x"] = {"y": [i]}
+        store.flush()
+    kept = state["z"]
+    del state["z"]
+
+    def rows():
+        return store.connection.execute("SELECT count(*) FROM nodes").fetchone()[0]
+
+    assert rows() == 10
+    # The replaced subtrees are deleted, the loaded (removed) one is not
+    assert store.compact() == 6
+    assert rows() == 4
+    state["z"] = kept
+    store.close()
+
+    store = DiskStore(tmp_path / "state.db")
+    assert store.to_raw() == {"x": {"y": [2]}, "z": {}}
+    assert store.compact() == 0
+    store.close()
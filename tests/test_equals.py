@@ -0,0 +1,132 @@
+import math
+
+from observ import computed, reactive, watch
+from observ.watcher import version_signature
+
+
+def test_watch_equals():
+    state = reactive({"x": 1.0})
+    called = []
+
+    def close(old, new):
+        return old is not None and math.isclose(old, new, abs_tol=0.1)
+
+    watcher = watch(
+        lambda: state["x"],
+        lambda new, old: called.append((new, old)),
+        sync=True,
+        equals=close,
+    )
+    assert watcher.value == 1.0
+
+    state["x"] = 1.05
+    assert called == []
+    # The previous value is kept when the new value is equal
+    assert watcher.value == 1.0
+
+    state["x"] = 2.0
+    assert called == [(2.0, 1.0)]
+
+
+def test_watch_equals_container():
+    state = reactive({"items": [1, 2, 3]})
+    called = []
+
+    # By default, a new container is always considered changed
+    watcher = watch(
+        lambda: [item for item in state["items"] if item > 1],
+        lambda: called.append(1),
+        sync=True,
+        equals=lambda old, new: old == new,
+    )
+    state["items"].append(0)
+    assert called == []
+    state["items"].append(5)
+    assert called == [1]
+    assert watcher.value == [2, 3, 5]
+
+
+def test_computed_equals_keeps_identity():
+    state = reactive({"items": [3, 1, 2]})
+    calls = []
+
+    @computed(equals=lambda old, new: old == new)
+    def sorted_items():
+        calls.append(1)
+        return sorted(state["items"])
+
+    first = sorted_items()
+    assert first == [1, 2, 3]
+    state["items"].reverse()
+    assert sorted_items() is first
+    state["items"].append(0)
+    assert sorted_items() == [0, 1, 2, 3]
+    assert len(calls) == 3
+
+
+def test_watch_equals_version():
+    state = reactive({"a": {"b": [1, 2]}, "c": 1})
+    called = []
+
+    watcher = watch(
+        lambda: state["a"],
+        lambda: called.append(1),
+        sync=True,
+        deep=True,
+        equals="version",
+    )
+
+    # Reassigning an equal value does not notify
+    state["c"] = 1
+    assert called == []
+
+    # A nested mutation bumps the version of the nested list
+    state["a"]["b"].append(3)
+    assert called == [1]
+
+    state["a"]["b"][0] = 1
+    assert called == [1]
+
+    state["a"]["d"] = None
+    assert called == [1, 1]
+    watcher.stop()
+
+
+def test_watch_equals_version_per_watcher():
+    state = reactive({"a": [1]})
+    called = []
+
+    watchers = [
+        watch(
+            lambda: state["a"],
+            lambda: called.append(1),
+            sync=True,
+            deep=True,
+            equals="version",
+        )
+        for _ in range(2)
+    ]
+    assert watchers[0].equals is not watchers[1].equals
+    state["a"].append(2)
+    assert called == [1, 1]
+
+
+def test_version_signature():
+    state = reactive({"a": [1, 2], "b": {"c": 1}})
+    signature = version_signature(state)
+    assert version_signature(state) == signature
+
+    state["b"]["c"] = 2
+    assert version_signature(state) != signature
+
+    # Raw values are compared by contents
+    assert version_signature({"a": [1, (2, 3)]}) == version_signature(
+        {"a": [1, (2, 3)]}
+    )
+    assert version_signature({"a": [1]}) != version_signature({"a": [2]})
+    assert version_signature({1, 2}) == version_signature({2, 1})
+
+    # Cycles are supported
+    cycle = []
+    cycle.append(cycle)
+    assert version_signature(cycle) == version_signature(cycle)
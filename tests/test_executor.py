@@ -0,0 +1,158 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from observ import computed, reactive, watch
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(2) as executor:
+        yield executor
+
+
+def test_executor_computed_without_loop(executor):
+    state = reactive({"numbers": [1, 2, 3], "other": 0})
+    inputs_seen = []
+
+    def total(numbers):
+        inputs_seen.append(numbers)
+        return sum(numbers)
+
+    result = computed(total, executor=executor, inputs=lambda: state["numbers"])
+    # Without a running loop, the result is waited for
+    assert result() == 6
+    # The work gets a raw copy of the inputs
+    assert type(inputs_seen[0]) is list
+
+    called = []
+    watcher = watch(result, called.append, sync=True)  # noqa: F841
+    state["numbers"].append(4)
+    assert result() == 10
+    assert called == [10]
+
+    # Changes to state that is not part of the inputs are ignored
+    state["other"] = 1
+    assert len(inputs_seen) == 2
+
+
+def test_executor_computed_decorator(executor):
+    state = reactive({"a": 1})
+
+    @computed(executor=executor, inputs=lambda: state["a"])
+    def double(a):
+        return a * 2
+
+    assert double() == 2
+    state["a"] = 2
+    assert double() == 4
+    assert double.__name__ == "double"
+
+
+def test_executor_computed_error(executor):
+    state = reactive({"a": 0})
+    result = computed(lambda a: 1 / a, executor=executor, inputs=lambda: state["a"])
+    # The error is raised when the result is read
+    with pytest.raises(ZeroDivisionError):
+        result()
+
+    state["a"] = 2
+    assert result() == 0.5
+    called = []
+    watcher = watch(result, called.append, sync=True)  # noqa: F841
+    state["a"] = 4
+    assert called == [0.25]
+
+
+def test_executor_computed_error_with_loop(executor):
+    loop = asyncio.new_event_loop()
+    state = reactive({"a": 1})
+
+    async def main():
+        result = computed(lambda a: 1 / a, executor=executor, inputs=lambda: state["a"])
+        while result() is None:
+            await asyncio.sleep(0.001)
+        state["a"] = 0
+        while True:
+            try:
+                result()
+            except ZeroDivisionError:
+                break
+            await asyncio.sleep(0.001)
+        state["a"] = 4
+        while True:
+            try:
+                if result() == 0.25:
+                    break
+            except ZeroDivisionError:
+                pass
+            await asyncio.sleep(0.001)
+
+    try:
+        loop.run_until_complete(asyncio.wait_for(main(), 5))
+    finally:
+        loop.close()
+
+
+def test_executor_computed_requires_inputs(executor):
+    with pytest.raises(TypeError):
+        computed(lambda: 1, executor=executor)
+
+
+def test_executor_computed_with_loop(executor):
+    loop = asyncio.new_event_loop()
+    state = reactive({"a": 1})
+    threads = []
+    release = threading.Event()
+
+    def slow_double(a):
+        if a == 2:
+            # Keep this result back until it is stale
+            release.wait(timeout=5)
+        return a * 2
+
+    async def main():
+        result = computed(slow_double, executor=executor, inputs=lambda: state["a"])
+        published = []
+        watcher = watch(  # noqa: F841
+            result,
+            lambda value: published.append((value, threading.current_thread())),
+            sync=True,
+        )
+        assert result() is None
+        while result() is None:
+            await asyncio.sleep(0.001)
+        assert result() == 2
+
+        # Changes within one iteration of the loop are submitted once
+        state["a"] = 10
+        state["a"] = 2
+        await asyncio.sleep(0.01)
+        state["a"] = 3
+        while result() != 6:
+            await asyncio.sleep(0.001)
+        release.set()
+        await asyncio.sleep(0.05)
+        # The result for 2 came in last, but was stale by then
+        assert result() == 6
+        threads.extend(thread for _, thread in published)
+        return [value for value, _ in published]
+
+    try:
+        assert loop.run_until_complete(main()) == [2, 6]
+    finally:
+        release.set()
+        loop.close()
+    assert threads == [threading.current_thread()] * 2
+
+
+def test_executor_computed_process_pool():
+    state = reactive({"numbers": [1, 2, 3]})
+    with ProcessPoolExecutor(1) as executor:
+        # A builtin can be pickled by reference
+        result = computed(sum, executor=executor, inputs=lambda: state["numbers"])
+        assert result() == 6
+        state["numbers"].append(4)
+        assert result() == 10
@@ -0,0 +1,89 @@
+import pytest
+
+from observ import Journal, load_journal, reactive, to_raw, watch
+
+
+def mutate(state):
+    state["a"].append(4)
+    state["a"].insert(0, {"nested": [1]})
+    state["a"][0]["nested"].append(2)
+    del state["a"][1]
+    state["a"].sort(key=lambda value: isinstance(value, int))
+    state["b"]["c"] = {"d": {1, 2}}
+    state["b"]["c"]["d"].add(3)
+    state["b"]["c"]["d"].discard(1)
+    state.update({"e": (1, [2]), "f": None})
+    state["e"][1].append(3)
+    state.pop("f")
+    state["b"].clear()
+    state["b"]["g"] = state["a"][0]
+    state["b"]["g"]["nested"].append(3)
+
+
+def test_journal(tmp_path):
+    path = tmp_path / "state.journal"
+    state = reactive({"a": [1, 2, 3], "b": {"x": 1, "y": 2}})
+    with Journal(state, path) as journal:
+        mutate(state)
+        journal.flush()
+        loaded = load_journal(path)
+
+    assert to_raw(loaded) == to_raw(state)
+    # Shared containers stay shared
+    assert loaded["b"]["g"] is loaded["a"][0]
+
+    # Mutations after closing are not recorded
+    state["a"].append(5)
+    assert to_raw(load_journal(path)) != to_raw(state)
+
+
+def test_journal_compaction(tmp_path):
+    path = tmp_path / "state.journal"
+    state = reactive({"a": [], "b": {"x": 1, "y": 2, "z": 3}})
+    journal = Journal(state, path, compact_every=3)
+    for i in range(10):
+        state["a"].append(i)
+    # Compaction in the middle of a mutation that has multiple records
+    state["b"].clear()
+    state["b"]["w"] = 1
+    journal.flush()
+    size = path.stat().st_size
+    assert to_raw(load_journal(path)) == to_raw(state)
+
+    journal.compact()
+    assert path.stat().st_size < size
+    assert to_raw(load_journal(path)) == to_raw(state)
+    journal.close()
+
+
+def test_journal_open(tmp_path):
+    path = tmp_path / "state.journal"
+    state = reactive({"items": []})
+    journal = Journal(state, path)
+    state["items"].append({"a": 1})
+    journal.close()
+
+    journal = Journal.open(path)
+    called = []
+    watcher = watch(lambda: journal.state["items"][0]["a"], called.append, sync=True)
+    journal.state["items"][0]["a"] = 2
+    assert called == [2]
+    journal.close()
+    assert to_raw(load_journal(path)) == {"items": [{"a": 2}]}
+    del watcher
+
+
+def test_journal_torn_tail(tmp_path):
+    path = tmp_path / "state.journal"
+    state = reactive({"a": 1})
+    with Journal(state, path):
+        state["a"] = 2
+        state["a"] = 3
+    data = path.read_bytes()
+    # Simulate a crash in the middle of writing the last record
+    path.write_bytes(data[:-2])
+    assert to_raw(load_journal(path)) == {"a": 2}
+
+    path.write_bytes(b"")
+    with pytest.raises(ValueError):
+        load_journal(path)
@@ -0,0 +1,84 @@
+from multiprocessing import Pipe
+
+import pytest
+
+from observ import Primary, Replica, reactive, scheduler, to_raw, watch
+
+
+def test_mirror(noop_request_flush):
+    messages = []
+    state = reactive({"a": [1, 2], "b": {"c": {1}}})
+    primary = Primary(state, messages.append)
+    replica = Replica()
+    replica.apply(messages.pop())
+    assert to_raw(replica.state) == to_raw(state)
+
+    called = []
+    watcher = watch(lambda: replica.state["a"][-1], called.append, sync=True)
+
+    state["a"].append(3)
+    state["a"].append({"d": [4]})
+    state["a"][-1]["d"].append(5)
+    state["b"]["c"].add(2)
+    state["b"]["e"] = state["a"][-1]
+    # Mutations are sent in a single batch per flush
+    assert messages == []
+    scheduler.flush()
+    assert len(messages) == 1
+    replica.apply(messages.pop())
+
+    assert to_raw(replica.state) == to_raw(state)
+    assert replica.state["b"]["e"] is replica.state["a"][-1]
+    assert called == [3, {"d": [4, 5]}]
+
+    primary.close()
+    state["a"].clear()
+    scheduler.flush()
+    assert messages == []
+    del watcher
+
+
+def test_mirror_resync():
+    messages = []
+    state = reactive({"a": [1], "b": 1})
+    primary = Primary(state, messages.append, sync=True)
+    replica = Replica()
+    replica.apply(messages.pop())
+    root = replica.state
+
+    removed = state["a"]
+    del state["b"]
+    state["a"] = [2]
+    removed.append(3)
+    assert len(messages) == 3
+    for message in messages:
+        replica.apply(message)
+    messages.clear()
+    assert to_raw(replica.state) == {"a": [2]}
+
+    state["c"] = 1
+    primary.resync()
+    assert len(messages) == 2
+    for message in messages:
+        replica.apply(message)
+    assert replica.state is root
+    assert to_raw(replica.state) == {"a": [2], "c": 1}
+    primary.close()
+
+
+def test_mirror_pipe():
+    receiver, sender = Pipe(duplex=False)
+    state = reactive({"items": []})
+    primary = Primary(state, sender.send_bytes, sync=True)
+    replica = Replica()
+    for i in range(10):
+        state["items"].append({"value": i})
+    assert replica.receive(receiver) == 11
+    assert to_raw(replica.state) == to_raw(state)
+    primary.close()
+
+
+def test_replica_requires_state():
+    replica = Replica()
+    with pytest.raises(RuntimeError):
+        replica.apply(b"B")
@@ -0,0 +1,205 @@
+from dataclasses import FrozenInstanceError, asdict, dataclass, field, fields
+
+import pytest
+
+from observ import (
+    computed,
+    reactive,
+    reactive_class,
+    readonly,
+    snapshot,
+    to_raw,
+    version,
+    watch,
+)
+from observ.proxy import Proxy
+from observ.traps import ReadonlyError
+
+
+@reactive_class
+@dataclass(slots=True)
+class Point:
+    x: float
+    y: float
+
+    @property
+    def norm(self):
+        return (self.x**2 + self.y**2) ** 0.5
+
+    def move(self, dx, dy):
+        self.x += dx
+        self.y += dy
+
+
+@reactive_class
+@dataclass
+class Shape:
+    name: str
+    points: list = field(default_factory=list)
+
+
+@reactive_class
+class Slotted:
+    __slots__ = ("__secret", "value")
+
+    def __init__(self, value):
+        self.value = value
+        self.__secret = 0
+
+    def bump(self):
+        self.__secret += 1
+        return self.__secret
+
+
+@reactive_class
+@dataclass(frozen=True, slots=True)
+class Frozen:
+    value: int
+
+
+@reactive_class
+@dataclass(order=True)
+class Version:
+    major: int
+    minor: int = 0
+
+
+def test_object_proxy_reads_are_tracked_per_attribute():
+    point = reactive(Point(1, 2))
+    assert isinstance(point, Proxy)
+    called = []
+    x = computed(lambda: called.append("x") or point.x)
+    assert x() == 1
+
+    point.y = 3
+    assert x() == 1
+    assert called == ["x"]
+
+    point.x = 5
+    assert x() == 5
+    assert called == ["x", "x"]
+
+    # Writing an equal value doesn't notify
+    point.x = 5.0
+    assert x() == 5
+    assert called == ["x", "x"]
+
+
+def test_object_proxy_methods_and_properties():
+    point = reactive(Point(3, 0))
+    norm = computed(lambda: point.norm)
+    assert norm() == 3
+
+    point.move(0, 4)
+    assert norm() == 5
+    assert to_raw(point) == Point(3, 4)
+
+
+def test_object_proxy_nested():
+    shape = reactive({"shape": Shape("triangle")})
+    called = []
+    watcher = watch(  # noqa: F841
+        lambda: shape, lambda: called.append(1), sync=True, deep=True
+    )
+
+    shape["shape"].points.append(Point(0, 0))
+    assert called == [1]
+    # Values read from proxied objects are proxied
+    assert isinstance(shape["shape"].points[0], Proxy)
+    shape["shape"].points[0].x = 1
+    assert called == [1, 1]
+    shape["shape"].name = "line"
+    assert called == [1, 1, 1]
+
+    raw = to_raw(shape)
+    assert raw == {"shape": Shape("line", [Point(1, 0)])}
+    assert not isinstance(raw["shape"].points[0], Proxy)
+
+
+def test_object_proxy_slots():
+    obj = reactive(Slotted(1))
+    called = []
+    watcher = watch(  # noqa: F841
+        lambda: getattr(obj, "value", None), lambda: called.append(1), sync=True
+    )
+
+    assert obj.bump() == 1
+    assert obj.bump() == 2
+    assert called == []
+    obj.value = 2
+    assert called == [1]
+
+    del obj.value
+    assert called == [1, 1]
+    with pytest.raises(AttributeError):
+        obj.value
+
+
+def test_object_proxy_readonly():
+    point = readonly(Point(1, 2))
+    assert point.x == 1
+    with pytest.raises(ReadonlyError):
+        point.x = 2
+    with pytest.raises(ReadonlyError):
+        del point.x
+    with pytest.raises(ReadonlyError):
+        point.move(1, 1)
+
+    with pytest.raises(FrozenInstanceError):
+        reactive(Frozen(1)).value = 2
+
+
+def test_object_proxy_version_and_snapshot():
+    state = reactive({"point": Point(1, 2)})
+    before = version(state, deep=True)
+    state["point"].x = 3
+    assert version(state, deep=True) > before
+
+    snap = snapshot(state)
+    state["point"].move(1, 1)
+    assert snap.to_raw() == {"point": Point(3, 2)}
+    snap.restore()
+    assert to_raw(state) == {"point": Point(3, 2)}
+
+
+def test_object_proxy_hash_and_order():
+    frozen = reactive(Frozen(1))
+    assert hash(frozen) == hash(Frozen(1))
+    assert frozen in {Frozen(1)}
+    assert {frozen: 1}[Frozen(1)] == 1
+    with pytest.raises(TypeError):
+        hash(reactive(Point(1, 2)))
+
+    state = reactive({"versions": [Version(2), Version(1, 5), Version(1)]})
+    versions = state["versions"]
+    assert versions[1] < versions[0]
+    assert versions[2] <= Version(1)
+    assert versions[0] > versions[1] >= versions[2]
+    latest = computed(lambda: max(versions))
+    assert latest() == Version(2)
+    assert [to_raw(version) for version in sorted(versions)] == [
+        Version(1),
+        Version(1, 5),
+        Version(2),
+    ]
+    versions[1].major = 3
+    assert latest() == Version(3, 5)
+
+
+def test_object_proxy_dataclass_functions():
+    shape = reactive(Shape("line", [Point(0, 1)]))
+    assert [field.name for field in fields(shape)] == ["name", "points"]
+    raw = asdict(shape)
+    # Nested containers are proxies, which asdict copies as a whole
+    assert raw == {"name": "line", "points": [Point(0, 1)]}
+    assert not isinstance(raw["points"], Proxy)
+    assert not isinstance(raw["points"][0], Proxy)
+    assert asdict(readonly(Point(1, 2))) == {"x": 1, "y": 2}
+
+
+def test_reactive_class_requires_fields():
+    class Plain:
+        pass
+
+    with pytest.raises(TypeError):
+        reactive_class(Plain)
@@ -0,0 +1,474 @@
+import gc
+import random
+
+import pytest
+
+from observ import (
+    EffectScope,
+    group_by,
+    index_by,
+    listen,
+    reactive,
+    reactive_count,
+    reactive_filter,
+    reactive_map,
+    reactive_reduce,
+    reactive_sum,
+    sorted_view,
+    watch,
+    window,
+)
+from observ.proxy_db import MISSING
+from observ.traps import ReadonlyError
+
+
+def test_change_records_list():
+    state = reactive([1, 2, 3])
+    changes = []
+    state.__dep__.add_listener(lambda target, change: changes.append(change))
+
+    state.append(4)
+    state.insert(0, 0)
+    state.pop()
+    state.remove(2)
+    state[0] = 5
+    state[1:2] = [6, 7]
+    del state[-1]
+    state.reverse()
+    state.clear()
+    # No-ops don't produce change records
+    state.extend([])
+    state.clear()
+
+    assert changes == [
+        ("splice", 3, [], [4]),
+        ("splice", 0, [], [0]),
+        ("splice", 4, [4], []),
+        ("splice", 2, [2], []),
+        ("splice", 0, [0], [5]),
+        ("splice", 1, [1], [6, 7]),
+        ("splice", 3, [3], []),
+        ("splice", 0, [5, 6, 7], [7, 6, 5]),
+        ("splice", 0, [7, 6, 5], []),
+    ]
+
+
+def test_change_records_describe_previous_state():
+    # Replaying the inverse of the records restores the original list
+    original = list(range(10))
+    state = reactive(original[:])
+    changes = []
+    state.__dep__.add_listener(lambda target, change: changes.append(change))
+
+    state[::2] = ["a"] * 5
+    state.reverse()
+    state.__imul__(2)
+    state.insert(-100, "b")
+    state.pop(3)
+    del state[2:5]
+
+    restored = list(state.__target__)
+    for _, index, removed, inserted in reversed(changes):
+        restored[index : index + len(inserted)] = removed
+    assert restored == original
+
+
+def test_change_records_dict_and_set():
+    state = reactive({"a": 1, "b": 2})
+    changes = []
+    state.__dep__.add_listener(lambda target, change: changes.append(change))
+
+    state["a"] = 3
+    state["a"] = 3
+    state.update(c=4)
+    del state["b"]
+    state.pop("missing", None)
+    state.clear()
+
+    assert changes == [
+        ("set", "a", 1, 3),
+        ("set", "c", MISSING, 4),
+        ("delete", "b", 2),
+        ("delete", "a", 3),
+        ("delete", "c", 4),
+    ]
+
+    values = reactive({1, 2})
+    changes.clear()
+    values.__dep__.add_listener(lambda target, change: changes.append(change))
+
+    values.add(3)
+    values.add(3)
+    values.discard(1)
+    values.symmetric_difference_update({2, 4})
+
+    assert changes == [
+        ("add", 3),
+        ("discard", 1),
+        ("discard", 2),
+        ("add", 4),
+    ]
+
+
+def test_reactive_map():
+    state = reactive({"items": [{"x": 1}, {"x": 2}, {"x": 3}]})
+    calls = []
+
+    def double(item):
+        calls.append(item["x"])
+        return item["x"] * 2
+
+    doubled = reactive_map(state["items"], double)
+    assert doubled == [2, 4, 6]
+    assert calls == [1, 2, 3]
+
+    calls.clear()
+    state["items"][1]["x"] = 10
+    assert doubled == [2, 20, 6]
+    # Only the changed item was re-evaluated
+    assert calls == [10]
+
+    calls.clear()
+    state["items"].insert(0, {"x": 5})
+    assert doubled == [10, 2, 20, 6]
+    assert calls == [5]
+
+    calls.clear()
+    del state["items"][1:3]
+    assert doubled == [10, 6]
+    assert calls == []
+
+    state["items"][0]["x"] = 7
+    assert doubled == [14, 6]
+
+    with pytest.raises(ReadonlyError):
+        doubled.append(1)
+
+
+def test_reactive_map_watchers():
+    items = reactive([1, 2, 3])
+    squares = reactive_map(items, lambda x: x * x)
+    calls = []
+    watcher = watch(  # noqa: F841
+        lambda: squares[-1], lambda new, old: calls.append((new, old)), sync=True
+    )
+
+    items[0] = 4
+    assert calls == []
+
+    items.append(5)
+    assert calls == [(25, 9)]
+
+
+def test_reactive_map_depends_on_other_state():
+    settings = reactive({"factor": 2})
+    items = reactive([1, 2])
+    scaled = reactive_map(items, lambda x: x * settings["factor"])
+    assert scaled == [2, 4]
+
+    settings["factor"] = 3
+    assert scaled == [3, 6]
+
+
+def test_reactive_filter():
+    state = reactive([{"done": False}, {"done": True}, {"done": False}])
+    todo = reactive_filter(state, lambda item: not item["done"])
+    assert len(todo) == 2
+
+    state[0]["done"] = True
+    assert todo == [{"done": False}]
+    assert todo[0] is not None
+
+    state.append({"done": False})
+    assert len(todo) == 2
+
+    state[1]["done"] = False
+    assert len(todo) == 3
+    # The output keeps the order of the source
+    assert todo[0].__target__ is state[1].__target__
+
+    state.clear()
+    assert todo == []
+
+
+def test_reactive_filter_and_map_match_plain():
+    rng = random.Random(0)
+    rows = reactive([{"n": rng.randrange(4)} for _ in range(30)])
+    kept = reactive_filter(rows, lambda row: row["n"] % 2)
+    doubled = reactive_map(rows, lambda row: row["n"] * 2)
+    for _ in range(300):
+        action = rng.randrange(5)
+        if action == 0:
+            rows.insert(rng.randrange(len(rows) + 1), {"n": rng.randrange(4)})
+        elif action == 1:
+            rows.append({"n": rng.randrange(4)})
+        elif action == 2 and rows:
+            rows.pop(rng.randrange(len(rows)))
+        elif rows:
+            rows[rng.randrange(len(rows))]["n"] = rng.randrange(4)
+        assert [row["n"] for row in kept] == [row["n"] for row in rows if row["n"] % 2]
+        assert doubled == [row["n"] * 2 for row in rows]
+
+
+def test_reactive_reduce_sum_and_count():
+    state = reactive([{"n": 1}, {"n": 2}, {"n": 3}])
+    total = reactive_sum(state, lambda item: item["n"])
+    odd = reactive_count(state, lambda item: item["n"] % 2)
+    product = reactive_reduce(
+        state,
+        lambda a, b: a * b,
+        lambda a, b: a // b,
+        1,
+        lambda item: item["n"],
+    )
+    assert total["value"] == 6
+    assert odd["value"] == 2
+    assert product["value"] == 6
+
+    state[0]["n"] = 5
+    assert total["value"] == 10
+    assert odd["value"] == 2
+    assert product["value"] == 30
+
+    state.pop()
+    assert total["value"] == 7
+    assert odd["value"] == 1
+    assert product["value"] == 10
+
+    numbers = reactive([1, 2, 3])
+    numbers_total = reactive_sum(numbers)
+    numbers.extend([4, 5])
+    assert numbers_total["value"] == 15
+
+
+def test_operator_lifetime():
+    items = reactive([1, 2, 3])
+    doubled = reactive_map(items, lambda x: x * 2)
+    assert items.__dep__.listeners
+
+    # The operator (and its listener) is released with its result,
+    # through reference counting alone
+    gc.disable()
+    try:
+        del doubled
+    finally:
+        gc.enable()
+    assert items.__dep__.listeners is None
+
+
+def test_operator_not_captured_by_scope():
+    rows = reactive([{"n": 1}, {"n": 2}])
+    scope = EffectScope()
+    with scope:
+        doubled = reactive_map(rows, lambda row: row["n"] * 2)
+        rows.append({"n": 3})
+    assert len(scope) == 0
+    scope.stop()
+    rows[0]["n"] = 10
+    assert doubled == [20, 4, 6]
+
+
+def test_operator_requires_list():
+    with pytest.raises(TypeError):
+        reactive_map(reactive({}), lambda x: x)
+
+
+def test_index_by():
+    rows = reactive([{"id": 1, "name": "a"}, {"id": 2, "name": "b"}])
+    by_id = index_by(rows, "id")
+    assert by_id[1]["name"] == "a"
+    assert by_id[2]["name"] == "b"
+
+    lookups = []
+    watcher = watch(  # noqa: F841
+        lambda: by_id.get(1), lambda new: lookups.append(new), sync=True
+    )
+
+    # Unrelated changes don't re-run the lookup of id 1
+    rows.append({"id": 3, "name": "c"})
+    rows[1]["id"] = 4
+    assert lookups == []
+    assert 2 not in by_id
+    assert by_id[4]["name"] == "b"
+
+    rows[0]["id"] = 5
+    assert lookups == [None]
+    assert by_id[5]["name"] == "a"
+
+    rows.pop(0)
+    assert 5 not in by_id
+    assert sorted(by_id) == [3, 4]
+
+
+def test_index_by_duplicate_keys():
+    rows = reactive([{"id": 1, "n": 1}, {"id": 1, "n": 2}])
+    by_id = index_by(rows, lambda row: row["id"])
+    assert by_id[1]["n"] == 2
+
+    # The other record takes the place of a removed duplicate
+    rows.pop()
+    assert by_id[1]["n"] == 1
+
+
+def test_group_by():
+    rows = reactive(
+        [
+            {"name": "a", "status": "todo"},
+            {"name": "b", "status": "done"},
+            {"name": "c", "status": "todo"},
+        ]
+    )
+    by_status = group_by(rows, "status")
+    assert [row["name"] for row in by_status["todo"]] == ["a", "c"]
+    assert [row["name"] for row in by_status["done"]] == ["b"]
+
+    done = []
+    watcher = watch(  # noqa: F841
+        lambda: len(by_status["done"]), lambda new: done.append(new), sync=True
+    )
+
+    rows[0]["status"] = "doing"
+    assert [row["name"] for row in by_status["todo"]] == ["c"]
+    assert [row["name"] for row in by_status["doing"]] == ["a"]
+    assert done == []
+
+    rows[2]["status"] = "done"
+    assert "todo" not in by_status
+    assert [row["name"] for row in by_status["done"]] == ["b", "c"]
+    assert done == [2]
+
+
+def test_group_by_dict_source():
+    rows = reactive({"x": {"kind": 1}, "y": {"kind": 2}})
+    by_kind = group_by(rows, "kind")
+    assert len(by_kind[1]) == 1
+
+    rows["z"] = {"kind": 1}
+    assert len(by_kind[1]) == 2
+
+    rows["x"] = {"kind": 2}
+    assert len(by_kind[1]) == 1
+    assert len(by_kind[2]) == 2
+
+    rows["y"]["kind"] = 3
+    assert len(by_kind[2]) == 1
+    assert by_kind[3][0]["kind"] == 3
+
+    del rows["z"]
+    rows.clear()
+    assert by_kind == {}
+
+
+def test_sorted_view():
+    rows = reactive([{"n": 3}, {"n": 1}, {"n": 2}])
+    view = sorted_view(rows, key=lambda row: row["n"])
+    assert [row["n"] for row in view] == [1, 2, 3]
+
+    changes = []
+    stop = listen(view, changes.append)
+
+    rows.append({"n": 0})
+    assert [row["n"] for row in view] == [0, 1, 2, 3]
+    assert changes == [("splice", 0, [], [{"n": 0}])]
+
+    changes.clear()
+    rows[0]["n"] = -1
+    assert [row["n"] for row in view] == [-1, 0, 1, 2]
+    # The move is reported as a removal and an insertion
+    assert changes == [
+        ("splice", 3, [{"n": -1}], []),
+        ("splice", 0, [], [{"n": -1}]),
+    ]
+
+    changes.clear()
+    rows[1]["n"] = 1.5
+    # The item stays in place: no changes to the view
+    assert changes == []
+
+    rows.remove(rows[1])
+    assert [row["n"] for row in view] == [-1, 0, 2]
+
+    stop()
+    rows.clear()
+    assert view == []
+    assert len(changes) == 1
+
+
+def test_sorted_view_reverse_and_ties():
+    items = reactive([2, 1, 2, 3])
+    view = sorted_view(items, reverse=True)
+    assert view == sorted([2, 1, 2, 3], reverse=True)
+
+    items.extend(range(20))
+    assert view == sorted(items, reverse=True)
+
+    rows = reactive([{"k": 1, "i": 0}, {"k": 0, "i": 1}, {"k": 1, "i": 2}])
+    view = sorted_view(rows, key=lambda row: row["k"])
+    # Equal keys keep their order
+    assert [row["i"] for row in view] == [1, 0, 2]
+
+
+def test_sorted_view_matches_sorted():
+    rng = random.Random(0)
+    rows = reactive([{"n": rng.randrange(10)} for _ in range(30)])
+    view = sorted_view(rows, key=lambda row: row["n"])
+    for _ in range(200):
+        action = rng.randrange(4)
+        if action == 0:
+            rows.insert(rng.randrange(len(rows) + 1), {"n": rng.randrange(10)})
+        elif action == 1 and rows:
+            rows.pop(rng.randrange(len(rows)))
+        elif rows:
+            rows[rng.randrange(len(rows))]["n"] = rng.randrange(10)
+        assert [row["n"] for row in view] == sorted(row["n"] for row in rows)
+
+
+def test_window():
+    rows = reactive([{"n": i} for i in range(100)])
+    view = window(rows, 10, 13)
+    assert [row["n"] for row in view] == [10, 11, 12]
+    assert view.total == 100
+
+    reads = []
+    watcher = watch(  # noqa: F841
+        lambda: [row["n"] for row in view],
+        lambda new: reads.append(new),
+        sync=True,
+    )
+    totals = []
+    total_watcher = watch(  # noqa: F841
+        lambda: view.total, lambda new: totals.append(new), sync=True
+    )
+
+    # Changes outside of the window don't trigger the watcher
+    rows[50]["n"] = -1
+    rows.append({"n": 100})
+    rows[0] = {"n": 0}
+    assert reads == []
+    assert totals == [101]
+
+    # Changes inside the window do
+    rows[11]["n"] = -11
+    assert reads == [[10, -11, 12]]
+    rows.insert(0, {"n": -100})
+    assert reads[-1] == [9, 10, -11]
+    assert totals == [101, 102]
+
+    view.move(0, 2)
+    assert reads[-1] == [-100, 0]
+    view.stop = 3
+    assert reads[-1] == [-100, 0, 1]
+    assert (view.start, view.stop) == (0, 3)
+    assert len(view) == 3
+    assert view[0]["n"] == -100
+
+
+def test_window_only_depends_on_window():
+    rows = reactive(list(range(1000)))
+    view = window(rows, 0, 10)
+
+    watcher = watch(lambda: list(view), None, sync=True)
+    # The watcher depends on the items of the window, but not on the
+    # source list itself
+    assert rows.__dep__ not in watcher._deps
+    assert view.items.__dep__ in watcher._deps
@@ -0,0 +1,44 @@
+"""Tests for pickling of Proxy objects."""
+
+import pickle
+
+from observ import reactive, readonly, shallow_reactive, to_raw, watch
+from observ.proxy import Proxy
+
+
+def test_pickle_roundtrip():
+    state = reactive({"a": [1, 2], "b": {"c": {1, 2}}, "d": (1, [3])})
+    result = pickle.loads(pickle.dumps(state))
+    assert isinstance(result, Proxy)
+    assert to_raw(result) == to_raw(state)
+    assert result.__target__ is not state.__target__
+
+    # The result is a fresh reactive proxy
+    called = []
+    watcher = watch(lambda: result["a"][0], called.append, sync=True)
+    result["a"][0] = 5
+    assert called == [5]
+    del watcher
+
+
+def test_pickle_configuration():
+    raw = {"a": [1]}
+    proxies = [reactive(raw), readonly(raw), shallow_reactive(raw)]
+    result = pickle.loads(pickle.dumps(proxies))
+    assert [(p.__readonly__, p.__shallow__) for p in result] == [
+        (False, False),
+        (True, False),
+        (False, True),
+    ]
+    # The proxies still share a single target
+    assert result[0].__target__ is result[1].__target__ is result[2].__target__
+
+
+def test_pickle_shared_references():
+    shared = [1, 2]
+    state = reactive({"x": shared, "y": shared})
+    state["self"] = state
+    result = pickle.loads(pickle.dumps(state))
+    target = result.__target__
+    assert target["x"] is target["y"]
+    assert result["self"] is result
@@ -3,7 +3,7 @@ import pytest
 from observ import watch
 from observ.dict_proxy import DictProxy, ReadonlyDictProxy
 from observ.list_proxy import ListProxy, ReadonlyListProxy
-from observ.proxy import Proxy, proxy
+from observ.proxy import Proxy, mark_raw, proxy, to_raw
 from observ.proxy_db import proxy_db
 from observ.set_proxy import ReadonlySetProxy, SetProxy
 from observ.traps import ReadonlyError
@@ -412,3 +412,93 @@ def test_readonly_proxy_construction_forces_readonly():
         shallow = proxy_type(target, shallow=True)
         assert shallow.__readonly__ is True
         assert shallow.__shallow__ is True
+
+
+def test_mark_raw():
+    mesh = {"vertices": [[0, 1, 2]] * 3, "meta": {"name": "mesh"}}
+    state = proxy({"mesh": mark_raw(mesh), "items": mark_raw([{"a": 1}])})
+
+    raw_mesh = state["mesh"]
+    assert not isinstance(raw_mesh, Proxy)
+    assert raw_mesh == mesh
+    assert raw_mesh is not mesh
+    assert not isinstance(raw_mesh["meta"], Proxy)
+    assert not isinstance(state["items"][0], Proxy)
+
+    # to_raw keeps marked values as they are
+    assert to_raw(state)["mesh"] is raw_mesh
+
+    # Marking a proxy marks its target, other values are returned as-is
+    marked = mark_raw(proxy([1, 2]))
+    assert not isinstance(marked, Proxy)
+    assert marked == [1, 2]
+    obj = object()
+    assert mark_raw(obj) is obj
+
+    # Tuples are not proxied element-wise either
+    pair = mark_raw(({"a": 1}, {"b": 2}))
+    assert not isinstance(proxy(pair)[0], Proxy)
+
+    # The given container itself is not marked: it is (shallow) copied
+    items = [{"a": 1}]
+    marked = mark_raw(items)
+    assert marked is not items
+    assert marked[0] is items[0]
+    assert isinstance(proxy(items), Proxy)
+
+
+def test_mark_raw_tracked_by_reference():
+    state = proxy({"mesh": mark_raw({"a": [1]})})
+    called = []
+    watcher = watch(lambda: state, lambda: called.append(1), deep=True, sync=True)
+
+    # Mutating inside the marked value is not seen
+    state["mesh"]["a"].append(2)
+    assert called == []
+
+    state["mesh"] = mark_raw({"a": [3]})
+    assert called == [1]
+    del watcher
+
+
+def test_to_raw_deep_shared_and_cycles():
+    state = proxy({})
+    node = state
+    for _ in range(5000):
+        node["child"] = {}
+        node = node["child"]
+    raw = to_raw(state)
+    depth = 0
+    while "child" in raw:
+        raw = raw["child"]
+        depth += 1
+    assert depth == 5000
+
+    shared = [1, 2]
+    state = proxy({"a": shared, "b": shared, "c": (shared, {3})})
+    state["self"] = state
+    raw = to_raw(state)
+    assert raw["a"] == [1, 2]
+    assert raw["a"] is raw["b"]
+    assert raw["a"] is not shared
+    assert raw["c"][0] is raw["a"]
+    assert raw["self"] is raw
+    assert not isinstance(raw["self"], Proxy)
+
+
+def test_to_raw_without_copy():
+    data = {"a": [1, 2], "b": {"c": (1, 2)}}
+    state = proxy(data)
+    assert to_raw(state, copy=False) is data
+    assert to_raw(state) is not data
+    assert to_raw(state) == data
+
+    # Proxies that are stored inside of the target are removed
+    state["d"] = proxy([3])
+    raw = to_raw(state, copy=False)
+    assert raw is not data
+    assert not isinstance(raw["d"], Proxy)
+    assert raw["d"] == [3]
+
+    # Unless the caller vouches that there are none
+    assert to_raw(state, copy=False, assume_raw=True) is data
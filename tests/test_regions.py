@@ -0,0 +1,198 @@
+import pytest
+
+from observ import listen, reactive, readonly, snapshot, watch
+from observ.traps import ReadonlyError
+
+np = pytest.importorskip("numpy")
+regions = pytest.importorskip("observ.regions")
+DirtyRegions = regions.DirtyRegions
+reactive_array = regions.reactive_array
+region_of = regions.region_of
+
+
+def test_region_of():
+    shape = (10, 4)
+    assert region_of(shape, 3) == (slice(3, 4), slice(0, 4))
+    assert region_of(shape, -1) == (slice(9, 10), slice(0, 4))
+    assert region_of(shape, slice(2, 5)) == (slice(2, 5), slice(0, 4))
+    assert region_of(shape, slice(None, None, -3)) == (slice(0, 10), slice(0, 4))
+    assert region_of(shape, (slice(8, 2, -2), 1)) == (slice(4, 9), slice(1, 2))
+    assert region_of(shape, (..., 2)) == (slice(0, 10), slice(2, 3))
+    assert region_of(shape, [5, 1, 7]) == (slice(1, 8), slice(0, 4))
+    mask = np.zeros(10, dtype=bool)
+    mask[[3, 6]] = True
+    assert region_of(shape, mask) == (slice(3, 7), slice(0, 4))
+    assert region_of(shape, (None, 1)) == (slice(1, 2), slice(0, 4))
+
+
+def test_array_proxy_writes_notify():
+    positions = reactive_array(np.zeros((5, 3)))
+    state = reactive({"positions": positions})
+    called = []
+    watcher = watch(  # noqa: F841
+        lambda: state["positions"], lambda: called.append(1), sync=True, deep=True
+    )
+
+    state["positions"][1] = [1, 2, 3]
+    assert called == [1]
+    positions += 1
+    assert called == [1, 1]
+    np.multiply(positions, 2, out=positions)
+    assert called == [1, 1, 1]
+    np.add.at(positions, [0, 4], 1)
+    assert called == [1, 1, 1, 1]
+    positions.fill(0)
+    assert called == [1, 1, 1, 1, 1]
+
+    # Reads (and out-of-place operations) don't notify
+    assert positions[1, 2] == 0
+    assert (positions + 1).sum() == 15
+    assert called == [1, 1, 1, 1, 1]
+
+
+def test_array_proxy_opt_in():
+    # Arrays are opaque until they are made reactive
+    array = np.zeros(3)
+    state = reactive({"array": array})
+    assert state["array"] is array
+
+    proxied = reactive_array(array)
+    assert state["array"] is proxied
+    assert isinstance(readonly(state)["array"], regions.ArrayProxy)
+
+
+def test_dirty_regions():
+    positions = reactive_array(np.zeros((100, 3)))
+    dirty = DirtyRegions(positions)
+    ranges = []
+
+    def upload():
+        ranges.append(dirty.ranges())
+        dirty.clear()
+
+    watcher = watch(lambda: positions, upload, sync=True, deep=True)
+
+    positions[10:20] = 1
+    positions[15, 0] = 2
+    assert ranges == [[(10, 20)], [(15, 16)]]
+
+    ranges.clear()
+    del watcher
+    positions[50:60] = 1
+    positions[60] = 1
+    positions[:5, 1] = 1
+    assert dirty.ranges() == [(0, 5), (50, 61)]
+    assert dirty.bounding_box() == (slice(0, 61), slice(0, 3))
+
+    dirty.clear()
+    assert not dirty
+    positions += 1
+    assert dirty.ranges() == [(0, 100)]
+
+    dirty.close()
+    dirty.clear()
+    positions[0] = 0
+    assert not dirty
+
+
+def test_dirty_regions_without_listeners():
+    positions = reactive_array(np.zeros(10))
+    dirty = DirtyRegions(positions)
+    # Collecting regions doesn't make writes copy the old contents
+    assert positions.__dep__.listeners is None
+    positions[3] = 1
+    assert dirty.ranges() == [(3, 4)]
+    del dirty
+    assert id(positions.__target__) not in regions.DIRTY
+
+
+def test_dirty_regions_limit():
+    positions = reactive_array(np.zeros(100))
+    dirty = DirtyRegions(positions, limit=4)
+    for i in range(0, 100, 10):
+        positions[i] = 1
+    assert len(dirty) <= 4
+    assert dirty.bounding_box() == (slice(0, 91),)
+
+
+def test_array_proxy_change_records_and_snapshot():
+    positions = reactive_array(np.arange(6))
+    changes = []
+    stop = listen(positions, changes.append)
+    positions[2:4] = 0
+    stop()
+    ((kind, region, old),) = changes
+    assert kind == "region"
+    assert region == (slice(2, 4),)
+    assert old.tolist() == [2, 3]
+
+    state = reactive({"positions": positions})
+    snap = snapshot(state)
+    positions[0] = 10
+    positions *= 2
+    snap.restore()
+    assert positions.tolist() == [0, 1, 0, 0, 4, 5]
+
+
+def test_array_proxy_writing_functions():
+    positions = reactive_array(np.zeros(4))
+    dirty = DirtyRegions(positions)
+    called = []
+    watcher = watch(  # noqa: F841
+        lambda: positions, lambda: called.append(1), sync=True, deep=True
+    )
+
+    np.copyto(positions, np.arange(4))
+    assert called == [1]
+    np.putmask(positions, positions.__target__ > 1, 0)
+    assert called == [1, 1]
+    assert positions.tolist() == [0, 1, 0, 0]
+    assert dirty.ranges() == [(0, 4)]
+    # Other functions read the array
+    assert np.sum(positions) == 1
+    assert np.concatenate([positions, positions]).tolist() == [0, 1, 0, 0] * 2
+
+    with pytest.raises(ReadonlyError):
+        np.copyto(readonly(positions), 1)
+
+
+def test_array_proxy_readonly():
+    positions = reactive_array(np.zeros(3), readonly=True)
+    assert positions[0] == 0
+    with pytest.raises(ReadonlyError):
+        positions[0] = 1
+    with pytest.raises(ReadonlyError):
+        positions += 1
+    with pytest.raises(ReadonlyError):
+        positions.sort()
+
+
+def test_array_proxy_augmented_assignment():
+    positions = np.zeros(3)
+    state = reactive({"positions": positions, "items": [positions]})
+    reactive_array(positions)
+    called = []
+    watcher = watch(  # noqa: F841
+        lambda: state["positions"], lambda: called.append(1), sync=True, deep=True
+    )
+
+    state["positions"] += 1
+    assert called == [1]
+    state["items"][0] += 1
+    assert called == [1, 1]
+    assert positions.tolist() == [2, 2, 2]
+
+
+def test_array_proxy_nested_deep_watch():
+    positions = np.zeros(3)
+    state = reactive({"nested": {"positions": positions}, "plain": np.zeros(3)})
+    reactive_array(positions)
+    called = []
+    watcher = watch(  # noqa: F841
+        lambda: state, lambda: called.append(1), sync=True, deep=True
+    )
+
+    state["nested"]["positions"][2] = 5
+    assert called == [1]
+    # Arrays that were not made reactive stay opaque
+    assert type(state["plain"]) is np.ndarray
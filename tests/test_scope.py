@@ -0,0 +1,123 @@
+import gc
+import weakref
+
+import pytest
+
+from observ import EffectScope, computed, current_scope, reactive, watch
+
+
+def test_scope_captures_watchers():
+    state = reactive({"count": 0})
+    called = []
+    scope = EffectScope()
+    assert current_scope() is None
+
+    with scope as entered:
+        assert entered is scope
+        assert current_scope() is scope
+        # No references are kept: the scope keeps them alive
+        watch(lambda: state["count"], called.append, sync=True)
+        double = computed(lambda: state["count"] * 2)
+
+    assert current_scope() is None
+    assert len(scope) == 2
+
+    state["count"] = 1
+    assert called == [1]
+    assert double() == 2
+
+    scope.stop()
+    assert not scope.active
+    assert len(scope) == 0
+    state["count"] = 2
+    assert called == [1]
+
+    with pytest.raises(RuntimeError):
+        with scope:
+            pass
+
+
+def test_scope_releases_watchers():
+    state = reactive({"count": 0})
+    scope = EffectScope()
+
+    def setup():
+        return weakref.ref(watch(lambda: state["count"], lambda: None, sync=True))
+
+    gc.disable()
+    try:
+        weak_watcher = scope.run(setup)
+        assert weak_watcher() is not None
+        scope.stop()
+        assert weak_watcher() is None
+        assert not state.__dep__.keydeps
+    finally:
+        gc.enable()
+
+
+def test_scope_pause_resume():
+    state = reactive({"count": 0})
+    called = []
+    scope = EffectScope()
+    with scope:
+        watch(lambda: state["count"], called.append, sync=True)
+
+    scope.pause()
+    assert scope.paused
+    state["count"] = 1
+    state["count"] = 2
+    assert called == []
+
+    # Watchers added to a paused scope are paused as well
+    with scope:
+        watch(lambda: state["count"], called.append, sync=True)
+    state["count"] = 3
+
+    scope.resume()
+    assert called == [3, 3]
+
+
+def test_nested_scopes():
+    state = reactive({"count": 0})
+    called = []
+    outer = EffectScope()
+    with outer:
+        inner = EffectScope()
+        detached = EffectScope(detached=True)
+        with inner:
+            watch(lambda: state["count"], called.append, sync=True)
+        with detached:
+            watch(lambda: state["count"], called.append, sync=True)
+
+    assert len(outer) == 1
+    outer.stop()
+    assert not inner.active
+    assert detached.active
+
+    state["count"] = 1
+    assert called == [1]
+
+
+def test_scope_removes_stopped():
+    state = reactive({"count": 0})
+    outer = EffectScope()
+    with outer:
+        watcher = watch(lambda: state["count"], lambda: None, sync=True)
+        kept = watch(lambda: state["count"], lambda: None, sync=True)
+        inner = EffectScope()
+        with inner:
+            watch(lambda: state["count"], lambda: None, sync=True)
+
+    assert len(outer) == 3
+    watcher.stop()
+    assert list(outer.watchers) == [kept]
+    inner.stop()
+    assert not outer.scopes
+    assert len(outer) == 1
+
+    # Removing doesn't stop the watcher
+    outer.remove(kept)
+    assert len(outer) == 0
+    assert kept.active
+    outer.stop()
+    assert kept.active
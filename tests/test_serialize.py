@@ -0,0 +1,50 @@
+import io
+import json
+
+import pytest
+
+from observ import computed, dump_json, dumps_json, iter_json, reactive, to_raw
+
+
+def test_iter_json():
+    state = reactive({"a": [1, {"b": (2, 3)}], "c": None, "d": "foo"})
+    state["e"] = reactive([4])
+    expected = json.dumps(to_raw(state))
+    assert "".join(iter_json(state)) == expected
+    assert dumps_json(state) == expected
+    assert dumps_json(state["a"]) == json.dumps(to_raw(state["a"]))
+
+    buffer = io.StringIO()
+    dump_json(state, buffer, indent=2, sort_keys=True)
+    assert buffer.getvalue() == json.dumps(to_raw(state), indent=2, sort_keys=True)
+
+
+def test_json_unserializable():
+    state = reactive({"a": {1, 2}})
+    with pytest.raises(TypeError):
+        dumps_json(state)
+
+
+def test_json_tracks_dependencies():
+    state = reactive({"a": [1, {"b": 2}], "c": 3})
+    calls = []
+
+    @computed
+    def serialized():
+        calls.append(1)
+        return dumps_json(state)
+
+    assert json.loads(serialized()) == to_raw(state)
+    state["a"][1]["b"] = 3
+    assert json.loads(serialized())["a"][1]["b"] == 3
+    assert len(calls) == 2
+
+    @computed
+    def untracked():
+        calls.append(1)
+        return "".join(iter_json(state, track=False))
+
+    untracked()
+    state["c"] = 4
+    untracked()
+    assert len(calls) == 3
@@ -0,0 +1,146 @@
+import pytest
+
+from observ import reactive, snapshot, to_raw, watch
+
+
+def test_snapshot():
+    state = reactive({"a": [1, 2, 3], "b": {"c": {1, 2}}, "d": "foo"})
+    before = to_raw(state)
+    snap = snapshot(state)
+    assert len(snap) == 0
+    assert snap.to_raw() == before
+
+    state["a"].append(4)
+    state["a"].insert(0, 0)
+    del state["a"][2]
+    state["b"]["c"].add(3)
+    state["b"]["c"].discard(1)
+    state["b"]["e"] = [5]
+    state["d"] = "bar"
+
+    # Only the mutated containers are copied
+    assert len(snap) == 4
+    assert snap.to_raw() == before
+    assert to_raw(state) == {
+        "a": [0, 1, 3, 4],
+        "b": {"c": {2, 3}, "e": [5]},
+        "d": "bar",
+    }
+
+
+def test_snapshot_multi_record_mutations():
+    state = reactive({"a": 1, "b": 2, "c": {1, 2, 3}, "d": [3, 1, 2]})
+    before = to_raw(state)
+    snap = snapshot(state)
+
+    state.update({"a": 10, "b": 20, "e": 30})
+    state["c"].intersection_update({2, 5})
+    state["d"].sort()
+    state["d"].reverse()
+    assert snap.to_raw() == before
+
+    state.clear()
+    assert snap.to_raw() == before
+
+
+def test_snapshot_restore():
+    state = reactive({"a": [1, 2], "b": {"c": 1}, "s": {1}})
+    before = to_raw(state)
+    snap = snapshot(state)
+    called = []
+    watcher = watch(lambda: state["b"]["c"], called.append, sync=True)
+
+    state["a"].pop()
+    state["b"]["c"] = 2
+    state["b"]["d"] = 3
+    state["s"].add(2)
+    snap.restore()
+
+    assert to_raw(state) == before
+    assert called == [2, 1]
+    assert len(snap) == 0
+    del watcher
+
+    # The snapshot stays usable after restoring
+    state["a"].append(3)
+    assert snap.to_raw() == before
+
+
+def test_snapshot_shared_and_cycles():
+    shared = [1]
+    state = reactive({"x": shared, "y": shared, "t": (shared,)})
+    state["self"] = state
+    snap = snapshot(state)
+    state["x"].append(2)
+
+    frozen = snap.to_raw()
+    assert frozen["x"] == [1]
+    assert frozen["x"] is frozen["y"]
+    assert frozen["t"][0] is frozen["x"]
+    assert frozen["self"] is frozen
+    assert to_raw(state["y"]) == [1, 2]
+
+
+def test_snapshot_release():
+    state = reactive({"a": 1})
+    snap = snapshot(state)
+    assert snap.active
+    snap.release()
+    assert not snap.active
+    state["a"] = 2
+    assert len(snap) == 0
+    with pytest.raises(RuntimeError):
+        snap.to_raw()
+
+    # Dropping a snapshot releases it as well
+    snap = snapshot(state)
+    del snap
+    state["a"] = 3
+
+
+def test_snapshot_requires_proxy():
+    with pytest.raises(TypeError):
+        snapshot({"a": 1})
+
+
+def test_snapshot_ignores_other_containers():
+    state = reactive({"a": [1], "b": {"c": [2]}})
+    other = reactive({"x": [1, 2, 3]})
+    c = state["b"]["c"]
+    snap = snapshot(state)
+
+    # The first mutation clears the root: the removed containers are
+    # still part of the tree as of the snapshot
+    state.clear()
+    other["x"].append(4)
+    other["y"] = 1
+    c.append(3)
+    state["d"] = [3]
+    state["d"].append(4)
+    assert len(snap) == 2
+    assert snap.to_raw() == {"a": [1], "b": {"c": [2]}}
+    assert to_raw(other) == {"x": [1, 2, 3, 4], "y": 1}
+
+    snap.restore()
+    assert to_raw(state) == {"a": [1], "b": {"c": [2]}}
+    assert state["b"]["c"] is c
+
+
+def test_snapshot_walks_lazily():
+    state = reactive({"rest": [[i] for i in range(100)], "a": [1]})
+    first = state["rest"][0]
+    snap = snapshot(state)
+
+    state["a"].append(2)
+    # The walk stopped at the mutated container
+    assert len(snap.members) == 2
+
+    # A single mutation with several records, that removes a container
+    state.update({"rest": [], "b": [3]})
+    first.append(1)
+    state["b"].append(4)
+    assert len(snap) == 3
+    frozen = snap.to_raw()
+    assert frozen["rest"][0] == [0]
+    assert frozen["a"] == [1]
+    assert "b" not in frozen
@@ -0,0 +1,79 @@
+from threading import Barrier, Thread
+
+from observ import computed, reactive
+from observ.proxy_db import proxy_db
+
+
+def run_threads(*fns):
+    threads = [Thread(target=fn) for fn in fns]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_dependency_stack_per_thread():
+    state = reactive({"a": 1, "a2": 2, "b": 3})
+    barrier = Barrier(2)
+    threaded = True
+
+    def sync():
+        if threaded:
+            barrier.wait()
+
+    @computed
+    def a():
+        sync()
+        x = state["a"]
+        # Both watchers are evaluating at this point, b started last
+        sync()
+        y = state["a2"]
+        sync()
+        return x + y
+
+    @computed
+    def b():
+        sync()
+        sync()
+        return state["b"]
+
+    def run_b():
+        sync()
+        results["b"] = b()
+
+    results = {}
+    run_threads(lambda: results.update(a=a()), run_b)
+    assert results == {"a": 3, "b": 3}
+    threaded = False
+
+    a_watcher = a.__watcher__
+    b_watcher = b.__watcher__
+    assert not a_watcher.dirty and not b_watcher.dirty
+
+    state["a2"] = 20
+    assert a_watcher.dirty
+    assert not b_watcher.dirty
+
+    state["b"] = 30
+    assert b_watcher.dirty
+    assert a() == 21
+    assert b() == 30
+
+
+def test_concurrent_proxy_creation():
+    target = {"foo": [1, 2, 3]}
+    count = 8
+    barrier = Barrier(count)
+    proxies = []
+
+    def create():
+        barrier.wait()
+        state = reactive(target)
+        # Make sure the nested list is proxied concurrently as well
+        proxies.append((state, state["foo"]))
+
+    run_threads(*[create] * count)
+
+    assert len({id(state) for state, _ in proxies}) == 1
+    assert len({id(foo) for _, foo in proxies}) == 1
+    assert proxy_db.db[id(target)]() is proxies[0][0].__dep__
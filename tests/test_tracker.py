@@ -0,0 +1,124 @@
+from observ import DirtyTracker, EffectScope, computed, reactive
+
+
+def test_dirty_tracker():
+    state = reactive({"camera": {"position": [0, 0]}, "items": [1, 2, 3]})
+    tracker = DirtyTracker()
+    camera = tracker.track(state["camera"])
+    assert camera is state["camera"]
+    tracker.track(state["items"], key="items")
+    assert len(tracker) == 2
+    assert "items" in tracker
+    assert camera in tracker
+    assert tracker.collect() == []
+
+    state["items"].append(4)
+    # Nested changes are picked up, and every source is reported once
+    state["camera"]["position"][0] = 1
+    state["camera"]["position"][1] = 1
+    state["items"].append(5)
+    assert tracker.collect() == ["items", camera]
+    assert tracker.collect() == []
+
+    # Containers that were added are tracked after collecting
+    state["camera"]["target"] = [0, 0]
+    assert tracker.collect() == [camera]
+    state["camera"]["target"][0] = 1
+    assert tracker.collect() == [camera]
+
+    tracker.untrack("items")
+    state["items"].append(6)
+    assert tracker.collect() == []
+    assert len(tracker) == 1
+
+
+def test_dirty_tracker_computed():
+    state = reactive({"items": [1, 2, 3], "other": 1})
+    calls = []
+
+    @computed
+    def total():
+        calls.append(1)
+        return sum(state["items"])
+
+    tracker = DirtyTracker()
+    tracker.track(total, key="total")
+    assert len(calls) == 1
+
+    state["other"] = 2
+    assert tracker.collect() == []
+
+    # No evaluation happens until the tracker is collected
+    state["items"].append(4)
+    state["items"].append(5)
+    assert len(calls) == 1
+    assert tracker.collect() == ["total"]
+    assert len(calls) == 2
+    assert total() == 15
+    assert len(calls) == 2
+
+
+def test_dirty_tracker_function():
+    state = reactive({"a": 1, "b": 1})
+    tracker = DirtyTracker()
+    tracker.track(lambda: state["a"], key="a")
+    state["b"] = 2
+    assert tracker.collect() == []
+    state["a"] = 2
+    assert tracker.collect() == ["a"]
+
+
+def test_dirty_tracker_clear():
+    state = reactive({"a": 1})
+    tracker = DirtyTracker()
+    tracker.track(state)
+    state["a"] = 2
+    tracker.clear()
+    assert len(tracker) == 0
+    assert tracker.collect() == []
+    state["a"] = 3
+    assert tracker.collect() == []
+
+
+def test_dirty_tracker_scope():
+    state = reactive({"a": 1})
+    tracker = DirtyTracker()
+    scope = EffectScope()
+    with scope:
+        tracker.track(state, key="state")
+    scope.pause()
+    state["a"] = 2
+    assert tracker.collect() == []
+    scope.resume()
+    assert tracker.collect() == ["state"]
+    scope.stop()
+    state["a"] = 3
+    assert tracker.collect() == []
+
+
+def test_dirty_tracker_scans_changed_containers():
+    state = reactive({"a": {"x": 1}, "b": [[1], [2]]})
+    tracker = DirtyTracker()
+    tracker.track(state, key="state")
+    source = tracker.sources["state"]
+    assert len(source.marks) == 5
+
+    state["a"]["x"] = 2
+    assert tracker.collect() == ["state"]
+    # Only the changed container was scanned
+    assert source.scanned == 1
+
+    removed = state["b"]
+    state["b"] = [[3]]
+    assert tracker.collect() == ["state"]
+    state["b"][0].append(4)
+    assert tracker.collect() == ["state"]
+    assert len(source.marks) == 7
+
+    # Removed containers are tracked until the source is traversed
+    # again, once the scans add up to its size
+    removed.append(1)
+    assert tracker.collect() == ["state"]
+    assert len(source.marks) == 4
+    removed.append(2)
+    assert tracker.collect() == []
@@ -0,0 +1,106 @@
+import pytest
+
+from observ import reactive, readonly, version, watch
+from observ.proxy_db import proxy_db
+
+
+def test_version():
+    raw = {"a": 1, "b": [1, 2]}
+    state = reactive(raw)
+    start = version(state)
+    assert version(state) == start
+    # Reads don't change the version
+    assert state["a"] == 1
+    assert version(state) == start
+
+    # Neither do writes that don't change anything
+    state["a"] = 1
+    assert version(state) == start
+
+    state["a"] = 2
+    assert version(state) > start
+
+    # All proxies of a target share the version
+    assert version(readonly(raw)) == version(state)
+
+
+def test_version_shallow_and_deep():
+    state = reactive({"a": {"b": [1, 2]}, "c": (1, [2])})
+    shallow = version(state)
+    deep = version(state, deep=True)
+    assert deep >= shallow
+
+    state["a"]["b"].append(3)
+    assert version(state) == shallow
+    assert version(state, deep=True) > deep
+
+    deep = version(state, deep=True)
+    # Containers nested inside tuples are included as well
+    state["c"][1].append(3)
+    assert version(state, deep=True) > deep
+
+    deep = version(state, deep=True)
+    assert version(state, deep=True) == deep
+
+
+def test_version_set_and_list():
+    items = reactive([1, 2])
+    start = version(items)
+    items.append(3)
+    assert version(items) > start
+
+    values = reactive({1})
+    start = version(values)
+    values.add(1)
+    assert version(values) == start
+    values.add(2)
+    assert version(values) > start
+
+
+def test_version_cycle():
+    state = reactive({})
+    state["self"] = state
+    start = version(state, deep=True)
+    assert version(state, deep=True) == start
+
+
+def test_version_requires_proxy():
+    with pytest.raises(TypeError):
+        version({"a": 1})
+
+
+def test_version_releases_removed():
+    state = reactive({"a": {"b": {"c": []}}, "d": [{}]})
+    removed = state.__target__["a"]["b"]
+    deep = version(state, deep=True)
+    assert proxy_db.db[id(removed)]() is not None
+
+    del state["a"]["b"]
+    assert id(removed) not in proxy_db.db
+    assert version(state, deep=True) > deep
+
+    # The other nested deps are still alive, so nothing changed
+    deep = version(state, deep=True)
+    state["d"][0]["e"] = 1
+    assert version(state, deep=True) > deep
+    deep = version(state, deep=True)
+    assert version(state, deep=True) == deep
+
+
+def test_version_bumped_lazily():
+    state = reactive({"a": 1})
+    # Writes don't bump the version of targets that nobody looks at
+    assert state.__dep__._subs is None
+    start = version(state)
+    state["a"] = 2
+    state["a"] = 3
+    assert version(state) > start
+
+    # Watchers that update synchronously see the new version
+    seen = []
+    watcher = watch(  # noqa: F841
+        lambda: state, lambda: seen.append(version(state)), sync=True, deep=True
+    )
+    before = version(state)
+    state["a"] = 4
+    assert seen[0] > before
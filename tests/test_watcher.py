@@ -226,3 +226,38 @@ def test_computed_pause_resume(noop_request_flush):
     double.__watcher__.resume()
 
     assert double() == 4
+
+
+def test_watcher_reentrant_evaluation():
+    state = reactive({"a": 0, "go": False})
+    called = []
+
+    def fn():
+        value = state["a"]
+        if state["go"]:
+            # Triggers a nested evaluation of this (sync) watcher
+            state["go"] = False
+            state["a"] += 1
+        return value
+
+    watcher = watch(fn, lambda new, old: called.append(new), sync=True)
+    state["go"] = True
+    assert watcher.value == 0
+    assert called == [1, 0]
+
+    # The watcher still depends on its deps after the nested evaluation
+    state["a"] = 5
+    assert called == [1, 0, 5]
+
+
+def test_watcher_stop_while_evaluating():
+    state = reactive({"a": 0, "stop": False})
+
+    def fn():
+        if state["stop"]:
+            watcher.stop()
+        return state["a"]
+
+    watcher = watch(fn, None, sync=True)
+    state["stop"] = True
+    assert not watcher._deps
@@ -34,3 +34,26 @@ def test_watcher_hooks():
     finally:
         Watcher.on_created = None
         Watcher.on_destroyed = None
+
+
+def test_watcher_finalizer_only_with_hook():
+    destroyed = []
+    assert not hasattr(Watcher, "__del__")
+
+    try:
+        Watcher.on_destroyed = destroyed.append
+        assert hasattr(Watcher, "__del__")
+
+        a = reactive([1, 2])
+        watcher = watch(lambda: len(a), None, sync=True)
+        watcher_id = watcher.id
+        del watcher
+        assert [watcher.id for watcher in destroyed] == [watcher_id]
+        destroyed.clear()
+    finally:
+        Watcher.on_destroyed = None
+
+    assert not hasattr(Watcher, "__del__")
+    watcher = watch(lambda: len(a), None, sync=True)
+    del watcher
+    assert destroyed == []